@@ -0,0 +1,41 @@
+import asyncio
+import tempfile
+from pathlib import Path
+
+from benchmarks.harness import argument_parser, http_client, run_load, running_server, seed_database
+
+# Concurrent-connection capacity of the async read endpoints. Each step holds that many
+# keep-alive connections busy against product and review reads; with the reads awaiting
+# aiosqlite instead of occupying threadpool threads, throughput should hold as the
+# connection count grows and only latency should scale with the queue.
+#
+#   python -m benchmarks.connection_capacity --levels 25,50,100,200,400 --duration 10
+
+
+async def measure(base_url: str, args) -> None:
+    async def read(client, rnd):
+        product_id = rnd.randint(1, args.products)
+        if rnd.random() < 0.5:
+            return await client.get(f"/products/{product_id}")
+        return await client.get(f"/reviews/product/{product_id}", params={"limit": 20})
+
+    for level in (int(value) for value in args.levels.split(",")):
+        async with http_client(base_url, level) as client:
+            result = await run_load(client, read, level, args.duration, seed=level)
+        errors = result.requests - result.count(200)
+        print(f"connections={level} errors={errors} {result.summary()}")
+
+
+def main(argv=None):
+    parser = argument_parser("Throughput and latency of async reads as concurrent connections grow")
+    parser.add_argument("--levels", default="25,50,100,200,400", help="comma-separated connection counts")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    args = parser.parse_args(argv)
+    with tempfile.TemporaryDirectory(prefix="petshop-bench-") as directory:
+        database = seed_database(Path(directory) / "bench.db", args.customers, args.products, args.orders)
+        with running_server(database, {"PETSHOP_DB_PROFILE": "production"}, workers=args.workers) as base_url:
+            asyncio.run(measure(base_url, args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import asyncio
+import shutil
+import tempfile
+from pathlib import Path
+
+from benchmarks.harness import argument_parser, http_client, run_load, running_server, seed_database
+from database import ENGINE_PROFILES
+
+# Mixed read/checkout throughput per engine profile (PETSHOP_DB_PROFILE). Every profile
+# starts from a copy of the same seeded database; readers page the catalog while writers
+# add one item to a cart and check out, which is where journal mode and busy_timeout matter.
+#
+#   python -m benchmarks.engine_profiles --readers 16 --writers 4 --duration 10
+
+
+async def measure(base_url: str, args) -> tuple:
+    async def read(client, rnd):
+        return await client.get("/products/", params={"skip": rnd.randrange(args.products), "limit": 50})
+
+    async def checkout(client, rnd):
+        customer_id = rnd.randint(1, args.customers)
+        item = {"customer_id": customer_id, "product_id": rnd.randint(1, args.products), "quantity": 1}
+        response = await client.post("/cart/add", json=item)
+        if response.status_code != 201:
+            return response
+        return await client.post("/orders/checkout", json={"customer_id": customer_id, "payment_method": "UPI"})
+
+    async with http_client(base_url, args.readers + args.writers) as client:
+        return await asyncio.gather(
+            run_load(client, read, args.readers, args.duration),
+            run_load(client, checkout, args.writers, args.duration, seed=1),
+        )
+
+
+def main(argv=None):
+    parser = argument_parser("Read and checkout throughput per SQLite engine profile")
+    parser.add_argument("--readers", type=int, default=16, help="concurrent catalog readers")
+    parser.add_argument("--writers", type=int, default=4, help="concurrent checkout clients")
+    parser.add_argument("--profiles", default=",".join(ENGINE_PROFILES), help="comma-separated profile names")
+    args = parser.parse_args(argv)
+    with tempfile.TemporaryDirectory(prefix="petshop-bench-") as directory:
+        seed = seed_database(Path(directory) / "seed.db", args.customers, args.products, args.orders)
+        for profile in args.profiles.split(","):
+            database = Path(directory) / f"{profile}.db"
+            shutil.copyfile(seed, database)
+            with running_server(database, {"PETSHOP_DB_PROFILE": profile}) as base_url:
+                reads, checkouts = asyncio.run(measure(base_url, args))
+            print(f"[{profile}] reads: {reads.summary()}")
+            # 400 = out of stock for the picked product; 5xx/timeouts are lock failures.
+            print(f"[{profile}] checkouts: {checkouts.summary()}")
+
+
+if __name__ == "__main__":
+    main()
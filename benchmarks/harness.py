@@ -0,0 +1,156 @@
+import argparse
+import asyncio
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+import httpx
+
+# Shared by the benchmark scripts: a seeded scratch database, a real uvicorn server
+# on it, and a closed-loop HTTP load generator with latency percentiles.
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+SYNTHETIC_PASSWORD = "user1234"
+SERVER_START_TIMEOUT_SECONDS = 30
+
+
+def database_url(path: Path) -> str:
+    return f"sqlite:///{path}"
+
+
+def seed_database(path: Path, customers: int, products: int, orders: int) -> Path:
+    # utils.synthetic_data numbers rows from 1 on an empty database, so scripts can pick
+    # ids in 1..N and log in as customer<id>@synthetic.example.
+    env = {**os.environ, "PETSHOP_DATABASE_URL": database_url(path), "PETSHOP_DB_PROFILE": "default"}
+    command = [
+        sys.executable, "-m", "utils.synthetic_data",
+        "--customers", str(customers), "--products", str(products), "--orders", str(orders),
+        "--end-date", "2026-01-31", "--password", SYNTHETIC_PASSWORD,
+    ]
+    subprocess.run(command, cwd=REPO_ROOT, env=env, check=True, stdout=subprocess.DEVNULL)
+    return path
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def running_server(database: Path, env: Optional[dict] = None, workers: int = 1):
+    port = free_port()
+    server_env = {**os.environ, "PETSHOP_DATABASE_URL": database_url(database), **(env or {})}
+    command = [
+        sys.executable, "-m", "uvicorn", "main:app",
+        "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers),
+        "--log-level", "warning", "--no-access-log",
+    ]
+    process = subprocess.Popen(command, cwd=REPO_ROOT, env=server_env)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        wait_until_ready(base_url, process)
+        yield base_url
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def wait_until_ready(base_url: str, process: subprocess.Popen) -> None:
+    deadline = time.monotonic() + SERVER_START_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited during startup with code {process.returncode}")
+        try:
+            if httpx.get(f"{base_url}/products/?limit=1", timeout=1).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("Server did not become ready in time")
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+@dataclass
+class LoadResult:
+    latencies: list[float] = field(default_factory=list)
+    statuses: Counter = field(default_factory=Counter)
+    elapsed: float = 0.0
+
+    def record(self, status, seconds: float) -> None:
+        self.statuses[status] += 1
+        self.latencies.append(seconds)
+
+    @property
+    def requests(self) -> int:
+        return len(self.latencies)
+
+    def count(self, *statuses) -> int:
+        return sum(self.statuses[status] for status in statuses)
+
+    def summary(self) -> str:
+        ms = [latency * 1000 for latency in self.latencies]
+        statuses = " ".join(f"{status}:{count}" for status, count in sorted(self.statuses.items(), key=str))
+        return (
+            f"requests={self.requests} rps={self.requests / max(self.elapsed, 1e-9):.0f} "
+            f"p50={percentile(ms, 50):.1f}ms p95={percentile(ms, 95):.1f}ms p99={percentile(ms, 99):.1f}ms "
+            f"statuses=[{statuses}]"
+        )
+
+
+RequestFn = Callable[[httpx.AsyncClient, random.Random], Awaitable[httpx.Response]]
+
+
+async def run_load(
+    client: httpx.AsyncClient, request: RequestFn, concurrency: int, duration: float, seed: int = 0
+) -> LoadResult:
+    # Closed loop: each of `concurrency` clients sends its next request as soon as the last returns.
+    result = LoadResult()
+    deadline = time.perf_counter() + duration
+
+    async def worker(index: int) -> None:
+        rnd = random.Random(seed * 100003 + index)
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                status = (await request(client, rnd)).status_code
+            except httpx.HTTPError as exc:
+                status = exc.__class__.__name__
+            result.record(status, time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(index) for index in range(concurrency)))
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+def http_client(base_url: str, connections: int) -> httpx.AsyncClient:
+    limits = httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+    return httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60)
+
+
+def argument_parser(description: str, customers: int = 2000, products: int = 500, orders: int = 5000):
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--customers", type=int, default=customers, help="synthetic customers to seed")
+    parser.add_argument("--products", type=int, default=products, help="synthetic products to seed")
+    parser.add_argument("--orders", type=int, default=orders, help="synthetic orders to seed")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per measured phase")
+    return parser
@@ -0,0 +1,57 @@
+import asyncio
+import tempfile
+from pathlib import Path
+
+from benchmarks.harness import (
+    SYNTHETIC_PASSWORD,
+    argument_parser,
+    http_client,
+    run_load,
+    running_server,
+    seed_database,
+)
+
+# Catalog latency with and without a login storm. PBKDF2 runs on the bounded hashing
+# pool, so a burst of logins should leave catalog p99 close to baseline and turn the
+# overflow into fast 503s instead of queueing on the event loop. The hashing workers
+# still need CPU: on a host with no core to spare for them, catalog reads slow down
+# from plain CPU contention, so compare --hash-workers against the core count.
+#
+#   python -m benchmarks.login_storm --logins 32 --duration 10
+
+
+async def measure(base_url: str, args) -> None:
+    async def catalog(client, rnd):
+        return await client.get(f"/products/{rnd.randint(1, args.products)}")
+
+    async def login(client, rnd):
+        email = f"customer{rnd.randint(1, args.customers)}@synthetic.example"
+        return await client.post("/customers/login", json={"email": email, "password": SYNTHETIC_PASSWORD})
+
+    async with http_client(base_url, args.catalog_clients + args.logins) as client:
+        baseline = await run_load(client, catalog, args.catalog_clients, args.duration)
+        during, logins = await asyncio.gather(
+            run_load(client, catalog, args.catalog_clients, args.duration),
+            run_load(client, login, args.logins, args.duration, seed=1),
+        )
+    print(f"catalog_baseline: {baseline.summary()}")
+    print(f"catalog_during_login_storm: {during.summary()}")
+    print(f"logins: {logins.summary()}")
+    print(f"logins_ok={logins.count(200)} logins_rejected_503={logins.count(503)}")
+
+
+def main(argv=None):
+    parser = argument_parser("p99 catalog latency during a login storm")
+    parser.add_argument("--logins", type=int, default=32, help="concurrent login clients")
+    parser.add_argument("--catalog-clients", type=int, default=4, help="concurrent catalog readers")
+    parser.add_argument("--hash-workers", type=int, default=None, help="PETSHOP_HASH_POOL_WORKERS for the server")
+    args = parser.parse_args(argv)
+    env = {"PETSHOP_HASH_POOL_WORKERS": str(args.hash_workers)} if args.hash_workers else {}
+    with tempfile.TemporaryDirectory(prefix="petshop-bench-") as directory:
+        database = seed_database(Path(directory) / "bench.db", args.customers, args.products, args.orders)
+        with running_server(database, env) as base_url:
+            asyncio.run(measure(base_url, args))
+
+
+if __name__ == "__main__":
+    main()
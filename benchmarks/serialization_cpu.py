@@ -0,0 +1,75 @@
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.harness import argument_parser, database_url, seed_database
+
+# CPU time per 500-row list response: FastAPI's response_model pass plus stdlib json,
+# against utils.serialization.dump_json on its validated and PETSHOP_FAST_JSON paths.
+# Rows are loaded once; only serialization is timed (time.process_time).
+#
+#   python -m benchmarks.serialization_cpu --rows 500 --iterations 50
+
+
+def cpu_ms_per_call(func, iterations: int) -> float:
+    func()
+    started = time.process_time()
+    for _ in range(iterations):
+        func()
+    return (time.process_time() - started) * 1000 / iterations
+
+
+def main(argv=None):
+    parser = argument_parser("CPU time per list response for each JSON serialization path")
+    parser.add_argument("--rows", type=int, default=500, help="rows per response")
+    parser.add_argument("--iterations", type=int, default=50, help="timed calls per path")
+    args = parser.parse_args(argv)
+    with tempfile.TemporaryDirectory(prefix="petshop-bench-") as directory:
+        database = seed_database(Path(directory) / "bench.db", args.customers, args.products, args.orders)
+        # The engine is built from the environment when `database` is imported, so import late.
+        os.environ["PETSHOP_DATABASE_URL"] = database_url(database)
+        import crud
+        import schemas
+        from database import SessionLocal
+        from utils import serialization
+
+        with SessionLocal() as db:
+            datasets = {
+                "products": (crud.list_products(db, limit=args.rows), list[schemas.ProductOut]),
+                "orders": (crud.list_orders(db, limit=args.rows), list[schemas.OrderOut]),
+            }
+            for name, (rows, annotation) in datasets.items():
+                adapter = serialization.type_adapter(annotation)
+
+                def response_model():
+                    # What FastAPI does for response_model: validate, dump to JSON-able
+                    # Python, then JSONResponse's json.dumps.
+                    return json.dumps(
+                        adapter.dump_python(adapter.validate_python(rows, from_attributes=True), mode="json"),
+                        ensure_ascii=False,
+                        separators=(",", ":"),
+                    ).encode("utf-8")
+
+                def dump_json(fast: bool):
+                    serialization.FAST_JSON = fast
+                    try:
+                        return serialization.dump_json(rows, annotation)
+                    finally:
+                        serialization.FAST_JSON = False
+
+                paths = {
+                    "response_model+json": response_model,
+                    "dump_json": lambda: dump_json(False),
+                }
+                if serialization.orjson is not None:
+                    paths["dump_json_fast"] = lambda: dump_json(True)
+                timings = " ".join(
+                    f"{label}={cpu_ms_per_call(func, args.iterations):.2f}ms" for label, func in paths.items()
+                )
+                print(f"{name} rows={len(rows)} {timings}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,36 @@
-from datetime import datetime
+import re
+import uuid
+from datetime import date, datetime, timedelta
 from typing import Optional
 
-from sqlalchemy.orm import Session
+from sqlalchemy import (
+    Integer,
+    and_,
+    bindparam,
+    case,
+    cast,
+    column,
+    false,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    table,
+    text,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, aliased, selectinload
 
 import models
 import schemas
 from utils.auth import hash_password, verify_password
+from utils.principal_cache import principal_cache
+from utils.pubsub import call_after_commit, publish_after_commit
+from utils.stock_alerts import LOW_STOCK_THRESHOLD, LOW_STOCK_TOPIC, low_stock_alert
+from utils.unread_counts import unread_counts
 
 
 def get_customer(db: Session, customer_id: int) -> Optional[models.Customer]:
@@ -36,12 +61,12 @@ def create_admin(db: Session, payload: schemas.AdminCreate) -> Optional[models.A
     db.add(db_admin)
     db.commit()
     db.refresh(db_admin)
+    principal_cache.invalidate("admin", db_admin.admin_id)
     return db_admin
 
 
-def authenticate_admin(
+def get_admin_for_login(
     db: Session,
-    password: str,
     user_name: Optional[str] = None,
     email: Optional[str] = None,
 ) -> Optional[models.Admin]:
@@ -50,6 +75,16 @@ def authenticate_admin(
         admin = get_admin_by_email(db, email)
     if not admin and user_name:
         admin = get_admin_by_username(db, user_name)
+    return admin
+
+
+def authenticate_admin(
+    db: Session,
+    password: str,
+    user_name: Optional[str] = None,
+    email: Optional[str] = None,
+) -> Optional[models.Admin]:
+    admin = get_admin_for_login(db, user_name=user_name, email=email)
     if not admin:
         return None
     if not verify_password(password, admin.password):
@@ -61,16 +96,25 @@ def get_customer_by_email(db: Session, email: str) -> Optional[models.Customer]:
     return db.query(models.Customer).filter(models.Customer.email == email).first()
 
 
-def list_customers(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Customer).offset(skip).limit(limit).all()
+def list_customers(db: Session, skip: int = 0, limit: int = 100, after_id: Optional[int] = None):
+    query = db.query(models.Customer).order_by(models.Customer.customer_id.asc())
+    if after_id is not None:
+        # Keyset pagination: seek past the last id instead of scanning skipped rows.
+        return query.filter(models.Customer.customer_id > after_id).limit(limit).all()
+    return query.offset(skip).limit(limit).all()
 
 
-def create_customer(db: Session, payload: schemas.CustomerCreate) -> Optional[models.Customer]:
+def create_customer(
+    db: Session,
+    payload: schemas.CustomerCreate,
+    password_hash: Optional[str] = None,
+) -> Optional[models.Customer]:
     if get_customer_by_email(db, payload.email):
         return None
 
     data = payload.model_dump()
-    data["password"] = hash_password(payload.password)
+    # Callers that hash off-thread pass the result in; otherwise hash inline.
+    data["password"] = password_hash or hash_password(payload.password)
     db_customer = models.Customer(**data)
     db.add(db_customer)
     db.commit()
@@ -100,6 +144,7 @@ def update_customer(db: Session, customer_id: int, payload: schemas.CustomerUpda
         setattr(customer, field, value)
 
     db.commit()
+    principal_cache.invalidate("customer", customer_id)
     db.refresh(customer)
     return customer
 
@@ -108,11 +153,58 @@ def delete_customer(db: Session, customer_id: int) -> bool:
     customer = get_customer(db, customer_id)
     if not customer:
         return False
+    lock_for_write(db)
+    # Orders cascade with the customer, so take their totals out of the counters too.
+    removed = compute_sales_summary(db, customer_id=customer_id)
+    if removed["total_orders"]:
+        bump_sales_counters(
+            db,
+            orders=-removed["total_orders"],
+            revenue=-removed["total_revenue"],
+            items_sold=-removed["total_items_sold"],
+            receipts=-removed["payment_receipts_generated"],
+        )
+        bump_sales_rollup(
+            db,
+            [
+                {**row, "orders": -row["orders"], "revenue": -row["revenue"], "units": -row["units"]}
+                for row in compute_sales_rollup(db, customer_id=customer_id)
+            ],
+        )
+        db.query(models.SalesDaily).filter(models.SalesDaily.orders <= 0).delete(synchronize_session=False)
+        bump_product_sales(
+            db,
+            [
+                {**row, "units": -row["units"], "revenue": -row["revenue"]}
+                for row in compute_product_sales(db, customer_id=customer_id)
+            ],
+        )
+    # Reviews cascade too; take them out of the products' running rating totals.
+    removed_ratings = subtract_customer_ratings(db, customer_id)
+    if removed["total_orders"] or removed_ratings:
+        bump_catalog_version(db)
     db.delete(customer)
     db.commit()
+    principal_cache.invalidate("customer", customer_id)
     return True
 
 
+CATALOG_VERSION_ID = 1
+
+
+def bump_catalog_version(db: Session) -> None:
+    # Part of the caller's transaction: the new ETag becomes visible to every process
+    # exactly when the catalog write does.
+    db.execute(
+        sqlite_insert(models.CatalogVersion)
+        .values(version_id=CATALOG_VERSION_ID, epoch=func.lower(func.hex(func.randomblob(4))), version=1)
+        .on_conflict_do_update(
+            index_elements=[models.CatalogVersion.version_id],
+            set_={"version": models.CatalogVersion.version + 1},
+        )
+    )
+
+
 def get_product(db: Session, product_id: int) -> Optional[models.Product]:
     return db.query(models.Product).filter(models.Product.product_id == product_id).first()
 
@@ -121,26 +213,99 @@ def get_product_by_name(db: Session, product_name: str) -> Optional[models.Produ
     return db.query(models.Product).filter(models.Product.product_name == product_name).first()
 
 
-def list_products(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Product).offset(skip).limit(limit).all()
+def list_products(db: Session, skip: int = 0, limit: int = 100, after_id: Optional[int] = None):
+    query = db.query(models.Product).order_by(models.Product.product_id.asc())
+    if after_id is not None:
+        return query.filter(models.Product.product_id > after_id).limit(limit).all()
+    return query.offset(skip).limit(limit).all()
+
+
+products_fts = table("products_fts", column("rowid"), column("rank"))
+
+PRODUCT_SEARCH_SORTS = {
+    "price_asc": [models.Product.price.asc()],
+    "price_desc": [models.Product.price.desc()],
+    "rating_desc": [models.Product.rating.desc()],
+    "name_asc": [models.Product.product_name.asc()],
+    "newest": [models.Product.product_id.desc()],
+}
+
+
+def build_product_match_query(q: Optional[str]) -> Optional[str]:
+    # Quote every word and allow prefix matches so user input never reaches FTS syntax.
+    terms = re.findall(r"\w+", q or "")
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def search_products(
+    db: Session,
+    q: Optional[str] = None,
+    product_type: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    min_rating: Optional[float] = None,
+    sort: str = "relevance",
+    skip: int = 0,
+    limit: int = 20,
+):
+    if sort != "relevance" and sort not in PRODUCT_SEARCH_SORTS:
+        raise ValueError(f"Unsupported sort '{sort}'")
+
+    query = db.query(models.Product)
+    match = build_product_match_query(q)
+    if match:
+        matched = (
+            select(products_fts.c.rowid.label("product_id"), products_fts.c.rank.label("rank"))
+            .where(text("products_fts MATCH :match"))
+            .subquery()
+        )
+        query = query.join(matched, matched.c.product_id == models.Product.product_id).params(match=match)
+
+    if product_type:
+        query = query.filter(models.Product.product_type == product_type)
+    if min_price is not None:
+        query = query.filter(models.Product.price >= min_price)
+    if max_price is not None:
+        query = query.filter(models.Product.price <= max_price)
+    if min_rating is not None:
+        query = query.filter(models.Product.rating >= min_rating)
+
+    if sort == "relevance":
+        # bm25 rank is ascending (more negative = better); without a text query fall back to insertion order.
+        order_by = [matched.c.rank.asc()] if match else []
+    else:
+        order_by = list(PRODUCT_SEARCH_SORTS[sort])
+    order_by.append(models.Product.product_id.asc())
+
+    return query.order_by(*order_by).offset(skip).limit(limit).all()
 
 
 def create_product(db: Session, product: schemas.ProductCreate) -> models.Product:
     db_product = models.Product(**product.model_dump())
     db.add(db_product)
+    bump_catalog_version(db)
     db.commit()
     db.refresh(db_product)
     return db_product
 
 
 def update_product(db: Session, product_id: int, payload: schemas.ProductUpdate) -> Optional[models.Product]:
+    if payload.product_type is not None:
+        lock_for_write(db)
     db_product = get_product(db, product_id)
     if not db_product:
         return None
 
+    if payload.product_type is not None and payload.product_type != db_product.product_type:
+        move_product_sales_type(db, product_id, db_product.product_type, payload.product_type)
+    previous_stock = db_product.stock_quantity
     for field, value in payload.model_dump(exclude_unset=True).items():
         setattr(db_product, field, value)
+    queue_low_stock_alert(db, product_id, db_product.product_name, previous_stock, db_product.stock_quantity)
 
+    bump_catalog_version(db)
     db.commit()
     db.refresh(db_product)
     return db_product
@@ -150,11 +315,310 @@ def delete_product(db: Session, product_id: int) -> bool:
     db_product = get_product(db, product_id)
     if not db_product:
         return False
+    lock_for_write(db)
+    subtract_product_sales(db, db_product)
+    db.query(models.ProductSalesDaily).filter(models.ProductSalesDaily.product_id == product_id).delete(
+        synchronize_session=False
+    )
     db.delete(db_product)
+    bump_catalog_version(db)
     db.commit()
     return True
 
 
+def subtract_product_sales(db: Session, product: models.Product) -> None:
+    # Order lines cascade with the product while their orders stay, so only the line-level
+    # parts change: items sold, the rollup's units, and the product type's per-day rows.
+    rows = product_type_sales(db, product.product_id, product.product_type)
+    if not rows:
+        return
+    bump_sales_counters(db, items_sold=-sum(row["units"] for row in rows))
+    bump_sales_rollup(
+        db,
+        [{**row, "product_type": ALL_PRODUCT_TYPES, "orders": 0, "revenue": 0.0, "units": -row["units"]} for row in rows]
+        + [{**row, "orders": -row["orders"], "revenue": -row["revenue"], "units": -row["units"]} for row in rows],
+    )
+    drop_empty_sales_rollup(db, product.product_type)
+
+
+def move_product_sales_type(db: Session, product_id: int, old_type: str, new_type: str) -> None:
+    # The per-type rollup rows are keyed by the type at checkout time, so a type change
+    # moves the product's existing lines from the old type's rows to the new type's.
+    # Callers hold the write lock and run this before the product's new type is stored.
+    removed = product_type_sales(db, product_id, old_type)
+    if not removed:
+        return
+    added = product_type_sales(db, product_id, new_type)
+    bump_sales_rollup(
+        db,
+        [{**row, "orders": -row["orders"], "revenue": -row["revenue"], "units": -row["units"]} for row in removed]
+        + added,
+    )
+    drop_empty_sales_rollup(db, old_type)
+
+
+def product_type_sales(db: Session, product_id: int, product_type: str) -> list[dict]:
+    # Per-day rollup rows for one product's order lines counted under product_type. An
+    # order counts only where no other product of that type is on it, since the type row
+    # counts each order once.
+    day = func.date(models.Order.order_date)
+    other_line = aliased(models.OrderItem)
+    other_product = aliased(models.Product)
+    shares_type = (
+        select(other_line.order_item_id)
+        .join(other_product, other_product.product_id == other_line.product_id)
+        .where(
+            other_line.order_id == models.OrderItem.order_id,
+            other_line.product_id != product_id,
+            other_product.product_type == product_type,
+        )
+        .exists()
+    )
+    rows = db.execute(
+        select(
+            day.label("day"),
+            func.count(func.distinct(case((~shares_type, models.OrderItem.order_id)))).label("orders"),
+            func.sum(models.OrderItem.sub_total).label("revenue"),
+            func.sum(models.OrderItem.quantity).label("units"),
+        )
+        .join(models.Order, models.Order.order_id == models.OrderItem.order_id)
+        .where(models.OrderItem.product_id == product_id)
+        .group_by(day)
+    )
+    return [{**row._mapping, "product_type": product_type, "day": date.fromisoformat(row.day)} for row in rows]
+
+
+def drop_empty_sales_rollup(db: Session, product_type: str) -> None:
+    db.query(models.SalesDaily).filter(
+        models.SalesDaily.product_type == product_type, models.SalesDaily.orders <= 0
+    ).delete(synchronize_session=False)
+
+
+def queue_low_stock_alert(
+    db: Session, product_id: int, product_name: str, previous_stock: int, stock_quantity: int
+) -> None:
+    # Detected where stock is written, and only published if the transaction commits.
+    alert = low_stock_alert(product_id, product_name, previous_stock, stock_quantity)
+    if alert is not None:
+        publish_after_commit(db, LOW_STOCK_TOPIC, alert, dict)
+
+
+# Stay under SQLite's default limit on bound parameters per statement.
+SQLITE_MAX_IN_PARAMS = 900
+
+
+def upsert_products(db: Session, rows: list[dict], key: str = "name") -> tuple[int, int]:
+    """Insert or update one batch of validated product rows in a single transaction.
+
+    key="name" matches existing products by product_name, key="id" by product_id.
+    Rows identical to the stored product are skipped. Returns (inserted, updated).
+    """
+    if key not in ("name", "id"):
+        raise ValueError("key must be 'name' or 'id'")
+    key_field = "product_name" if key == "name" else "product_id"
+    key_column = getattr(models.Product, key_field)
+    fields = ("product_name", "product_type", "price", "stock_quantity")
+
+    # Type changes move sales rollup rows, which must not race checkouts.
+    lock_for_write(db)
+    existing: dict = {}
+    keys = [row[key_field] for row in rows]
+    for start in range(0, len(keys), SQLITE_MAX_IN_PARAMS):
+        matches = db.execute(
+            select(models.Product.product_id, *(getattr(models.Product, field) for field in fields))
+            .where(key_column.in_(keys[start:start + SQLITE_MAX_IN_PARAMS]))
+            .order_by(models.Product.product_id.desc())
+        )
+        # Names are not unique; like get_product_by_name, the lowest id wins.
+        for match in matches:
+            existing[getattr(match, key_field)] = match
+
+    inserts, text_updates, stale_search_rows, stock_price_updates = [], [], [], []
+    for row in rows:
+        current = existing.get(row[key_field])
+        if current is None:
+            inserts.append({**row, "rating": 0.0, "rating_sum": 0.0, "rating_count": 0})
+        elif row["product_name"] != current.product_name or row["product_type"] != current.product_type:
+            text_updates.append({f"b_{field}": row[field] for field in fields} | {"b_product_id": current.product_id})
+            stale_search_rows.append(
+                {
+                    "product_id": current.product_id,
+                    "product_name": current.product_name,
+                    "product_type": current.product_type,
+                }
+            )
+        elif row["price"] != current.price or row["stock_quantity"] != current.stock_quantity:
+            # Leaving name/type out of the SET keeps the search index untouched.
+            stock_price_updates.append(
+                {"b_product_id": current.product_id, "b_price": row["price"], "b_stock_quantity": row["stock_quantity"]}
+            )
+        if current is not None and row["stock_quantity"] < current.stock_quantity:
+            queue_low_stock_alert(
+                db, current.product_id, row["product_name"], current.stock_quantity, row["stock_quantity"]
+            )
+
+    # The FTS triggers flush FTS5's buffer on every row; while the marker row exists
+    # they stand down and this batch maintains the index with set-based statements.
+    # The marker only lives inside this transaction, so other writers never see it.
+    db.execute(text("INSERT INTO products_fts_bulk (active) VALUES (1)"))
+    if inserts:
+        last_id = db.execute(select(func.coalesce(func.max(models.Product.product_id), 0))).scalar()
+        db.execute(insert(models.Product.__table__), inserts)
+        db.execute(text(PRODUCT_FTS_INDEX_SQL + "WHERE product_id > :last_id"), {"last_id": last_id})
+        # Imports keyed by id may fill gaps below the previous maximum.
+        index_products_for_search(
+            db, [row["product_id"] for row in inserts if row.get("product_id", last_id + 1) <= last_id]
+        )
+    if text_updates:
+        db.execute(
+            text(
+                "INSERT INTO products_fts (products_fts, rowid, product_name, product_type) "
+                "VALUES ('delete', :product_id, :product_name, :product_type)"
+            ),
+            stale_search_rows,
+        )
+        # One product at a time, storing each new type before the next move: a move counts
+        # an order under a type only if none of its other lines already has that type.
+        for row, item in zip(stale_search_rows, text_updates):
+            new_type = item["b_product_type"]
+            if new_type != row["product_type"]:
+                move_product_sales_type(db, row["product_id"], row["product_type"], new_type)
+                db.execute(
+                    update(models.Product)
+                    .where(models.Product.product_id == row["product_id"])
+                    .values(product_type=new_type)
+                    .execution_options(synchronize_session=False)
+                )
+        db.execute(product_update_by_id(*fields), text_updates)
+        index_products_for_search(db, [item["b_product_id"] for item in text_updates])
+    if stock_price_updates:
+        db.execute(product_update_by_id("price", "stock_quantity"), stock_price_updates)
+    db.execute(text("DELETE FROM products_fts_bulk"))
+    bump_catalog_version(db)
+    db.commit()
+    return len(inserts), len(text_updates) + len(stock_price_updates)
+
+
+def product_update_by_id(*fields: str):
+    # Core executemany UPDATE; parameters are named b_<column> ("b_product_id" for the key).
+    products = models.Product.__table__
+    return (
+        update(products)
+        .where(products.c.product_id == bindparam("b_product_id"))
+        .values({field: bindparam(f"b_{field}") for field in fields})
+    )
+
+
+PRODUCT_FTS_INDEX_SQL = (
+    "INSERT INTO products_fts (rowid, product_name, product_type) "
+    "SELECT product_id, product_name, product_type FROM products "
+)
+
+
+def index_products_for_search(db: Session, product_ids: list[int]) -> None:
+    for start in range(0, len(product_ids), SQLITE_MAX_IN_PARAMS):
+        db.execute(
+            text(PRODUCT_FTS_INDEX_SQL + "WHERE product_id IN :ids").bindparams(bindparam("ids", expanding=True)),
+            {"ids": product_ids[start:start + SQLITE_MAX_IN_PARAMS]},
+        )
+
+
+def lock_for_write(db: Session) -> None:
+    # pysqlite only opens a transaction at the first DML statement. A no-op UPDATE takes
+    # SQLite's write lock up front (like BEGIN IMMEDIATE), so the reads that follow
+    # cannot be invalidated by another writer before this transaction commits.
+    db.execute(
+        update(models.Product)
+        .where(false())
+        .values(stock_quantity=models.Product.stock_quantity)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def apply_inventory_adjustments(
+    db: Session, items: list[schemas.InventoryAdjustment], atomic: bool = False
+) -> list[dict]:
+    lock_for_write(db)
+    product_ids = list({item.product_id for item in items})
+    stock: dict[int, int] = {}
+    names: dict[int, str] = {}
+    for start in range(0, len(product_ids), SQLITE_MAX_IN_PARAMS):
+        rows = db.execute(
+            select(models.Product.product_id, models.Product.stock_quantity, models.Product.product_name).where(
+                models.Product.product_id.in_(product_ids[start:start + SQLITE_MAX_IN_PARAMS])
+            )
+        )
+        for product_id, stock_quantity, product_name in rows:
+            stock[product_id] = stock_quantity
+            names[product_id] = product_name
+    original_stock = dict(stock)
+
+    # Items apply in request order, so repeated products see each other's changes.
+    results = []
+    changed: dict[int, int] = {}
+    for item in items:
+        result = {"product_id": item.product_id, "status": "applied", "error": None}
+        current = stock.get(item.product_id)
+        result["previous_stock"] = current
+        if current is None:
+            result.update(status="not_found", error="Product not found")
+        elif (item.delta is None) == (item.stock_quantity is None):
+            result.update(status="invalid", error="Provide exactly one of delta or stock_quantity")
+        elif item.expected_stock is not None and item.expected_stock != current:
+            result.update(status="conflict", error=f"Expected stock {item.expected_stock}, found {current}")
+        else:
+            new_stock = current + item.delta if item.delta is not None else item.stock_quantity
+            if new_stock < 0:
+                result.update(status="invalid", error=f"Stock cannot go below zero (current {current})")
+            else:
+                stock[item.product_id] = changed[item.product_id] = new_stock
+        result["stock_quantity"] = stock.get(item.product_id)
+        results.append(result)
+
+    failed = any(result["status"] != "applied" for result in results)
+    if atomic and failed:
+        db.rollback()
+        for result in results:
+            if result["status"] == "applied":
+                result.update(status="not_applied", stock_quantity=result["previous_stock"])
+        return results
+
+    if changed:
+        db.execute(
+            product_update_by_id("stock_quantity"),
+            [{"b_product_id": product_id, "b_stock_quantity": value} for product_id, value in changed.items()],
+        )
+        for product_id, value in changed.items():
+            queue_low_stock_alert(db, product_id, names[product_id], original_stock[product_id], value)
+        bump_catalog_version(db)
+    db.commit()
+    return results
+
+
+def iter_product_batches(db: Session, batch_size: int = 1000):
+    # Keyset batches of plain rows, so exports never hold the whole catalog.
+    columns = (
+        models.Product.product_id,
+        models.Product.product_name,
+        models.Product.product_type,
+        models.Product.price,
+        models.Product.stock_quantity,
+        models.Product.rating,
+    )
+    after_id = 0
+    while True:
+        rows = db.execute(
+            select(*columns)
+            .where(models.Product.product_id > after_id)
+            .order_by(models.Product.product_id.asc())
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return
+        yield rows
+        after_id = rows[-1].product_id
+
+
 def add_to_cart(db: Session, payload: schemas.CartAdd) -> Optional[models.CartItem]:
     customer = get_customer(db, payload.customer_id)
     product = get_product(db, payload.product_id)
@@ -189,6 +653,97 @@ def get_cart_items(db: Session, customer_id: int):
     return db.query(models.CartItem).filter(models.CartItem.customer_id == customer_id).all()
 
 
+def get_cart_summary(db: Session, customer_id: int) -> Optional[dict]:
+    # One joined read: product columns per line, with cart totals computed by window sums.
+    line_total = (models.Product.price * models.CartItem.quantity).label("line_total")
+    lines = db.execute(
+        select(
+            models.CartItem.cart_item_id,
+            models.CartItem.product_id,
+            models.Product.product_name,
+            models.Product.product_type,
+            models.Product.price,
+            models.Product.stock_quantity,
+            models.CartItem.quantity,
+            line_total,
+            (models.Product.stock_quantity >= models.CartItem.quantity).label("in_stock"),
+            func.sum(models.Product.price * models.CartItem.quantity).over().label("subtotal"),
+            func.sum(models.CartItem.quantity).over().label("total_quantity"),
+        )
+        .join(models.Product, models.Product.product_id == models.CartItem.product_id)
+        .where(models.CartItem.customer_id == customer_id)
+        .order_by(models.CartItem.cart_item_id.asc())
+    ).all()
+    # Cart lines imply the customer exists; only an empty cart needs the extra lookup.
+    if not lines and not get_customer(db, customer_id):
+        return None
+    subtotal = lines[0].subtotal if lines else 0.0
+    return {
+        "customer_id": customer_id,
+        "items": lines,
+        "item_count": len(lines),
+        "total_quantity": lines[0].total_quantity if lines else 0,
+        "subtotal": subtotal,
+        # No shipping or tax yet, so checkout charges exactly the subtotal.
+        "total": subtotal,
+        "has_out_of_stock": any(not line.in_stock for line in lines),
+    }
+
+
+def set_cart_items(db: Session, customer_id: int, items: list[schemas.CartLineSet], mode: str = "set") -> bool:
+    if not get_customer(db, customer_id):
+        return False
+
+    requested: dict[int, int] = {}
+    for item in items:
+        if mode == "merge":
+            requested[item.product_id] = requested.get(item.product_id, 0) + item.quantity
+        else:
+            requested[item.product_id] = item.quantity
+
+    stock = dict(
+        db.execute(
+            select(models.Product.product_id, models.Product.stock_quantity).where(
+                models.Product.product_id.in_(list(requested))
+            )
+        ).tuples().all()
+    )
+    existing = {
+        cart_item.product_id: cart_item
+        for cart_item in db.query(models.CartItem).filter(
+            models.CartItem.customer_id == customer_id,
+            models.CartItem.product_id.in_(list(requested)),
+        )
+    }
+
+    # Validate every line before touching the cart, so a batch applies fully or not at all.
+    quantities: dict[int, int] = {}
+    errors = []
+    for product_id, quantity in requested.items():
+        if product_id not in stock:
+            errors.append(f"Product {product_id} not found")
+            continue
+        if mode == "merge" and product_id in existing:
+            quantity += existing[product_id].quantity
+        if quantity > stock[product_id]:
+            errors.append(f"Product {product_id}: requested {quantity}, available stock {stock[product_id]}")
+        quantities[product_id] = quantity
+    if errors:
+        raise ValueError("; ".join(errors))
+
+    for product_id, quantity in quantities.items():
+        cart_item = existing.get(product_id)
+        if quantity == 0:
+            if cart_item is not None:
+                db.delete(cart_item)
+        elif cart_item is not None:
+            cart_item.quantity = quantity
+        else:
+            db.add(models.CartItem(customer_id=customer_id, product_id=product_id, quantity=quantity))
+    db.commit()
+    return True
+
+
 def update_cart_item(db: Session, cart_item_id: int, quantity: int) -> Optional[models.CartItem]:
     db_item = db.query(models.CartItem).filter(models.CartItem.cart_item_id == cart_item_id).first()
     if not db_item:
@@ -231,34 +786,159 @@ def create_notification(
         related_order_id=related_order_id,
     )
     db.add(note)
+    # Delivery happens off the request path; the outbox row commits with the notification.
+    db.add(models.NotificationOutbox(notification=note, channel=note.channel))
+    publish_after_commit(db, notification_topic(customer_id), note, notification_payload)
+    call_after_commit(db, lambda: unread_counts.adjust(customer_id, 1))
     return note
 
 
+def notification_topic(customer_id: int) -> str:
+    return f"notifications:{customer_id}"
+
+
+def notification_payload(note: models.Notification) -> dict:
+    return schemas.NotificationOut.model_validate(note).model_dump(mode="json")
+
+
+def claim_notification_outbox(db: Session, batch_size: int, lease_seconds: float, now: Optional[datetime] = None):
+    # One UPDATE claims the batch, so concurrent dispatchers never pick the same row.
+    # Rows whose lease ran out (dispatcher died mid-batch) become claimable again.
+    now = now or datetime.utcnow()
+    claim_token = uuid.uuid4().hex
+    outbox = models.NotificationOutbox
+    claimable = (
+        select(outbox.outbox_id)
+        .where(
+            or_(
+                and_(outbox.status == "PENDING", outbox.next_attempt_at <= now),
+                and_(outbox.status == "SENDING", outbox.claimed_until < now),
+            )
+        )
+        .order_by(outbox.outbox_id.asc())
+        .limit(batch_size)
+    )
+    db.execute(
+        update(outbox)
+        .where(outbox.outbox_id.in_(claimable))
+        .values(
+            status="SENDING",
+            claim_token=claim_token,
+            claimed_until=now + timedelta(seconds=lease_seconds),
+            attempts=outbox.attempts + 1,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    rows = (
+        db.query(outbox, models.Notification, models.Customer)
+        .outerjoin(models.Notification, models.Notification.notification_id == outbox.notification_id)
+        .outerjoin(models.Customer, models.Customer.customer_id == models.Notification.customer_id)
+        .filter(outbox.claim_token == claim_token)
+        .order_by(outbox.outbox_id.asc())
+        .all()
+    )
+    return claim_token, rows
+
+
+def release_outbox_claim(db: Session, claim_token: str, outbox_ids: list[int], **values) -> None:
+    if not outbox_ids:
+        return
+    db.execute(
+        update(models.NotificationOutbox)
+        .where(
+            models.NotificationOutbox.outbox_id.in_(outbox_ids),
+            models.NotificationOutbox.claim_token == claim_token,
+        )
+        .values(claim_token=None, claimed_until=None, **values)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def mark_outbox_sent(db: Session, claim_token: str, outbox_ids: list[int]) -> None:
+    release_outbox_claim(db, claim_token, outbox_ids, status="SENT", sent_at=datetime.utcnow(), last_error=None)
+
+
+def mark_outbox_retry(db: Session, claim_token: str, outbox_id: int, error: str, next_attempt_at: datetime) -> None:
+    release_outbox_claim(
+        db, claim_token, [outbox_id], status="PENDING", last_error=error[:255], next_attempt_at=next_attempt_at
+    )
+
+
+def mark_outbox_failed(db: Session, claim_token: str, outbox_id: int, error: str) -> None:
+    release_outbox_claim(db, claim_token, [outbox_id], status="FAILED", last_error=error[:255])
+
+
 def add_tracking_event(db: Session, order_id: int, status: str, note: Optional[str] = None) -> models.OrderTrackingEvent:
     event = models.OrderTrackingEvent(order_id=order_id, status=status, note=note)
     db.add(event)
+    publish_after_commit(db, tracking_topic(order_id), event, tracking_event_payload)
     return event
 
 
+def tracking_topic(order_id: int) -> str:
+    return f"tracking:{order_id}"
+
+
+def tracking_event_payload(event: models.OrderTrackingEvent) -> dict:
+    return schemas.TrackingEventOut.model_validate(event).model_dump(mode="json")
+
+
 def create_order_from_cart(db: Session, customer_id: int, payment_method: str) -> Optional[models.Order]:
+    # Lock before reading the cart: lines added by a concurrent request would otherwise be
+    # deleted with the cart below without being ordered, and the product types the rollup
+    # is keyed by could change underneath.
+    lock_for_write(db)
     customer = get_customer(db, customer_id)
     if not customer:
+        db.rollback()
         return None
 
-    cart_items = (
-        db.query(models.CartItem)
+    # One joined read of the cart with the product columns checkout needs.
+    cart_lines = (
+        db.query(
+            models.CartItem.product_id,
+            models.CartItem.quantity,
+            models.Product.price,
+            models.Product.stock_quantity,
+            models.Product.product_type,
+        )
+        .join(models.Product, models.Product.product_id == models.CartItem.product_id)
         .filter(models.CartItem.customer_id == customer_id)
+        .order_by(models.CartItem.product_id.asc())
         .all()
     )
-    if not cart_items:
+    if not cart_lines:
+        db.rollback()
         return None
 
-    # Validate stock before creating the order.
-    for item in cart_items:
-        if item.product.stock_quantity < item.quantity:
+    if any(line.stock_quantity < line.quantity for line in cart_lines):
+        db.rollback()
+        return None
+
+    # Reserve stock atomically: the WHERE clause rejects the update if a concurrent
+    # checkout already took the units, so stock can never go negative.
+    for line in cart_lines:
+        reserved = db.execute(
+            update(models.Product)
+            .where(
+                models.Product.product_id == line.product_id,
+                models.Product.stock_quantity >= line.quantity,
+            )
+            .values(stock_quantity=models.Product.stock_quantity - line.quantity)
+            .returning(models.Product.stock_quantity, models.Product.product_name)
+            .execution_options(synchronize_session=False)
+        ).first()
+        if reserved is None:
+            db.rollback()
             return None
+        # RETURNING gives the post-update stock, so the alert check is exact under concurrency.
+        queue_low_stock_alert(
+            db, line.product_id, reserved.product_name, reserved.stock_quantity + line.quantity, reserved.stock_quantity
+        )
 
-    total_amount = sum(item.product.price * item.quantity for item in cart_items)
+    total_amount = sum(line.price * line.quantity for line in cart_lines)
+    total_quantity = sum(line.quantity for line in cart_lines)
     order = models.Order(
         customer_id=customer_id,
         order_date=datetime.utcnow(),
@@ -269,17 +949,19 @@ def create_order_from_cart(db: Session, customer_id: int, payment_method: str) -
     db.add(order)
     db.flush()
 
-    for item in cart_items:
-        sub_total = item.product.price * item.quantity
-        db_item = models.OrderItem(
-            order_id=order.order_id,
-            product_id=item.product_id,
-            price=item.product.price,
-            quantity=item.quantity,
-            sub_total=sub_total,
-        )
-        item.product.stock_quantity -= item.quantity
-        db.add(db_item)
+    db.execute(
+        insert(models.OrderItem),
+        [
+            {
+                "order_id": order.order_id,
+                "product_id": line.product_id,
+                "price": line.price,
+                "quantity": line.quantity,
+                "sub_total": line.price * line.quantity,
+            }
+            for line in cart_lines
+        ],
+    )
 
     payment = models.Payment(
         order_id=order.order_id,
@@ -305,22 +987,55 @@ def create_order_from_cart(db: Session, customer_id: int, payment_method: str) -
         related_order_id=order.order_id,
     )
 
+    bump_sales_counters(db, orders=1, revenue=total_amount, items_sold=total_quantity, receipts=1)
+    bump_sales_rollup(db, order_sales_rollup(order, cart_lines))
+    bump_product_sales(
+        db,
+        [
+            {
+                "product_id": line.product_id,
+                "day": order.order_date.date(),
+                "units": line.quantity,
+                "revenue": line.price * line.quantity,
+            }
+            for line in cart_lines
+        ],
+    )
+
     db.query(models.CartItem).filter(models.CartItem.customer_id == customer_id).delete()
+    # Stock changed, so cached catalog responses are stale.
+    bump_catalog_version(db)
     db.commit()
     db.refresh(order)
     return order
 
 
+def query_orders(db: Session):
+    # OrderOut nests items and payment; load them in two batched queries instead of two per order.
+    return db.query(models.Order).options(
+        selectinload(models.Order.items),
+        selectinload(models.Order.payment),
+    )
+
+
 def get_order(db: Session, order_id: int) -> Optional[models.Order]:
-    return db.query(models.Order).filter(models.Order.order_id == order_id).first()
+    return query_orders(db).filter(models.Order.order_id == order_id).first()
 
 
 def list_orders_for_customer(db: Session, customer_id: int):
-    return db.query(models.Order).filter(models.Order.customer_id == customer_id).all()
+    return (
+        query_orders(db)
+        .filter(models.Order.customer_id == customer_id)
+        .order_by(models.Order.order_id.asc())
+        .all()
+    )
 
 
-def list_orders(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Order).offset(skip).limit(limit).all()
+def list_orders(db: Session, skip: int = 0, limit: int = 100, after_id: Optional[int] = None):
+    query = query_orders(db).order_by(models.Order.order_id.asc())
+    if after_id is not None:
+        return query.filter(models.Order.order_id > after_id).limit(limit).all()
+    return query.offset(skip).limit(limit).all()
 
 
 def get_payment_by_id(db: Session, payment_id: int) -> Optional[models.Payment]:
@@ -331,14 +1046,42 @@ def get_payment_by_order_id(db: Session, order_id: int) -> Optional[models.Payme
     return db.query(models.Payment).filter(models.Payment.order_id == order_id).first()
 
 
-def list_payments(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Payment).offset(skip).limit(limit).all()
+def list_payments(db: Session, skip: int = 0, limit: int = 100, after_id: Optional[int] = None):
+    query = db.query(models.Payment).order_by(models.Payment.payment_id.asc())
+    if after_id is not None:
+        return query.filter(models.Payment.payment_id > after_id).limit(limit).all()
+    return query.offset(skip).limit(limit).all()
+
+
+def list_payments_for_period(
+    db: Session,
+    start: datetime,
+    end: datetime,
+    after_id: Optional[int] = None,
+    limit: int = 100,
+):
+    query = (
+        db.query(models.Payment)
+        .join(models.Order, models.Order.order_id == models.Payment.order_id)
+        .filter(models.Order.order_date >= start, models.Order.order_date < end)
+        .order_by(models.Payment.payment_id.asc())
+    )
+    if after_id is not None:
+        query = query.filter(models.Payment.payment_id > after_id)
+    return query.limit(limit).all()
 
 
 def update_payment_status(db: Session, payment_id: int, status: str) -> Optional[models.Payment]:
+    # The receipts counter moves by the status transition, so read the current status
+    # under the write lock; two concurrent changes would otherwise both apply it.
+    lock_for_write(db)
     payment = get_payment_by_id(db, payment_id)
     if not payment:
         return None
+    was_receipt = payment.status == "RECEIPT_GENERATED"
+    is_receipt = status == "RECEIPT_GENERATED"
+    if was_receipt != is_receipt:
+        bump_sales_counters(db, receipts=1 if is_receipt else -1)
     payment.status = status
     # This project does not do real payment capture; status can be updated manually.
     if status.upper() == "PAID" and payment.paid_at is None:
@@ -426,19 +1169,140 @@ def create_review(db: Session, payload: schemas.ReviewCreate) -> Optional[models
 
     db_review = models.Review(**payload.model_dump())
     db.add(db_review)
-    db.flush()
-
-    reviews = db.query(models.Review).filter(models.Review.product_id == payload.product_id).all()
-    if reviews:
-        product.rating = sum(r.rating for r in reviews) / len(reviews)
+    # One relative UPDATE keeps sum, count, average and histogram consistent under concurrent
+    # reviews; SQLite evaluates every SET expression against the pre-update row.
+    star_count = rating_histogram_column(rating_stars(payload.rating))
+    db.query(models.Product).filter(models.Product.product_id == payload.product_id).update(
+        {
+            models.Product.rating_sum: models.Product.rating_sum + payload.rating,
+            models.Product.rating_count: models.Product.rating_count + 1,
+            models.Product.rating: (models.Product.rating_sum + payload.rating) / (models.Product.rating_count + 1),
+            star_count: star_count + 1,
+        },
+        synchronize_session=False,
+    )
 
+    bump_catalog_version(db)
     db.commit()
     db.refresh(db_review)
     return db_review
 
 
-def list_reviews_by_product(db: Session, product_id: int):
-    return db.query(models.Review).filter(models.Review.product_id == product_id).all()
+RATING_STARS = range(1, 6)
+
+
+def rating_stars(rating: float) -> int:
+    # Round half up (4.5 -> 5), unlike Python's round() which rounds half to even.
+    return min(5, max(1, int(rating + 0.5)))
+
+
+def rating_histogram_column(stars: int):
+    return getattr(models.Product, f"rating_{stars}_count")
+
+
+def rating_histogram(product: models.Product) -> dict:
+    return {
+        "product_id": product.product_id,
+        "rating": product.rating,
+        "rating_count": product.rating_count,
+        "histogram": [{"stars": stars, "count": getattr(product, f"rating_{stars}_count")} for stars in RATING_STARS],
+    }
+
+
+def subtract_customer_ratings(db: Session, customer_id: int) -> int:
+    # Inverse of create_review's relative UPDATE, one row per reviewed product, so the
+    # averages and star histograms stay exact when a customer's reviews are deleted with them.
+    removed = db.execute(
+        select(
+            models.Review.product_id,
+            func.sum(models.Review.rating).label("rating_sum"),
+            func.count(models.Review.review_id).label("rating_count"),
+            *(
+                func.count(case((cast(models.Review.rating + 0.5, Integer) == stars, 1))).label(f"rating_{stars}_count")
+                for stars in RATING_STARS
+            ),
+        )
+        .where(models.Review.customer_id == customer_id)
+        .group_by(models.Review.product_id)
+    ).all()
+    if not removed:
+        return 0
+    products = models.Product.__table__
+    rating_sum = products.c.rating_sum - bindparam("b_rating_sum")
+    rating_count = products.c.rating_count - bindparam("b_rating_count")
+    db.execute(
+        update(products)
+        .where(products.c.product_id == bindparam("b_product_id"))
+        .values(
+            rating_sum=rating_sum,
+            rating_count=rating_count,
+            rating=func.coalesce(rating_sum / func.nullif(rating_count, 0), 0.0),
+            **{
+                f"rating_{stars}_count": products.c[f"rating_{stars}_count"] - bindparam(f"b_rating_{stars}_count")
+                for stars in RATING_STARS
+            },
+        ),
+        [{f"b_{key}": value for key, value in row._mapping.items()} for row in removed],
+    )
+    return len(removed)
+
+
+def rebuild_product_ratings(db: Session) -> int:
+    review_sum = (
+        select(func.coalesce(func.sum(models.Review.rating), 0.0))
+        .where(models.Review.product_id == models.Product.product_id)
+        .scalar_subquery()
+    )
+    review_count = (
+        select(func.count(models.Review.review_id))
+        .where(models.Review.product_id == models.Product.product_id)
+        .scalar_subquery()
+    )
+    updated = db.query(models.Product).update(
+        {
+            models.Product.rating_sum: review_sum,
+            models.Product.rating_count: review_count,
+            models.Product.rating: func.coalesce(review_sum / func.nullif(review_count, 0), 0.0),
+            **{
+                rating_histogram_column(stars): select(func.count(models.Review.review_id))
+                .where(
+                    models.Review.product_id == models.Product.product_id,
+                    cast(models.Review.rating + 0.5, Integer) == stars,
+                )
+                .scalar_subquery()
+                for stars in RATING_STARS
+            },
+        },
+        synchronize_session=False,
+    )
+    bump_catalog_version(db)
+    db.commit()
+    return updated
+
+
+REVIEW_SORTS = ("recent", "rating")
+
+
+def review_sort_columns(sort: str) -> tuple:
+    # Both orders match an index: (product_id, created_at) and (product_id, rating),
+    # with review_id (the rowid) as the tie-breaker that makes the keyset unique.
+    if sort == "rating":
+        return models.Review.rating, models.Review.review_id
+    return models.Review.created_at, models.Review.review_id
+
+
+def list_reviews_by_product(
+    db: Session,
+    product_id: int,
+    sort: str = "recent",
+    limit: int = 50,
+    before: Optional[tuple] = None,
+):
+    columns = review_sort_columns(sort)
+    query = db.query(models.Review).filter(models.Review.product_id == product_id)
+    if before is not None:
+        query = query.filter(tuple_(*columns) < tuple_(*before))
+    return query.order_by(*(column.desc() for column in columns)).limit(limit).all()
 
 
 def list_tracking_events_for_order(db: Session, order_id: int):
@@ -450,15 +1314,71 @@ def list_tracking_events_for_order(db: Session, order_id: int):
     )
 
 
-def list_notifications_for_customer(db: Session, customer_id: int):
+def list_notifications_for_customer(
+    db: Session,
+    customer_id: int,
+    limit: int = 50,
+    before: Optional[tuple[datetime, int]] = None,
+    unread_only: bool = False,
+):
+    query = db.query(models.Notification).filter(models.Notification.customer_id == customer_id)
+    if unread_only:
+        query = query.filter(models.Notification.is_read == 0)
+    if before is not None:
+        # Seek past the last (created_at, id) seen; served by ix_notifications_customer_created.
+        query = query.filter(
+            tuple_(models.Notification.created_at, models.Notification.notification_id) < tuple_(*before)
+        )
     return (
-        db.query(models.Notification)
-        .filter(models.Notification.customer_id == customer_id)
-        .order_by(models.Notification.created_at.desc())
+        query.order_by(models.Notification.created_at.desc(), models.Notification.notification_id.desc())
+        .limit(limit)
         .all()
     )
 
 
+def count_unread_notifications(db: Session, customer_id: int) -> int:
+    cached = unread_counts.get(customer_id)
+    if cached is not None:
+        return cached
+    count = (
+        db.query(func.count(models.Notification.notification_id))
+        .filter(models.Notification.customer_id == customer_id, models.Notification.is_read == 0)
+        .scalar()
+    )
+    unread_counts.put(customer_id, count)
+    return count
+
+
+def mark_notification_read(db: Session, customer_id: int, notification_id: int) -> Optional[models.Notification]:
+    note = (
+        db.query(models.Notification)
+        .filter(
+            models.Notification.notification_id == notification_id,
+            models.Notification.customer_id == customer_id,
+        )
+        .first()
+    )
+    if not note:
+        return None
+    if not note.is_read:
+        note.is_read = 1
+        call_after_commit(db, lambda: unread_counts.adjust(customer_id, -1))
+        db.commit()
+        db.refresh(note)
+    return note
+
+
+def mark_all_notifications_read(db: Session, customer_id: int) -> int:
+    updated = (
+        db.query(models.Notification)
+        .filter(models.Notification.customer_id == customer_id, models.Notification.is_read == 0)
+        .update({models.Notification.is_read: 1}, synchronize_session=False)
+    )
+    call_after_commit(db, lambda: unread_counts.invalidate(customer_id))
+    db.commit()
+    return updated
+
+
 def list_services(db: Session):
     return db.query(models.Service).all()
 
@@ -531,38 +1451,452 @@ def delete_article(db: Session, article_id: int) -> bool:
     return True
 
 
-def get_sales_summary(db: Session) -> dict:
-    orders = db.query(models.Order).all()
-    total_orders = len(orders)
-    total_revenue = sum(order.total_amount for order in orders)
-    total_items_sold = sum(item.quantity for order in orders for item in order.items)
-    payment_receipts_generated = (
-        db.query(models.Payment).filter(models.Payment.status == "RECEIPT_GENERATED").count()
+SALES_COUNTER_ID = 1
+
+
+def compute_sales_summary(db: Session, customer_id: Optional[int] = None) -> dict:
+    orders = db.query(
+        func.count(models.Order.order_id),
+        func.coalesce(func.sum(models.Order.total_amount), 0.0),
+    )
+    items = db.query(func.coalesce(func.sum(models.OrderItem.quantity), 0)).join(models.Order)
+    receipts = db.query(func.count(models.Payment.payment_id)).filter(
+        models.Payment.status == "RECEIPT_GENERATED"
     )
+    if customer_id is not None:
+        orders = orders.filter(models.Order.customer_id == customer_id)
+        items = items.filter(models.Order.customer_id == customer_id)
+        receipts = receipts.join(models.Order).filter(models.Order.customer_id == customer_id)
+
+    total_orders, total_revenue = orders.one()
     return {
         "total_orders": total_orders,
-        "total_revenue": total_revenue,
-        "total_items_sold": total_items_sold,
-        "payment_receipts_generated": payment_receipts_generated,
+        "total_revenue": float(total_revenue),
+        "total_items_sold": int(items.scalar()),
+        "payment_receipts_generated": receipts.scalar(),
     }
 
 
-def get_inventory_summary(db: Session, low_stock_threshold: int = 5) -> dict:
-    products = db.query(models.Product).all()
+def bump_sales_counters(
+    db: Session,
+    orders: int = 0,
+    revenue: float = 0.0,
+    items_sold: int = 0,
+    receipts: int = 0,
+) -> None:
+    # Relative UPDATE so concurrent writers never lose increments. A missing row is
+    # rebuilt from source tables on the next read, so a no-op here is safe.
+    db.query(models.SalesCounter).filter(models.SalesCounter.counter_id == SALES_COUNTER_ID).update(
+        {
+            models.SalesCounter.total_orders: models.SalesCounter.total_orders + orders,
+            models.SalesCounter.total_revenue: models.SalesCounter.total_revenue + revenue,
+            models.SalesCounter.total_items_sold: models.SalesCounter.total_items_sold + items_sold,
+            models.SalesCounter.payment_receipts_generated: (
+                models.SalesCounter.payment_receipts_generated + receipts
+            ),
+            models.SalesCounter.updated_at: datetime.utcnow(),
+        },
+        synchronize_session=False,
+    )
+
+
+def rebuild_sales_counters(db: Session) -> models.SalesCounter:
+    # Hold the write lock while aggregating so a checkout cannot commit between the
+    # reads and the upsert and be missed (or overwritten) by it.
+    lock_for_write(db)
+    summary = compute_sales_summary(db)
+    stmt = sqlite_insert(models.SalesCounter).values(
+        counter_id=SALES_COUNTER_ID,
+        updated_at=datetime.utcnow(),
+        **summary,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[models.SalesCounter.counter_id],
+        set_={**summary, "updated_at": stmt.excluded.updated_at},
+    )
+    db.execute(stmt)
+    db.commit()
+    return db.get(models.SalesCounter, SALES_COUNTER_ID)
+
+
+def get_sales_summary(db: Session, use_counters: bool = True) -> dict:
+    if not use_counters:
+        return compute_sales_summary(db)
+
+    counters = db.get(models.SalesCounter, SALES_COUNTER_ID)
+    if counters is None:
+        counters = rebuild_sales_counters(db)
     return {
-        "total_products": len(products),
-        "out_of_stock": sum(1 for p in products if p.stock_quantity == 0),
-        "low_stock": sum(1 for p in products if 0 < p.stock_quantity <= low_stock_threshold),
+        "total_orders": counters.total_orders,
+        "total_revenue": counters.total_revenue,
+        "total_items_sold": counters.total_items_sold,
+        "payment_receipts_generated": counters.payment_receipts_generated,
+    }
+
+
+ALL_PRODUCT_TYPES = ""
+SALES_ROLLUP_COLUMNS = ("product_type", "day", "orders", "revenue", "units")
+
+
+def sales_rollup_selects(customer_id: Optional[int] = None) -> tuple:
+    # Source-table aggregates per (product_type, day): the all-types totals from orders,
+    # and per-type totals from order lines joined to their product's current type.
+    day = func.date(models.Order.order_date)
+    order_units = (
+        select(models.OrderItem.order_id, func.sum(models.OrderItem.quantity).label("units"))
+        .group_by(models.OrderItem.order_id)
+        .subquery()
+    )
+    totals = (
+        select(
+            literal(ALL_PRODUCT_TYPES).label("product_type"),
+            day.label("day"),
+            func.count(models.Order.order_id).label("orders"),
+            func.sum(models.Order.total_amount).label("revenue"),
+            func.coalesce(func.sum(order_units.c.units), 0).label("units"),
+        )
+        .select_from(models.Order)
+        .outerjoin(order_units, order_units.c.order_id == models.Order.order_id)
+        .group_by(day)
+    )
+    by_type = (
+        select(
+            models.Product.product_type,
+            day.label("day"),
+            func.count(func.distinct(models.Order.order_id)).label("orders"),
+            func.sum(models.OrderItem.sub_total).label("revenue"),
+            func.sum(models.OrderItem.quantity).label("units"),
+        )
+        .select_from(models.OrderItem)
+        .join(models.Order, models.Order.order_id == models.OrderItem.order_id)
+        .join(models.Product, models.Product.product_id == models.OrderItem.product_id)
+        .group_by(models.Product.product_type, day)
+    )
+    if customer_id is not None:
+        totals = totals.where(models.Order.customer_id == customer_id)
+        by_type = by_type.where(models.Order.customer_id == customer_id)
+    return totals, by_type
+
+
+def compute_sales_rollup(db: Session, customer_id: Optional[int] = None) -> list[dict]:
+    return [
+        {**row._mapping, "day": date.fromisoformat(row.day)}
+        for stmt in sales_rollup_selects(customer_id)
+        for row in db.execute(stmt)
+    ]
+
+
+def order_sales_rollup(order: models.Order, lines) -> list[dict]:
+    day = order.order_date.date()
+    rows = {
+        ALL_PRODUCT_TYPES: {
+            "product_type": ALL_PRODUCT_TYPES,
+            "day": day,
+            "orders": 1,
+            "revenue": order.total_amount,
+            "units": sum(line.quantity for line in lines),
+        }
+    }
+    for line in lines:
+        row = rows.setdefault(
+            line.product_type,
+            {"product_type": line.product_type, "day": day, "orders": 1, "revenue": 0.0, "units": 0},
+        )
+        row["revenue"] += line.price * line.quantity
+        row["units"] += line.quantity
+    return list(rows.values())
+
+
+def bump_sales_rollup(db: Session, rows: list[dict]) -> None:
+    # Relative upsert, like the sales counters, so concurrent checkouts never lose increments.
+    if not rows:
+        return
+    rollup = models.SalesDaily
+    stmt = sqlite_insert(rollup)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[rollup.product_type, rollup.day],
+        set_={
+            "orders": rollup.orders + stmt.excluded.orders,
+            "revenue": rollup.revenue + stmt.excluded.revenue,
+            "units": rollup.units + stmt.excluded.units,
+        },
+    )
+    db.execute(stmt, rows)
+
+
+def rebuild_sales_rollup(db: Session) -> int:
+    db.query(models.SalesDaily).delete(synchronize_session=False)
+    for stmt in sales_rollup_selects():
+        db.execute(insert(models.SalesDaily).from_select(SALES_ROLLUP_COLUMNS, stmt))
+    db.commit()
+    return db.query(func.count()).select_from(models.SalesDaily).scalar()
+
+
+def sales_period_start(bucket: str):
+    day = models.SalesDaily.day
+    if bucket == "week":
+        # Weeks start on Monday: step to the week's Sunday, then back six days.
+        return func.date(day, "weekday 0", "-6 days")
+    if bucket == "month":
+        return func.date(day, "start of month")
+    return day
+
+
+def get_sales_timeseries(
+    db: Session,
+    start: date,
+    end: date,
+    bucket: str = "day",
+    product_type: Optional[str] = None,
+    by_type: bool = False,
+) -> list[dict]:
+    rollup = models.SalesDaily
+    period_start = sales_period_start(bucket).label("period_start")
+    group_type = rollup.product_type if by_type else literal(product_type).label("product_type")
+    stmt = select(
+        period_start,
+        group_type,
+        func.sum(rollup.orders).label("orders"),
+        func.sum(rollup.revenue).label("revenue"),
+        func.sum(rollup.units).label("units"),
+    ).where(rollup.day.between(start, end))
+    if by_type:
+        stmt = stmt.where(rollup.product_type != ALL_PRODUCT_TYPES).group_by(period_start, rollup.product_type)
+    else:
+        stmt = stmt.where(rollup.product_type == (product_type or ALL_PRODUCT_TYPES)).group_by(period_start)
+
+    return [
+        {
+            "period_start": row.period_start,
+            "product_type": row.product_type,
+            "orders": row.orders,
+            "revenue": round(row.revenue, 2),
+            "units": row.units,
+            "average_order_value": round(row.revenue / row.orders, 2) if row.orders else 0.0,
+        }
+        for row in db.execute(stmt.order_by(period_start, group_type))
+    ]
+
+
+SALES_WINDOW_STATE_ID = 1
+# Rolling best-seller windows: suffix of the products' counter columns -> days covered.
+SALES_WINDOWS = {"7d": 7, "30d": 30}
+BEST_SELLER_WINDOWS = ("all", *SALES_WINDOWS)
+
+
+def best_seller_columns(window: str) -> tuple:
+    if window == "all":
+        return models.Product.units_sold, models.Product.revenue
+    return getattr(models.Product, f"units_sold_{window}"), getattr(models.Product, f"revenue_{window}")
+
+
+def product_sales_increment():
+    # Core executemany UPDATE adding b_units/b_revenue (and the per-window amounts) to a product.
+    products = models.Product.__table__
+    values = {
+        "units_sold": products.c.units_sold + bindparam("b_units"),
+        "revenue": products.c.revenue + bindparam("b_revenue"),
+    }
+    for suffix in SALES_WINDOWS:
+        values[f"units_sold_{suffix}"] = products.c[f"units_sold_{suffix}"] + bindparam(f"b_units_{suffix}")
+        values[f"revenue_{suffix}"] = products.c[f"revenue_{suffix}"] + bindparam(f"b_revenue_{suffix}")
+    return update(products).where(products.c.product_id == bindparam("b_product_id")).values(values)
+
+
+def compute_product_sales(db: Session, customer_id: Optional[int] = None) -> list[dict]:
+    day = func.date(models.Order.order_date)
+    stmt = (
+        select(
+            models.OrderItem.product_id,
+            day.label("day"),
+            func.sum(models.OrderItem.quantity).label("units"),
+            func.sum(models.OrderItem.sub_total).label("revenue"),
+        )
+        .join(models.Order, models.Order.order_id == models.OrderItem.order_id)
+        .group_by(models.OrderItem.product_id, day)
+    )
+    if customer_id is not None:
+        stmt = stmt.where(models.Order.customer_id == customer_id)
+    return [{**row._mapping, "day": date.fromisoformat(row.day)} for row in db.execute(stmt)]
+
+
+def bump_product_sales(db: Session, rows: list[dict]) -> None:
+    # rows: {product_id, day, units, revenue}; negative amounts take sales back out.
+    if not rows:
+        return
+    daily = models.ProductSalesDaily
+    stmt = sqlite_insert(daily)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[daily.product_id, daily.day],
+        set_={"units": daily.units + stmt.excluded.units, "revenue": daily.revenue + stmt.excluded.revenue},
+    )
+    db.execute(stmt, rows)
+
+    # A day counts toward a window while it is inside that window as of the last rollover;
+    # the rollover takes it back out once it ages past the window.
+    state = db.get(models.SalesWindowState, SALES_WINDOW_STATE_ID)
+    as_of = state.as_of if state is not None else None
+    updates = []
+    for row in rows:
+        params = {"b_product_id": row["product_id"], "b_units": row["units"], "b_revenue": row["revenue"]}
+        for suffix, days in SALES_WINDOWS.items():
+            inside = as_of is None or row["day"] > as_of - timedelta(days=days)
+            params[f"b_units_{suffix}"] = row["units"] if inside else 0
+            params[f"b_revenue_{suffix}"] = row["revenue"] if inside else 0.0
+        updates.append(params)
+    db.execute(product_sales_increment(), updates)
+
+
+def set_sales_window_state(db: Session, as_of: date) -> None:
+    stmt = sqlite_insert(models.SalesWindowState).values(state_id=SALES_WINDOW_STATE_ID, as_of=as_of)
+    db.execute(stmt.on_conflict_do_update(index_elements=["state_id"], set_={"as_of": as_of}))
+
+
+def rebuild_product_sales(db: Session, today: Optional[date] = None) -> int:
+    today = today or datetime.utcnow().date()
+    lock_for_write(db)
+    daily = models.ProductSalesDaily
+    day = func.date(models.Order.order_date)
+    db.query(daily).delete(synchronize_session=False)
+    db.execute(
+        insert(daily).from_select(
+            ["product_id", "day", "units", "revenue"],
+            select(
+                models.OrderItem.product_id,
+                day,
+                func.sum(models.OrderItem.quantity),
+                func.sum(models.OrderItem.sub_total),
+            )
+            .join(models.Order, models.Order.order_id == models.OrderItem.order_id)
+            .group_by(models.OrderItem.product_id, day),
+        )
+    )
+
+    def bucket_total(column, since: Optional[date] = None):
+        stmt = select(func.coalesce(func.sum(column), 0)).where(daily.product_id == models.Product.product_id)
+        if since is not None:
+            stmt = stmt.where(daily.day >= since)
+        return stmt.scalar_subquery()
+
+    values = {models.Product.units_sold: bucket_total(daily.units), models.Product.revenue: bucket_total(daily.revenue)}
+    for suffix, days in SALES_WINDOWS.items():
+        since = today - timedelta(days=days - 1)
+        units_column, revenue_column = best_seller_columns(suffix)
+        values[units_column] = bucket_total(daily.units, since)
+        values[revenue_column] = bucket_total(daily.revenue, since)
+    db.query(models.Product).update(values, synchronize_session=False)
+    set_sales_window_state(db, today)
+    bump_catalog_version(db)
+    db.commit()
+    return db.query(func.count()).select_from(daily).scalar()
+
+
+def roll_sales_windows(db: Session, today: Optional[date] = None) -> bool:
+    # Moves the 7d/30d counters forward to today by subtracting the daily buckets that
+    # left each window. Runs at most once a day; returns whether anything changed.
+    today = today or datetime.utcnow().date()
+    lock_for_write(db)
+    state = db.get(models.SalesWindowState, SALES_WINDOW_STATE_ID, populate_existing=True)
+    if state is None:
+        rebuild_product_sales(db, today)
+        return True
+    if state.as_of >= today:
+        db.rollback()
+        return False
+
+    daily = models.ProductSalesDaily
+
+    def expired_total(column, expired):
+        return (
+            select(func.coalesce(func.sum(column), 0))
+            .where(daily.product_id == models.Product.product_id, expired)
+            .scalar_subquery()
+        )
+
+    for suffix, days in SALES_WINDOWS.items():
+        # The window as of D covers [D - days + 1, D]; these days were in it at as_of but not today.
+        expired = daily.day.between(state.as_of - timedelta(days=days - 1), today - timedelta(days=days))
+        units_column, revenue_column = best_seller_columns(suffix)
+        db.query(models.Product).filter(
+            models.Product.product_id.in_(select(daily.product_id).where(expired))
+        ).update(
+            {
+                units_column: units_column - expired_total(daily.units, expired),
+                revenue_column: revenue_column - expired_total(daily.revenue, expired),
+            },
+            synchronize_session=False,
+        )
+    set_sales_window_state(db, today)
+    bump_catalog_version(db)
+    db.commit()
+    return True
+
+
+def best_sellers_query(window: str = "all", product_type: Optional[str] = None, limit: int = 10):
+    # Top-N straight off the counter's index; no aggregation over orders on the read path.
+    units_column, revenue_column = best_seller_columns(window)
+    stmt = select(
+        models.Product.product_id,
+        models.Product.product_name,
+        models.Product.product_type,
+        models.Product.price,
+        models.Product.rating,
+        models.Product.stock_quantity,
+        units_column.label("units_sold"),
+        revenue_column.label("revenue"),
+    ).where(units_column > 0)
+    if product_type:
+        stmt = stmt.where(models.Product.product_type == product_type)
+    return stmt.order_by(units_column.desc(), models.Product.product_id.desc()).limit(limit)
+
+
+def list_best_sellers(db: Session, window: str = "all", product_type: Optional[str] = None, limit: int = 10):
+    return db.execute(best_sellers_query(window, product_type, limit)).all()
+
+
+def get_inventory_summary(db: Session, low_stock_threshold: int = LOW_STOCK_THRESHOLD) -> dict:
+    # The conditional counts only range-scan ix_products_stock_quantity up to the threshold.
+    stock = models.Product.stock_quantity
+    total_products = select(func.count(models.Product.product_id)).scalar_subquery()
+    total, out_of_stock, low_stock = db.execute(
+        select(
+            total_products,
+            func.count(case((stock <= 0, 1))),
+            func.count(case((stock > 0, 1))),
+        ).where(stock <= low_stock_threshold)
+    ).one()
+    return {
+        "total_products": total,
+        "out_of_stock": out_of_stock,
+        "low_stock": low_stock,
         "low_stock_threshold": low_stock_threshold,
     }
 
 
+def list_low_stock_products(
+    db: Session,
+    low_stock_threshold: int = LOW_STOCK_THRESHOLD,
+    limit: int = 50,
+    after: Optional[tuple[int, int]] = None,
+    include_out_of_stock: bool = True,
+):
+    # Lowest stock first; (stock_quantity, product_id) is the order of ix_products_stock_quantity.
+    stock = models.Product.stock_quantity
+    stmt = select(models.Product).where(stock <= low_stock_threshold)
+    if not include_out_of_stock:
+        stmt = stmt.where(stock > 0)
+    if after is not None:
+        stmt = stmt.where(tuple_(stock, models.Product.product_id) > tuple_(*after))
+    return db.scalars(stmt.order_by(stock.asc(), models.Product.product_id.asc()).limit(limit)).all()
+
+
 def get_feedback_summary(db: Session) -> dict:
-    reviews = db.query(models.Review).all()
-    total_reviews = len(reviews)
-    average_rating = (sum(r.rating for r in reviews) / total_reviews) if total_reviews else 0.0
+    total_reviews, average_rating = db.query(
+        func.count(models.Review.review_id),
+        func.coalesce(func.avg(models.Review.rating), 0.0),
+    ).one()
     top_products = (
-        db.query(models.Product)
+        db.query(models.Product.product_id, models.Product.product_name, models.Product.rating)
         .order_by(models.Product.rating.desc())
         .limit(5)
         .all()
@@ -0,0 +1,106 @@
+from datetime import date, datetime
+from typing import Optional
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import crud
+import models
+
+# Async counterparts of the hot read paths in crud.py. Writes stay in crud.py on the sync session.
+
+
+async def get_product(db: AsyncSession, product_id: int) -> Optional[models.Product]:
+    return await db.get(models.Product, product_id)
+
+
+async def list_products(db: AsyncSession, skip: int = 0, limit: int = 100, after_id: Optional[int] = None):
+    stmt = select(models.Product).order_by(models.Product.product_id.asc())
+    if after_id is not None:
+        stmt = stmt.where(models.Product.product_id > after_id)
+    else:
+        stmt = stmt.offset(skip)
+    result = await db.execute(stmt.limit(limit))
+    return result.scalars().all()
+
+
+async def list_reviews_by_product(
+    db: AsyncSession,
+    product_id: int,
+    sort: str = "recent",
+    limit: int = 50,
+    before: Optional[tuple] = None,
+):
+    columns = crud.review_sort_columns(sort)
+    stmt = select(models.Review).where(models.Review.product_id == product_id)
+    if before is not None:
+        stmt = stmt.where(tuple_(*columns) < tuple_(*before))
+    result = await db.execute(stmt.order_by(*(column.desc() for column in columns)).limit(limit))
+    return result.scalars().all()
+
+
+async def order_exists(db: AsyncSession, order_id: int) -> bool:
+    result = await db.execute(select(models.Order.order_id).where(models.Order.order_id == order_id))
+    return result.first() is not None
+
+
+async def list_best_sellers(
+    db: AsyncSession, window: str = "all", product_type: Optional[str] = None, limit: int = 10
+):
+    result = await db.execute(crud.best_sellers_query(window, product_type, limit))
+    return result.all()
+
+
+async def sales_windows_as_of(db: AsyncSession) -> Optional[date]:
+    state = await db.get(models.SalesWindowState, crud.SALES_WINDOW_STATE_ID)
+    return state.as_of if state is not None else None
+
+
+async def catalog_version(db: AsyncSession) -> tuple[str, int]:
+    result = await db.execute(
+        select(models.CatalogVersion.epoch, models.CatalogVersion.version).where(
+            models.CatalogVersion.version_id == crud.CATALOG_VERSION_ID
+        )
+    )
+    row = result.first()
+    # No row until ensure_runtime_schema or the first catalog write creates it.
+    return (row.epoch, row.version) if row is not None else ("0", 0)
+
+
+async def list_tracking_events_for_order(db: AsyncSession, order_id: int, after_id: Optional[int] = None):
+    stmt = select(models.OrderTrackingEvent).where(models.OrderTrackingEvent.order_id == order_id)
+    if after_id is not None:
+        stmt = stmt.where(models.OrderTrackingEvent.event_id > after_id)
+    result = await db.execute(
+        stmt.order_by(models.OrderTrackingEvent.created_at.asc(), models.OrderTrackingEvent.event_id.asc())
+    )
+    return result.scalars().all()
+
+
+async def list_notifications_for_customer(
+    db: AsyncSession,
+    customer_id: int,
+    limit: int = 50,
+    before: Optional[tuple[datetime, int]] = None,
+    unread_only: bool = False,
+):
+    stmt = select(models.Notification).where(models.Notification.customer_id == customer_id)
+    if unread_only:
+        stmt = stmt.where(models.Notification.is_read == 0)
+    if before is not None:
+        stmt = stmt.where(tuple_(models.Notification.created_at, models.Notification.notification_id) < tuple_(*before))
+    result = await db.execute(
+        stmt.order_by(models.Notification.created_at.desc(), models.Notification.notification_id.desc()).limit(limit)
+    )
+    return result.scalars().all()
+
+
+async def list_notifications_after(db: AsyncSession, customer_id: int, after_id: int, limit: int = 100):
+    # Replay for SSE reconnects (Last-Event-ID), oldest first.
+    result = await db.execute(
+        select(models.Notification)
+        .where(models.Notification.customer_id == customer_id, models.Notification.notification_id > after_id)
+        .order_by(models.Notification.notification_id.asc())
+        .limit(limit)
+    )
+    return result.scalars().all()
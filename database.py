@@ -1,14 +1,135 @@
-from sqlalchemy import create_engine, text
+import os
+from dataclasses import dataclass, replace
+from typing import Optional
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./petshop.db"
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False},
-)
+@dataclass(frozen=True)
+class EngineSettings:
+    database_url: str = "sqlite:///./petshop.db"
+    journal_mode: Optional[str] = None
+    busy_timeout_ms: Optional[int] = None
+    synchronous: Optional[str] = None
+    cache_size: Optional[int] = None
+    mmap_size: Optional[int] = None
+    pool_size: int = 5
+    max_overflow: int = 10
+
+
+# "default" keeps SQLite's stock behaviour; "production" lets readers run alongside
+# checkout writes (WAL), waits on the writer lock instead of failing, and trades
+# fsync-per-commit for fsync-per-checkpoint, which WAL keeps crash-safe.
+ENGINE_PROFILES = {
+    "default": EngineSettings(),
+    "production": EngineSettings(
+        journal_mode="WAL",
+        busy_timeout_ms=5000,
+        synchronous="NORMAL",
+        cache_size=-65536,
+        mmap_size=268435456,
+        pool_size=10,
+        max_overflow=20,
+    ),
+}
+
+
+def _env_int(name: str) -> Optional[int]:
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else None
+
+
+def load_engine_settings() -> EngineSettings:
+    profile = os.getenv("PETSHOP_DB_PROFILE", "default")
+    if profile not in ENGINE_PROFILES:
+        raise ValueError(f"Unknown PETSHOP_DB_PROFILE '{profile}'. Choose from: {', '.join(ENGINE_PROFILES)}")
+    settings = ENGINE_PROFILES[profile]
+
+    overrides = {
+        "database_url": os.getenv("PETSHOP_DATABASE_URL") or None,
+        "journal_mode": os.getenv("PETSHOP_DB_JOURNAL_MODE") or None,
+        "busy_timeout_ms": _env_int("PETSHOP_DB_BUSY_TIMEOUT_MS"),
+        "synchronous": os.getenv("PETSHOP_DB_SYNCHRONOUS") or None,
+        "cache_size": _env_int("PETSHOP_DB_CACHE_SIZE"),
+        "mmap_size": _env_int("PETSHOP_DB_MMAP_SIZE"),
+        "pool_size": _env_int("PETSHOP_DB_POOL_SIZE"),
+        "max_overflow": _env_int("PETSHOP_DB_MAX_OVERFLOW"),
+    }
+    return replace(settings, **{k: v for k, v in overrides.items() if v is not None})
+
+
+def sqlite_pragmas(settings: EngineSettings) -> list[str]:
+    pragmas = []
+    if settings.journal_mode:
+        pragmas.append(f"PRAGMA journal_mode={settings.journal_mode}")
+    if settings.busy_timeout_ms is not None:
+        pragmas.append(f"PRAGMA busy_timeout={int(settings.busy_timeout_ms)}")
+    if settings.synchronous:
+        pragmas.append(f"PRAGMA synchronous={settings.synchronous}")
+    if settings.cache_size is not None:
+        pragmas.append(f"PRAGMA cache_size={int(settings.cache_size)}")
+    if settings.mmap_size is not None:
+        pragmas.append(f"PRAGMA mmap_size={int(settings.mmap_size)}")
+    return pragmas
+
+
+def build_engine(settings: EngineSettings):
+    url = make_url(settings.database_url)
+    kwargs = {}
+    if url.get_backend_name() == "sqlite":
+        kwargs["connect_args"] = {"check_same_thread": False}
+    # In-memory SQLite uses a single-connection pool that takes no size arguments.
+    if url.database not in (None, "", ":memory:"):
+        kwargs["pool_size"] = settings.pool_size
+        kwargs["max_overflow"] = settings.max_overflow
+
+    db_engine = create_engine(settings.database_url, **kwargs)
+    if url.get_backend_name() == "sqlite":
+        attach_sqlite_pragmas(db_engine, settings)
+    return db_engine
+
+
+def build_async_engine(settings: EngineSettings):
+    url = make_url(settings.database_url)
+    kwargs = {}
+    if url.get_backend_name() == "sqlite":
+        url = url.set(drivername="sqlite+aiosqlite")
+    if url.database not in (None, "", ":memory:"):
+        kwargs["pool_size"] = settings.pool_size
+        kwargs["max_overflow"] = settings.max_overflow
+
+    db_engine = create_async_engine(url, **kwargs)
+    if url.get_backend_name() == "sqlite":
+        attach_sqlite_pragmas(db_engine.sync_engine, settings)
+    return db_engine
+
+
+def attach_sqlite_pragmas(db_engine, settings: EngineSettings) -> None:
+    pragmas = sqlite_pragmas(settings)
+
+    @event.listens_for(db_engine, "connect")
+    def apply_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+
+engine_settings = load_engine_settings()
+SQLALCHEMY_DATABASE_URL = engine_settings.database_url
+
+engine = build_engine(engine_settings)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for the hot read endpoints; writes still go through SessionLocal.
+async_engine = build_async_engine(engine_settings)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 
@@ -27,6 +148,162 @@ def ensure_runtime_schema():
                 )
             )
 
+        added_sum = add_column_if_missing(conn, "products", "rating_sum", "FLOAT NOT NULL DEFAULT 0")
+        added_count = add_column_if_missing(conn, "products", "rating_count", "INTEGER NOT NULL DEFAULT 0")
+        if added_sum or added_count:
+            # Backfill running rating totals from existing reviews.
+            conn.execute(
+                text(
+                    "UPDATE products SET "
+                    "rating_sum = COALESCE((SELECT SUM(r.rating) FROM reviews r "
+                    "WHERE r.product_id = products.product_id), 0), "
+                    "rating_count = (SELECT COUNT(*) FROM reviews r "
+                    "WHERE r.product_id = products.product_id)"
+                )
+            )
+
+        added_histogram = [
+            add_column_if_missing(conn, "products", f"rating_{stars}_count", "INTEGER NOT NULL DEFAULT 0")
+            for stars in range(1, 6)
+        ]
+        if any(added_histogram):
+            # Backfill star counts; ratings are 1-5, so rating + 0.5 truncates to the rounded star.
+            conn.execute(
+                text(
+                    "UPDATE products SET "
+                    + ", ".join(
+                        f"rating_{stars}_count = (SELECT COUNT(*) FROM reviews r "
+                        f"WHERE r.product_id = products.product_id AND CAST(r.rating + 0.5 AS INTEGER) = {stars})"
+                        for stars in range(1, 6)
+                    )
+                )
+            )
+        # Best-seller counters start at zero; with no sales_window_state row yet, the first
+        # best-sellers read rebuilds them from order history.
+        for column_name, ddl in (
+            ("units_sold", "INTEGER NOT NULL DEFAULT 0"),
+            ("revenue", "FLOAT NOT NULL DEFAULT 0"),
+            ("units_sold_7d", "INTEGER NOT NULL DEFAULT 0"),
+            ("revenue_7d", "FLOAT NOT NULL DEFAULT 0"),
+            ("units_sold_30d", "INTEGER NOT NULL DEFAULT 0"),
+            ("revenue_30d", "FLOAT NOT NULL DEFAULT 0"),
+        ):
+            add_column_if_missing(conn, "products", column_name, ddl)
+        for column_name in ("units_sold", "units_sold_7d", "units_sold_30d"):
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_products_{column_name} ON products ({column_name})"))
+        conn.execute(
+            text("CREATE INDEX IF NOT EXISTS ix_reviews_product_created ON reviews (product_id, created_at)")
+        )
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_reviews_product_rating ON reviews (product_id, rating)"))
+
+        # Filter/sort indexes used by product search (create_all skips existing tables).
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_products_product_type ON products (product_type)"))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_products_price ON products (price)"))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_products_rating ON products (rating)"))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_products_stock_quantity ON products (stock_quantity)"))
+        ensure_product_search_index(conn)
+        conn.execute(
+            text(
+                "INSERT OR IGNORE INTO catalog_version (version_id, epoch, version) "
+                "VALUES (1, lower(hex(randomblob(4))), 0)"
+            )
+        )
+
+        add_column_if_missing(conn, "notifications", "is_read", "INTEGER NOT NULL DEFAULT 0")
+        conn.execute(
+            text(
+                "CREATE INDEX IF NOT EXISTS ix_notifications_customer_created "
+                "ON notifications (customer_id, created_at)"
+            )
+        )
+
+        # Backfill the daily sales rollup once for databases that already hold orders.
+        # Later changes go through checkout or `python -m utils.maintenance rebuild-sales-rollup`.
+        rollup_empty = conn.execute(text("SELECT 1 FROM sales_daily LIMIT 1")).first() is None
+        if rollup_empty and conn.execute(text("SELECT 1 FROM orders LIMIT 1")).first():
+            conn.execute(
+                text(
+                    "INSERT INTO sales_daily (product_type, day, orders, revenue, units) "
+                    "SELECT '', date(o.order_date), COUNT(*), SUM(o.total_amount), "
+                    "COALESCE(SUM((SELECT SUM(i.quantity) FROM order_items i WHERE i.order_id = o.order_id)), 0) "
+                    "FROM orders o GROUP BY date(o.order_date)"
+                )
+            )
+            conn.execute(
+                text(
+                    "INSERT INTO sales_daily (product_type, day, orders, revenue, units) "
+                    "SELECT p.product_type, date(o.order_date), COUNT(DISTINCT o.order_id), "
+                    "SUM(i.sub_total), SUM(i.quantity) "
+                    "FROM order_items i JOIN orders o ON o.order_id = i.order_id "
+                    "JOIN products p ON p.product_id = i.product_id "
+                    "GROUP BY p.product_type, date(o.order_date)"
+                )
+            )
+
+
+def add_column_if_missing(conn, table_name: str, column_name: str, ddl: str) -> bool:
+    cols = conn.execute(text(f"PRAGMA table_info({table_name})")).fetchall()
+    if column_name in {c[1] for c in cols}:
+        return False
+    conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {ddl}"))
+    return True
+
+
+def ensure_product_search_index(conn):
+    # FTS5 index over product name/type, kept in sync with products by triggers.
+    existed = conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'products_fts'")
+    ).first()
+    conn.execute(
+        text(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5("
+            "product_name, product_type, "
+            "content='products', content_rowid='product_id', "
+            "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        )
+    )
+    # Bulk imports hold a marker row here for the length of their own transaction and
+    # index their rows set-based; no other connection ever sees the marker.
+    conn.execute(text("CREATE TABLE IF NOT EXISTS products_fts_bulk (active INTEGER NOT NULL)"))
+    for trigger_name in ("products_fts_ai", "products_fts_au"):
+        trigger_sql = conn.execute(
+            text("SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = :name"), {"name": trigger_name}
+        ).scalar()
+        if trigger_sql and "products_fts_bulk" not in trigger_sql:
+            conn.execute(text(f"DROP TRIGGER {trigger_name}"))
+    conn.execute(
+        text(
+            "CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products "
+            "WHEN NOT EXISTS (SELECT 1 FROM products_fts_bulk) BEGIN "
+            "INSERT INTO products_fts (rowid, product_name, product_type) "
+            "VALUES (new.product_id, new.product_name, new.product_type); "
+            "END"
+        )
+    )
+    conn.execute(
+        text(
+            "CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN "
+            "INSERT INTO products_fts (products_fts, rowid, product_name, product_type) "
+            "VALUES ('delete', old.product_id, old.product_name, old.product_type); "
+            "END"
+        )
+    )
+    # Only name/type changes touch the index, so stock and rating updates stay cheap.
+    conn.execute(
+        text(
+            "CREATE TRIGGER IF NOT EXISTS products_fts_au "
+            "AFTER UPDATE OF product_name, product_type ON products "
+            "WHEN NOT EXISTS (SELECT 1 FROM products_fts_bulk) BEGIN "
+            "INSERT INTO products_fts (products_fts, rowid, product_name, product_type) "
+            "VALUES ('delete', old.product_id, old.product_name, old.product_type); "
+            "INSERT INTO products_fts (rowid, product_name, product_type) "
+            "VALUES (new.product_id, new.product_name, new.product_type); "
+            "END"
+        )
+    )
+    if not existed:
+        conn.execute(text("INSERT INTO products_fts (products_fts) VALUES ('rebuild')"))
+
 
 def get_db():
     db = SessionLocal()
@@ -34,3 +311,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -3,13 +3,16 @@ from pathlib import Path
 # This is the main entry point for the FastAPI application. It sets up the database, includes all the routers, and defines routes for serving HTML templates for the frontend.
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, RedirectResponse
+from fastapi.responses import FileResponse, JSONResponse, RedirectResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
 
 import models
-from database import Base, engine, ensure_runtime_schema
+from database import Base, async_engine, engine, ensure_runtime_schema
+from utils.auth import HashingPoolBusy, shutdown_hash_executor
+from utils.notification_dispatcher import NOTIFICATION_DISPATCHER_ENABLED, notification_dispatcher
+from utils.receipt_jobs import ReceiptQueueFull, receipt_jobs
 from routers import (
     admins,
     articles,
@@ -42,8 +45,30 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
+
+@app.exception_handler(HashingPoolBusy)
+@app.exception_handler(ReceiptQueueFull)
+def worker_pool_busy_handler(request: Request, exc: Exception):
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
+
+@app.on_event("startup")
+async def start_workers():
+    if NOTIFICATION_DISPATCHER_ENABLED:
+        notification_dispatcher.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_workers():
+    await notification_dispatcher.stop()
+    shutdown_hash_executor()
+    receipt_jobs.shutdown()
+    await async_engine.dispose()
+
+
 app.include_router(products.router)
 app.include_router(customers.router)
 app.include_router(admins.router)
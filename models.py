@@ -2,9 +2,11 @@ from datetime import datetime
 
 from sqlalchemy import (
     Column,
+    Date,
     DateTime,
     Float,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
@@ -43,10 +45,27 @@ class Product(Base):
 
     product_id = Column(Integer, primary_key=True, index=True)
     product_name = Column(String(100), nullable=False, index=True)
-    product_type = Column(String(100), nullable=False)
-    price = Column(Float, nullable=False)
-    stock_quantity = Column(Integer, nullable=False, default=0)
-    rating = Column(Float, nullable=False, default=0.0)
+    product_type = Column(String(100), nullable=False, index=True)
+    price = Column(Float, nullable=False, index=True)
+    stock_quantity = Column(Integer, nullable=False, default=0, index=True)
+    rating = Column(Float, nullable=False, default=0.0, index=True)
+    # Running totals so a new review updates the average without re-reading all reviews.
+    rating_sum = Column(Float, nullable=False, default=0.0)
+    rating_count = Column(Integer, nullable=False, default=0)
+    # Review counts per star (ratings rounded half up), maintained alongside the totals.
+    rating_1_count = Column(Integer, nullable=False, default=0)
+    rating_2_count = Column(Integer, nullable=False, default=0)
+    rating_3_count = Column(Integer, nullable=False, default=0)
+    rating_4_count = Column(Integer, nullable=False, default=0)
+    rating_5_count = Column(Integer, nullable=False, default=0)
+    # Best-seller counters bumped by checkout. The 7d/30d windows are as of
+    # SalesWindowState.as_of; the daily rollover subtracts days that age out.
+    units_sold = Column(Integer, nullable=False, default=0, index=True)
+    revenue = Column(Float, nullable=False, default=0.0)
+    units_sold_7d = Column(Integer, nullable=False, default=0, index=True)
+    revenue_7d = Column(Float, nullable=False, default=0.0)
+    units_sold_30d = Column(Integer, nullable=False, default=0, index=True)
+    revenue_30d = Column(Float, nullable=False, default=0.0)
 
     cart_items = relationship("CartItem", back_populates="product", cascade="all, delete-orphan")
     order_items = relationship("OrderItem", back_populates="product", cascade="all, delete-orphan")
@@ -119,6 +138,11 @@ class Review(Base):
     customer = relationship("Customer", back_populates="reviews")
     product = relationship("Product", back_populates="reviews")
 
+    __table_args__ = (
+        Index("ix_reviews_product_created", "product_id", "created_at"),
+        Index("ix_reviews_product_rating", "product_id", "rating"),
+    )
+
 
 class Service(Base):
     __tablename__ = "services"
@@ -149,8 +173,11 @@ class Notification(Base):
     message = Column(Text, nullable=False)
     channel = Column(String(30), nullable=False, default="MOCK_EMAIL_SMS")
     related_order_id = Column(Integer, ForeignKey("orders.order_id"), nullable=True, index=True)
+    is_read = Column(Integer, nullable=False, default=0)
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
 
+    __table_args__ = (Index("ix_notifications_customer_created", "customer_id", "created_at"),)
+
 
 class OrderTrackingEvent(Base):
     __tablename__ = "order_tracking_events"
@@ -160,3 +187,78 @@ class OrderTrackingEvent(Base):
     status = Column(String(40), nullable=False)
     note = Column(String(255), nullable=True)
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+class SalesCounter(Base):
+    __tablename__ = "sales_counters"
+
+    # Single-row table (counter_id = 1) maintained by checkout and payment updates.
+    counter_id = Column(Integer, primary_key=True)
+    total_orders = Column(Integer, nullable=False, default=0)
+    total_revenue = Column(Float, nullable=False, default=0.0)
+    total_items_sold = Column(Integer, nullable=False, default=0)
+    payment_receipts_generated = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+class SalesDaily(Base):
+    __tablename__ = "sales_daily"
+
+    # Daily rollup maintained by checkout. product_type "" holds the all-types totals;
+    # other rows count only that type's order lines. Keyed type-first so a report over
+    # a date range is a single index range scan.
+    product_type = Column(String(50), primary_key=True)
+    day = Column(Date, primary_key=True)
+    orders = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0.0)
+    units = Column(Integer, nullable=False, default=0)
+
+
+class ProductSalesDaily(Base):
+    __tablename__ = "product_sales_daily"
+
+    # Per-product daily buckets behind the rolling best-seller windows.
+    product_id = Column(Integer, ForeignKey("products.product_id"), primary_key=True)
+    day = Column(Date, primary_key=True, index=True)
+    units = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0.0)
+
+
+class SalesWindowState(Base):
+    __tablename__ = "sales_window_state"
+
+    # Single-row table (state_id = 1): the day the products' 7d/30d counters are current for.
+    state_id = Column(Integer, primary_key=True)
+    as_of = Column(Date, nullable=False)
+
+
+class CatalogVersion(Base):
+    __tablename__ = "catalog_version"
+
+    # Single-row table (version_id = 1) bumped in the same transaction as every catalog
+    # write, so all workers and CLI tools share one ETag/response-cache version. The
+    # random epoch keeps ETags from a recreated database from matching old ones.
+    version_id = Column(Integer, primary_key=True)
+    epoch = Column(String(16), nullable=False)
+    version = Column(Integer, nullable=False, default=0)
+
+
+class NotificationOutbox(Base):
+    __tablename__ = "notification_outbox"
+
+    # Written in the same transaction as the notification; delivered later by the dispatcher.
+    outbox_id = Column(Integer, primary_key=True, index=True)
+    notification_id = Column(Integer, ForeignKey("notifications.notification_id"), nullable=False, index=True)
+    channel = Column(String(30), nullable=False)
+    status = Column(String(20), nullable=False, default="PENDING")
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    claim_token = Column(String(32), nullable=True, index=True)
+    claimed_until = Column(DateTime, nullable=True)
+    last_error = Column(String(255), nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)
+
+    notification = relationship("Notification")
+
+    __table_args__ = (Index("ix_notification_outbox_status_next_attempt", "status", "next_attempt_at"),)
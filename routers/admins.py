@@ -1,11 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 import crud
 import schemas
 from database import get_db
-from utils.auth import create_access_token
+from utils.auth import STREAM_TICKET_TTL_SECONDS, create_access_token, create_stream_ticket, verify_password_async
 from utils.dependencies import require_admin
+from utils.principal_cache import principal_cache
 
 router = APIRouter(prefix="/admins", tags=["Admins"])
 
@@ -19,14 +21,14 @@ def register_admin(payload: schemas.AdminCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=schemas.AdminToken)
-def login_admin(payload: schemas.AdminLogin, db: Session = Depends(get_db)):
-    admin = crud.authenticate_admin(
+async def login_admin(payload: schemas.AdminLogin, db: Session = Depends(get_db)):
+    admin = await run_in_threadpool(
+        crud.get_admin_for_login,
         db,
-        password=payload.password,
         user_name=payload.user_name,
         email=str(payload.email) if payload.email else None,
     )
-    if not admin:
+    if not admin or not await verify_password_async(payload.password, admin.password):
         raise HTTPException(status_code=401, detail="Invalid admin email/username or password")
     token = create_access_token({"sub": str(admin.admin_id), "role": "admin", "user_name": admin.user_name})
     return {"access_token": token, "token_type": "bearer", "admin": admin}
@@ -35,3 +37,14 @@ def login_admin(payload: schemas.AdminLogin, db: Session = Depends(get_db)):
 @router.get("/me", response_model=schemas.AdminOut)
 def get_admin_profile(current_admin=Depends(require_admin)):
     return current_admin
+
+
+@router.post("/me/stream-ticket", response_model=schemas.StreamTicketOut)
+def create_admin_stream_ticket(current_admin=Depends(require_admin)):
+    ticket = create_stream_ticket("admin", current_admin.admin_id)
+    return {"ticket": ticket, "expires_in": STREAM_TICKET_TTL_SECONDS}
+
+
+@router.get("/principal-cache", response_model=schemas.PrincipalCacheStatsOut)
+def principal_cache_stats(_admin=Depends(require_admin)):
+    return principal_cache.stats()
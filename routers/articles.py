@@ -5,13 +5,14 @@ import crud
 import schemas
 from database import get_db
 from utils.dependencies import require_admin
+from utils.serialization import json_response
 
 router = APIRouter(prefix="/articles", tags=["Articles"])
 
 
 @router.get("/", response_model=list[schemas.ArticleOut])
 def list_articles(db: Session = Depends(get_db)):
-    return crud.list_articles(db)
+    return json_response(crud.list_articles(db), list[schemas.ArticleOut])
 
 
 @router.post("/", response_model=schemas.ArticleOut, status_code=status.HTTP_201_CREATED)
@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session
 import crud
 import schemas
 from database import get_db
+from utils.serialization import json_response
 
 router = APIRouter(prefix="/cart", tags=["Cart"])
 
@@ -19,9 +20,28 @@ def add_to_cart(payload: schemas.CartAdd, db: Session = Depends(get_db)):
     return item
 
 
+@router.get("/{customer_id}/summary", response_model=schemas.CartSummaryOut)
+def get_cart_summary(customer_id: int, db: Session = Depends(get_db)):
+    summary = crud.get_cart_summary(db, customer_id)
+    if summary is None:
+        raise HTTPException(status_code=404, detail="Customer not found")
+    return json_response(summary, schemas.CartSummaryOut)
+
+
+@router.put("/{customer_id}/items", response_model=schemas.CartSummaryOut)
+def set_cart_items(customer_id: int, payload: schemas.CartBatchUpdate, db: Session = Depends(get_db)):
+    try:
+        found = crud.set_cart_items(db, customer_id, payload.items, mode=payload.mode)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if not found:
+        raise HTTPException(status_code=404, detail="Customer not found")
+    return json_response(crud.get_cart_summary(db, customer_id), schemas.CartSummaryOut)
+
+
 @router.get("/{customer_id}", response_model=list[schemas.CartItemOut])
 def get_customer_cart(customer_id: int, db: Session = Depends(get_db)):
-    return crud.get_cart_items(db, customer_id)
+    return json_response(crud.get_cart_items(db, customer_id), list[schemas.CartItemOut])
 
 
 @router.put("/item/{cart_item_id}", response_model=schemas.CartItemOut)
@@ -1,27 +1,41 @@
+from typing import Optional
+
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 import crud
 import schemas
 from database import get_db
-from utils.auth import create_access_token
+from utils.auth import (
+    STREAM_TICKET_TTL_SECONDS,
+    create_access_token,
+    create_stream_ticket,
+    hash_password_async,
+    verify_password_async,
+)
 from utils.dependencies import get_current_customer, require_admin
+from utils.pagination import cursor_after_id, next_cursor_headers
+from utils.serialization import json_response
 
 router = APIRouter(prefix="/customers", tags=["Customers"])
 
 
 @router.post("/register", response_model=schemas.CustomerOut, status_code=status.HTTP_201_CREATED)
-def register_customer(payload: schemas.CustomerCreate, db: Session = Depends(get_db)):
-    customer = crud.create_customer(db, payload)
+async def register_customer(payload: schemas.CustomerCreate, db: Session = Depends(get_db)):
+    if await run_in_threadpool(crud.get_customer_by_email, db, payload.email):
+        raise HTTPException(status_code=400, detail="Email already registered")
+    password_hash = await hash_password_async(payload.password)
+    customer = await run_in_threadpool(crud.create_customer, db, payload, password_hash)
     if not customer:
         raise HTTPException(status_code=400, detail="Email already registered")
     return customer
 
 
 @router.post("/login", response_model=schemas.Token)
-def login_customer(payload: schemas.CustomerLogin, db: Session = Depends(get_db)):
-    customer = crud.authenticate_customer(db, payload.email, payload.password)
-    if not customer:
+async def login_customer(payload: schemas.CustomerLogin, db: Session = Depends(get_db)):
+    customer = await run_in_threadpool(crud.get_customer_by_email, db, payload.email)
+    if not customer or not await verify_password_async(payload.password, customer.password):
         raise HTTPException(status_code=401, detail="Invalid email or password")
 
     token = create_access_token({"sub": str(customer.customer_id), "role": "customer", "email": customer.email})
@@ -33,14 +47,22 @@ def get_me(current_customer=Depends(get_current_customer)):
     return current_customer
 
 
+@router.post("/me/stream-ticket", response_model=schemas.StreamTicketOut)
+def create_customer_stream_ticket(current_customer=Depends(get_current_customer)):
+    ticket = create_stream_ticket("customer", current_customer.customer_id)
+    return {"ticket": ticket, "expires_in": STREAM_TICKET_TTL_SECONDS}
+
+
 @router.get("/", response_model=list[schemas.CustomerOut])
 def list_all_customers(
     skip: int = Query(default=0, ge=0),
+    cursor: Optional[str] = None,
     limit: int = Query(default=100, ge=1, le=500),
     db: Session = Depends(get_db),
     _admin=Depends(require_admin),
 ):
-    return crud.list_customers(db, skip=skip, limit=limit)
+    rows = crud.list_customers(db, skip=skip, limit=limit, after_id=cursor_after_id(cursor))
+    return json_response(rows, list[schemas.CustomerOut], next_cursor_headers(rows, limit, "customer_id"))
 
 
 @router.get("/{customer_id}", response_model=schemas.CustomerOut)
@@ -1,19 +1,89 @@
-from fastapi import APIRouter, Depends
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 import crud
+import crud_async
 import schemas
-from database import get_db
-from utils.dependencies import get_current_customer, require_admin
+from database import AsyncSessionLocal, get_async_db, get_db
+from utils.dependencies import get_current_customer, get_stream_customer, require_admin
+from utils.pagination import cursor_after_timestamp, next_cursor_headers
+from utils.pubsub import broker
+from utils.serialization import json_response
+from utils.sse import sse_events, sse_response
 
 router = APIRouter(prefix="/notifications", tags=["Notifications"])
 
 
 @router.get("/me", response_model=list[schemas.NotificationOut])
-def my_notifications(current_customer=Depends(get_current_customer), db: Session = Depends(get_db)):
-    return crud.list_notifications_for_customer(db, current_customer.customer_id)
+async def my_notifications(
+    cursor: Optional[str] = None,
+    limit: int = Query(default=50, ge=1, le=200),
+    unread_only: bool = False,
+    current_customer=Depends(get_current_customer),
+    db: AsyncSession = Depends(get_async_db),
+):
+    rows = await crud_async.list_notifications_for_customer(
+        db,
+        current_customer.customer_id,
+        limit=limit,
+        before=cursor_after_timestamp(cursor),
+        unread_only=unread_only,
+    )
+    headers = next_cursor_headers(rows, limit, "created_at", "notification_id")
+    return json_response(rows, list[schemas.NotificationOut], headers)
+
+
+@router.get("/me/unread-count", response_model=schemas.UnreadCountOut)
+def my_unread_count(current_customer=Depends(get_current_customer), db: Session = Depends(get_db)):
+    return {"unread": crud.count_unread_notifications(db, current_customer.customer_id)}
+
+
+@router.post("/me/read-all", response_model=schemas.UnreadCountOut)
+def mark_all_read(current_customer=Depends(get_current_customer), db: Session = Depends(get_db)):
+    crud.mark_all_notifications_read(db, current_customer.customer_id)
+    return {"unread": 0}
+
+
+@router.get("/me/stream")
+async def stream_my_notifications(
+    request: Request,
+    current_customer=Depends(get_stream_customer),
+    last_event_id: Optional[str] = Header(default=None),
+):
+    customer_id = current_customer.customer_id
+    # Subscribe before reading the backlog so nothing published in between is lost.
+    subscription = broker.subscribe(crud.notification_topic(customer_id))
+    backlog = []
+    try:
+        if last_event_id and last_event_id.isdigit():
+            async with AsyncSessionLocal() as db:
+                rows = await crud_async.list_notifications_after(db, customer_id, int(last_event_id))
+            backlog = [crud.notification_payload(row) for row in rows]
+    except Exception:
+        subscription.close()
+        raise
+    return sse_response(sse_events(request, subscription, "notification", "notification_id", backlog))
+
+
+@router.patch("/{notification_id}/read", response_model=schemas.NotificationOut)
+def mark_read(notification_id: int, current_customer=Depends(get_current_customer), db: Session = Depends(get_db)):
+    note = crud.mark_notification_read(db, current_customer.customer_id, notification_id)
+    if not note:
+        raise HTTPException(status_code=404, detail="Notification not found")
+    return note
 
 
 @router.get("/customer/{customer_id}", response_model=list[schemas.NotificationOut])
-def notifications_by_customer(customer_id: int, db: Session = Depends(get_db), _admin=Depends(require_admin)):
-    return crud.list_notifications_for_customer(db, customer_id)
+def notifications_by_customer(
+    customer_id: int,
+    cursor: Optional[str] = None,
+    limit: int = Query(default=50, ge=1, le=200),
+    db: Session = Depends(get_db),
+    _admin=Depends(require_admin),
+):
+    rows = crud.list_notifications_for_customer(db, customer_id, limit=limit, before=cursor_after_timestamp(cursor))
+    headers = next_cursor_headers(rows, limit, "created_at", "notification_id")
+    return json_response(rows, list[schemas.NotificationOut], headers)
@@ -1,10 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 import crud
+import crud_async
 import schemas
-from database import get_db
+from database import AsyncSessionLocal, get_async_db, get_db
 from utils.dependencies import require_admin
+from utils.pagination import cursor_after_id, next_cursor_headers
+from utils.pubsub import broker
+from utils.serialization import json_response
+from utils.sse import sse_events, sse_response
 
 router = APIRouter(prefix="/orders", tags=["Orders"])
 
@@ -30,17 +38,19 @@ def get_order(order_id: int, db: Session = Depends(get_db)):
 
 @router.get("/customer/{customer_id}", response_model=list[schemas.OrderOut])
 def list_customer_orders(customer_id: int, db: Session = Depends(get_db)):
-    return crud.list_orders_for_customer(db, customer_id)
+    return json_response(crud.list_orders_for_customer(db, customer_id), list[schemas.OrderOut])
 
 
 @router.get("/", response_model=list[schemas.OrderOut])
 def list_all_orders(
     skip: int = Query(default=0, ge=0),
+    cursor: Optional[str] = None,
     limit: int = Query(default=100, ge=1, le=500),
     db: Session = Depends(get_db),
     _admin=Depends(require_admin),
 ):
-    return crud.list_orders(db, skip=skip, limit=limit)
+    rows = crud.list_orders(db, skip=skip, limit=limit, after_id=cursor_after_id(cursor))
+    return json_response(rows, list[schemas.OrderOut], next_cursor_headers(rows, limit, "order_id"))
 
 
 @router.patch("/{order_id}/status", response_model=schemas.OrderOut)
@@ -62,8 +72,30 @@ def update_status(
 
 
 @router.get("/{order_id}/tracking", response_model=list[schemas.TrackingEventOut])
-def get_tracking_events(order_id: int, db: Session = Depends(get_db)):
-    order = crud.get_order(db, order_id)
-    if not order:
+async def get_tracking_events(order_id: int, db: AsyncSession = Depends(get_async_db)):
+    if not await crud_async.order_exists(db, order_id):
         raise HTTPException(status_code=404, detail="Order not found")
-    return crud.list_tracking_events_for_order(db, order_id)
+    rows = await crud_async.list_tracking_events_for_order(db, order_id)
+    return json_response(rows, list[schemas.TrackingEventOut])
+
+
+@router.get("/{order_id}/tracking/stream")
+async def stream_tracking_events(
+    order_id: int,
+    request: Request,
+    last_event_id: Optional[str] = Header(default=None),
+):
+    # Subscribe before reading history so an event committed in between is not missed;
+    # sse_events drops the duplicates by event_id.
+    subscription = broker.subscribe(crud.tracking_topic(order_id))
+    try:
+        async with AsyncSessionLocal() as db:
+            if not await crud_async.order_exists(db, order_id):
+                raise HTTPException(status_code=404, detail="Order not found")
+            after_id = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+            rows = await crud_async.list_tracking_events_for_order(db, order_id, after_id=after_id)
+            history = [crud.tracking_event_payload(row) for row in rows]
+    except Exception:
+        subscription.close()
+        raise
+    return sse_response(sse_events(request, subscription, "tracking", "event_id", history))
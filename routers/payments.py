@@ -1,24 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import FileResponse
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 import crud
 import schemas
-from database import get_db
+from database import SessionLocal, get_db
 from utils.dependencies import require_admin
-from utils.pdf_generator import generate_receipt_pdf
+from utils.pagination import cursor_after_id, next_cursor_headers
+from utils.receipt_jobs import ReceiptJob, receipt_jobs, stream_receipts_zip
+from utils.serialization import json_response
 
 router = APIRouter(prefix="/payments", tags=["Payments"])
 
+RECEIPT_DOWNLOAD_WAIT_SECONDS = 30
+RECEIPT_ZIP_BATCH_SIZE = 50
+
 
 @router.get("/", response_model=list[schemas.PaymentOut])
 def list_all_payments(
     skip: int = Query(default=0, ge=0),
+    cursor: Optional[str] = None,
     limit: int = Query(default=100, ge=1, le=500),
     db: Session = Depends(get_db),
     _admin=Depends(require_admin),
 ):
-    return crud.list_payments(db, skip=skip, limit=limit)
+    rows = crud.list_payments(db, skip=skip, limit=limit, after_id=cursor_after_id(cursor))
+    return json_response(rows, list[schemas.PaymentOut], next_cursor_headers(rows, limit, "payment_id"))
 
 
 @router.get("/{payment_id}", response_model=schemas.PaymentOut)
@@ -59,14 +70,99 @@ def generate_receipt(payment_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/{payment_id}/receipt/pdf")
-def download_receipt_pdf(payment_id: int, db: Session = Depends(get_db)):
+async def download_receipt_pdf(payment_id: int, db: Session = Depends(get_db)):
+    receipt = await run_in_threadpool(build_receipt_or_404, db, payment_id)
+    # Rendering happens on the receipt worker pool; cache hits complete immediately and
+    # are not registered as pollable jobs.
+    job = await receipt_jobs.wait(receipt_jobs.submit(receipt, register=False), RECEIPT_DOWNLOAD_WAIT_SECONDS)
+    if job.status == "FAILED":
+        raise HTTPException(status_code=500, detail=f"Receipt rendering failed: {job.error}")
+    if job.status != "DONE":
+        raise HTTPException(status_code=503, detail=f"Receipt is still rendering (job {job.job_id})")
+    return FileResponse(path=job.path, media_type="application/pdf", filename=f"{receipt['receipt_id']}.pdf")
+
+
+@router.post(
+    "/{payment_id}/receipt/jobs",
+    response_model=schemas.ReceiptJobOut,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def submit_receipt_job(payment_id: int, db: Session = Depends(get_db)):
+    receipt = await run_in_threadpool(build_receipt_or_404, db, payment_id)
+    return receipt_job_out(receipt_jobs.submit(receipt))
+
+
+@router.get("/receipt-jobs/{job_id}", response_model=schemas.ReceiptJobOut)
+async def get_receipt_job(job_id: str, wait: float = Query(default=0, ge=0, le=30)):
+    job = get_receipt_job_or_404(job_id)
+    return receipt_job_out(await receipt_jobs.wait(job, wait))
+
+
+@router.get("/receipt-jobs/{job_id}/pdf")
+def download_receipt_job_pdf(job_id: str):
+    job = get_receipt_job_or_404(job_id)
+    if job.status == "FAILED":
+        raise HTTPException(status_code=500, detail=f"Receipt rendering failed: {job.error}")
+    if job.status != "DONE" or not job.path or not job.path.exists():
+        raise HTTPException(status_code=409, detail="Receipt is not ready yet")
+    return FileResponse(path=job.path, media_type="application/pdf", filename=f"{job.receipt_id}.pdf")
+
+
+@router.get("/receipts/zip")
+def download_receipts_zip(
+    start_date: date,
+    end_date: date,
+    _admin=Depends(require_admin),
+):
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="end_date must not be before start_date")
+    start = datetime.combine(start_date, time.min)
+    end = datetime.combine(end_date + timedelta(days=1), time.min)
+
+    def receipt_batches():
+        # Own session: the response body is produced after the request dependencies exit.
+        db = SessionLocal()
+        try:
+            after_id = None
+            while True:
+                payments = crud.list_payments_for_period(db, start, end, after_id=after_id, limit=RECEIPT_ZIP_BATCH_SIZE)
+                if not payments:
+                    return
+                yield [crud.build_payment_receipt(db, payment) for payment in payments]
+                after_id = payments[-1].payment_id
+                db.expunge_all()
+        finally:
+            db.close()
+
+    filename = f"receipts-{start_date.isoformat()}-{end_date.isoformat()}.zip"
+    return StreamingResponse(
+        stream_receipts_zip(receipt_batches()),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+def build_receipt_or_404(db: Session, payment_id: int) -> dict:
     payment = crud.get_payment_by_id(db, payment_id)
     if not payment:
         raise HTTPException(status_code=404, detail="Payment not found")
-    receipt = crud.build_payment_receipt(db, payment)
-    pdf_path = generate_receipt_pdf(receipt, output_dir="D:/Shopping_website/receipts")
-    return FileResponse(
-        path=pdf_path,
-        media_type="application/pdf",
-        filename=f"{receipt['receipt_id']}.pdf",
-    )
+    return crud.build_payment_receipt(db, payment)
+
+
+def get_receipt_job_or_404(job_id: str) -> ReceiptJob:
+    job = receipt_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Receipt job not found")
+    return job
+
+
+def receipt_job_out(job: ReceiptJob) -> dict:
+    return {
+        "job_id": job.job_id,
+        "payment_id": job.payment_id,
+        "receipt_id": job.receipt_id,
+        "status": job.status,
+        "error": job.error,
+        "created_at": datetime.fromtimestamp(job.created_at),
+        "finished_at": datetime.fromtimestamp(job.finished_at) if job.finished_at else None,
+    }
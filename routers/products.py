@@ -1,13 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+import tempfile
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 import crud
+import crud_async
 import schemas
-from database import get_db
+from database import SessionLocal, get_async_db, get_db
+from utils import catalog_io
 from utils.dependencies import require_admin
+from utils.catalog_cache import serve_catalog_response
+from utils.pagination import cursor_after_id, next_cursor_headers
+from utils.serialization import dump_json, json_response
 
 router = APIRouter(prefix="/products", tags=["Products"])
 
+# Uploads stay in memory up to this size, then spill to a temp file.
+IMPORT_SPOOL_BYTES = 16 * 1024 * 1024
+
 
 @router.post("/", response_model=schemas.ProductOut, status_code=status.HTTP_201_CREATED)
 def create_product(
@@ -19,20 +34,138 @@ def create_product(
 
 
 @router.get("/", response_model=list[schemas.ProductOut])
-def list_products(
+async def list_products(
+    request: Request,
     skip: int = Query(default=0, ge=0),
+    cursor: Optional[str] = None,
     limit: int = Query(default=100, ge=1, le=500),
+    db: AsyncSession = Depends(get_async_db),
+):
+    after_id = cursor_after_id(cursor)
+
+    async def render():
+        rows = await crud_async.list_products(db, skip=skip, limit=limit, after_id=after_id)
+        return dump_json(rows, list[schemas.ProductOut]), next_cursor_headers(rows, limit, "product_id")
+
+    return await serve_catalog_response(request, db, render)
+
+
+@router.get("/search", response_model=list[schemas.ProductOut])
+def search_products(
+    q: Optional[str] = Query(default=None, max_length=200),
+    product_type: Optional[str] = None,
+    min_price: Optional[float] = Query(default=None, ge=0),
+    max_price: Optional[float] = Query(default=None, ge=0),
+    min_rating: Optional[float] = Query(default=None, ge=0, le=5),
+    sort: str = Query(default="relevance"),
+    skip: int = Query(default=0, ge=0),
+    limit: int = Query(default=20, ge=1, le=100),
     db: Session = Depends(get_db),
 ):
-    return crud.list_products(db, skip=skip, limit=limit)
+    try:
+        rows = crud.search_products(
+            db,
+            q=q,
+            product_type=product_type,
+            min_price=min_price,
+            max_price=max_price,
+            min_rating=min_rating,
+            sort=sort,
+            skip=skip,
+            limit=limit,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return json_response(rows, list[schemas.ProductOut])
+
+
+def refresh_sales_windows() -> None:
+    with SessionLocal() as db:
+        crud.roll_sales_windows(db)
+
+
+@router.get("/best-sellers", response_model=list[schemas.BestSellerOut])
+async def best_sellers(
+    request: Request,
+    window: str = Query(default="all", pattern="^(all|7d|30d)$"),
+    product_type: Optional[str] = Query(default=None, max_length=100),
+    limit: int = Query(default=10, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
+):
+    # Counters are maintained by checkout; the only upkeep left is the once-a-day window
+    # rollover (or the first-time build), which the first request of the day triggers.
+    as_of = await crud_async.sales_windows_as_of(db)
+    if as_of is None or as_of < datetime.utcnow().date():
+        await run_in_threadpool(refresh_sales_windows)
+
+    async def render():
+        rows = await crud_async.list_best_sellers(db, window=window, product_type=product_type, limit=limit)
+        return dump_json(rows, list[schemas.BestSellerOut]), {}
+
+    return await serve_catalog_response(request, db, render)
+
+
+@router.post("/import", response_model=schemas.ProductImportReportOut)
+async def import_products(
+    request: Request,
+    fmt: str = Query(default="csv", alias="format", pattern="^(csv|ndjson)$"),
+    key: str = Query(default="name", pattern="^(name|id)$"),
+    _admin=Depends(require_admin),
+):
+    # Raw CSV/NDJSON request body. It is spooled first so parsing and the batched
+    # upserts run on a worker thread instead of the event loop. Past IMPORT_SPOOL_BYTES
+    # the spool writes to disk, so writes go through the threadpool as well.
+    upload = tempfile.SpooledTemporaryFile(max_size=IMPORT_SPOOL_BYTES)
+    try:
+        async for chunk in request.stream():
+            await run_in_threadpool(upload.write, chunk)
+        upload.seek(0)
+        return await run_in_threadpool(catalog_io.import_stream, upload, fmt, key)
+    finally:
+        await run_in_threadpool(upload.close)
+
+
+@router.get("/export")
+def export_products(
+    fmt: str = Query(default="csv", alias="format", pattern="^(csv|ndjson)$"),
+    _admin=Depends(require_admin),
+):
+    def chunks():
+        # Own session: the response body is produced after the request dependencies exit.
+        db = SessionLocal()
+        try:
+            yield from catalog_io.export_products(db, fmt)
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        chunks(),
+        media_type="text/csv" if fmt == "csv" else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="products.{fmt}"'},
+    )
+
+
+@router.post("/inventory/batch", response_model=schemas.InventoryBatchResultOut)
+def adjust_inventory(
+    payload: schemas.InventoryBatchRequest,
+    db: Session = Depends(get_db),
+    _admin=Depends(require_admin),
+):
+    results = crud.apply_inventory_adjustments(db, payload.items, atomic=payload.atomic)
+    applied = sum(1 for result in results if result["status"] == "applied")
+    summary = {"applied": applied, "failed": len(results) - applied, "results": results}
+    return json_response(summary, schemas.InventoryBatchResultOut)
 
 
 @router.get("/{product_id}", response_model=schemas.ProductOut)
-def get_product(product_id: int, db: Session = Depends(get_db)):
-    product = crud.get_product(db, product_id)
-    if not product:
-        raise HTTPException(status_code=404, detail="Product not found")
-    return product
+async def get_product(product_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    async def render():
+        product = await crud_async.get_product(db, product_id)
+        if not product:
+            raise HTTPException(status_code=404, detail="Product not found")
+        return dump_json(product, schemas.ProductOut), {}
+
+    return await serve_catalog_response(request, db, render)
 
 
 @router.put("/{product_id}", response_model=schemas.ProductOut)
@@ -1,28 +1,101 @@
-from fastapi import APIRouter, Depends, Query
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
 
 import crud
 import schemas
 from database import get_db
-from utils.dependencies import require_admin
+from utils.dependencies import get_stream_admin, require_admin
+from utils.pagination import cursor_after_ints, next_cursor_headers
+from utils.pubsub import broker
+from utils.serialization import json_response
+from utils.sse import sse_events, sse_response
+from utils.stock_alerts import LOW_STOCK_THRESHOLD, LOW_STOCK_TOPIC
+
+# Range used when the caller gives no start date, per bucket size.
+SALES_TIMESERIES_DEFAULT_DAYS = {"day": 30, "week": 7 * 12, "month": 365}
 
 router = APIRouter(prefix="/reports", tags=["Reports"])
 
 
 @router.get("/sales-summary", response_model=schemas.SalesSummaryOut)
-def sales_summary(db: Session = Depends(get_db), _admin=Depends(require_admin)):
-    return crud.get_sales_summary(db)
+def sales_summary(
+    live: bool = Query(default=False),
+    db: Session = Depends(get_db),
+    _admin=Depends(require_admin),
+):
+    # Default read comes from the materialized counters; live=true aggregates the source tables.
+    return crud.get_sales_summary(db, use_counters=not live)
+
+
+@router.get("/sales-timeseries", response_model=schemas.SalesTimeseriesOut)
+def sales_timeseries(
+    bucket: str = Query(default="day", pattern="^(day|week|month)$"),
+    start: Optional[date] = Query(default=None),
+    end: Optional[date] = Query(default=None),
+    product_type: Optional[str] = Query(default=None, max_length=50),
+    by_type: bool = Query(default=False),
+    db: Session = Depends(get_db),
+    _admin=Depends(require_admin),
+):
+    # Served from the daily rollup table, so cost follows the number of days, not orders.
+    end = end or datetime.utcnow().date()
+    start = start or end - timedelta(days=SALES_TIMESERIES_DEFAULT_DAYS[bucket] - 1)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must be on or before end")
+    if product_type and by_type:
+        raise HTTPException(status_code=400, detail="Use either product_type or by_type, not both")
+
+    points = crud.get_sales_timeseries(db, start, end, bucket=bucket, product_type=product_type, by_type=by_type)
+    report = {
+        "bucket": bucket,
+        "start": start,
+        "end": end,
+        "product_type": product_type,
+        "by_type": by_type,
+        "points": points,
+    }
+    return json_response(report, schemas.SalesTimeseriesOut)
 
 
 @router.get("/inventory-summary", response_model=schemas.InventorySummaryOut)
 def inventory_summary(
-    low_stock_threshold: int = Query(default=5, ge=1, le=100),
+    low_stock_threshold: int = Query(default=LOW_STOCK_THRESHOLD, ge=1, le=100),
     db: Session = Depends(get_db),
     _admin=Depends(require_admin),
 ):
     return crud.get_inventory_summary(db, low_stock_threshold=low_stock_threshold)
 
 
+@router.get("/low-stock", response_model=list[schemas.ProductOut])
+def low_stock_products(
+    low_stock_threshold: int = Query(default=LOW_STOCK_THRESHOLD, ge=1, le=100),
+    include_out_of_stock: bool = Query(default=True),
+    limit: int = Query(default=50, ge=1, le=500),
+    cursor: Optional[str] = Query(default=None),
+    db: Session = Depends(get_db),
+    _admin=Depends(require_admin),
+):
+    products = crud.list_low_stock_products(
+        db,
+        low_stock_threshold=low_stock_threshold,
+        limit=limit,
+        after=cursor_after_ints(cursor, 2),
+        include_out_of_stock=include_out_of_stock,
+    )
+    headers = next_cursor_headers(products, limit, "stock_quantity", "product_id")
+    return json_response(products, list[schemas.ProductOut], headers=headers)
+
+
+@router.get("/low-stock/stream")
+async def stream_low_stock_alerts(request: Request, _admin=Depends(get_stream_admin)):
+    # Alerts are raised by the writes that cross the threshold; this stream only relays them.
+    subscription = broker.subscribe(LOW_STOCK_TOPIC)
+    return sse_response(sse_events(request, subscription, "low_stock"))
+
+
 @router.get("/feedback-summary", response_model=schemas.FeedbackSummaryOut)
 def feedback_summary(db: Session = Depends(get_db), _admin=Depends(require_admin)):
     return crud.get_feedback_summary(db)
@@ -1,9 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 import crud
+import crud_async
 import schemas
-from database import get_db
+from database import get_async_db, get_db
+from utils.pagination import cursor_after_values, next_cursor_headers
+from utils.serialization import json_response
 
 router = APIRouter(prefix="/reviews", tags=["Reviews"])
 
@@ -17,5 +24,25 @@ def create_review(payload: schemas.ReviewCreate, db: Session = Depends(get_db)):
 
 
 @router.get("/product/{product_id}", response_model=list[schemas.ReviewOut])
-def list_product_reviews(product_id: int, db: Session = Depends(get_db)):
-    return crud.list_reviews_by_product(db, product_id)
+async def list_product_reviews(
+    product_id: int,
+    sort: str = Query(default="recent", pattern="^(recent|rating)$"),
+    limit: int = Query(default=50, ge=1, le=200),
+    cursor: Optional[str] = Query(default=None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    # Newest first, or highest rated first; the cursor carries the last (sort key, review_id).
+    sort_key = "rating" if sort == "rating" else "created_at"
+    before = cursor_after_values(cursor, float if sort == "rating" else datetime.fromisoformat, int)
+    rows = await crud_async.list_reviews_by_product(db, product_id, sort=sort, limit=limit, before=before)
+    headers = next_cursor_headers(rows, limit, sort_key, "review_id")
+    return json_response(rows, list[schemas.ReviewOut], headers=headers)
+
+
+@router.get("/product/{product_id}/histogram", response_model=schemas.RatingHistogramOut)
+async def product_rating_histogram(product_id: int, db: AsyncSession = Depends(get_async_db)):
+    # Read from the per-star counts kept on the product row; no review scan.
+    product = await crud_async.get_product(db, product_id)
+    if not product:
+        raise HTTPException(status_code=404, detail="Product not found")
+    return json_response(crud.rating_histogram(product), schemas.RatingHistogramOut)
@@ -5,13 +5,14 @@ import crud
 import schemas
 from database import get_db
 from utils.dependencies import require_admin
+from utils.serialization import json_response
 
 router = APIRouter(prefix="/services", tags=["Services"])
 
 
 @router.get("/", response_model=list[schemas.ServiceOut])
 def list_services(db: Session = Depends(get_db)):
-    return crud.list_services(db)
+    return json_response(crud.list_services(db), list[schemas.ServiceOut])
 
 
 @router.post("/", response_model=schemas.ServiceOut, status_code=status.HTTP_201_CREATED)
@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import date, datetime
 from typing import List, Optional
 
 from pydantic import BaseModel, EmailStr, Field
@@ -34,6 +34,11 @@ class CustomerOut(CustomerBase):
         from_attributes = True
 
 
+class StreamTicketOut(BaseModel):
+    ticket: str
+    expires_in: int
+
+
 class Token(BaseModel):
     access_token: str
     token_type: str
@@ -61,6 +66,16 @@ class AdminOut(BaseModel):
         from_attributes = True
 
 
+class PrincipalCacheStatsOut(BaseModel):
+    hits: int
+    misses: int
+    evictions: int
+    invalidations: int
+    size: int
+    max_entries: int
+    ttl_seconds: float
+
+
 class AdminToken(BaseModel):
     access_token: str
     token_type: str
@@ -93,6 +108,60 @@ class ProductOut(ProductBase):
         from_attributes = True
 
 
+class BestSellerOut(BaseModel):
+    product_id: int
+    product_name: str
+    product_type: str
+    price: float
+    rating: float
+    stock_quantity: int
+    units_sold: int
+    revenue: float
+
+
+class ProductImportErrorOut(BaseModel):
+    line: int
+    error: str
+
+
+class ProductImportReportOut(BaseModel):
+    processed: int
+    inserted: int
+    updated: int
+    failed: int
+    errors: List[ProductImportErrorOut]
+    errors_truncated: bool
+
+
+class InventoryAdjustment(BaseModel):
+    product_id: int
+    # Exactly one of delta (relative) or stock_quantity (absolute).
+    delta: Optional[int] = None
+    stock_quantity: Optional[int] = Field(default=None, ge=0)
+    # Optimistic precondition: only apply if the current stock still matches.
+    expected_stock: Optional[int] = Field(default=None, ge=0)
+
+
+class InventoryBatchRequest(BaseModel):
+    items: List[InventoryAdjustment] = Field(min_length=1, max_length=100000)
+    # When true, any failed item leaves every product unchanged.
+    atomic: bool = False
+
+
+class InventoryAdjustmentResult(BaseModel):
+    product_id: int
+    status: str
+    previous_stock: Optional[int] = None
+    stock_quantity: Optional[int] = None
+    error: Optional[str] = None
+
+
+class InventoryBatchResultOut(BaseModel):
+    applied: int
+    failed: int
+    results: List[InventoryAdjustmentResult]
+
+
 class CartAdd(BaseModel):
     customer_id: int
     product_id: int
@@ -113,6 +182,43 @@ class CartItemOut(BaseModel):
         from_attributes = True
 
 
+class CartLineSet(BaseModel):
+    product_id: int
+    # With mode "set" a quantity of 0 removes the line.
+    quantity: int = Field(ge=0)
+
+
+class CartBatchUpdate(BaseModel):
+    items: List[CartLineSet] = Field(min_length=1, max_length=500)
+    # "set" replaces each line's quantity, "merge" adds to it.
+    mode: str = Field(default="set", pattern="^(set|merge)$")
+
+
+class CartLineOut(BaseModel):
+    cart_item_id: int
+    product_id: int
+    product_name: str
+    product_type: str
+    price: float
+    stock_quantity: int
+    quantity: int
+    line_total: float
+    in_stock: bool
+
+    class Config:
+        from_attributes = True
+
+
+class CartSummaryOut(BaseModel):
+    customer_id: int
+    items: List[CartLineOut]
+    item_count: int
+    total_quantity: int
+    subtotal: float
+    total: float
+    has_out_of_stock: bool
+
+
 class PaymentCreate(BaseModel):
     payment_method: str = Field(min_length=2, max_length=50)
 
@@ -165,6 +271,16 @@ class PaymentReceiptOut(BaseModel):
     generated_at: str
 
 
+class ReceiptJobOut(BaseModel):
+    job_id: str
+    payment_id: int
+    receipt_id: str
+    status: str
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+
 class SalesSummaryOut(BaseModel):
     total_orders: int
     total_revenue: float
@@ -172,6 +288,24 @@ class SalesSummaryOut(BaseModel):
     payment_receipts_generated: int
 
 
+class SalesTimeseriesPointOut(BaseModel):
+    period_start: date
+    product_type: Optional[str] = None
+    orders: int
+    revenue: float
+    units: int
+    average_order_value: float
+
+
+class SalesTimeseriesOut(BaseModel):
+    bucket: str
+    start: date
+    end: date
+    product_type: Optional[str] = None
+    by_type: bool = False
+    points: List[SalesTimeseriesPointOut]
+
+
 class InventorySummaryOut(BaseModel):
     total_products: int
     out_of_stock: int
@@ -185,6 +319,18 @@ class TopRatedProductOut(BaseModel):
     rating: float
 
 
+class RatingBucketOut(BaseModel):
+    stars: int
+    count: int
+
+
+class RatingHistogramOut(BaseModel):
+    product_id: int
+    rating: float
+    rating_count: int
+    histogram: List[RatingBucketOut]
+
+
 class FeedbackSummaryOut(BaseModel):
     total_reviews: int
     average_rating: float
@@ -247,12 +393,17 @@ class NotificationOut(BaseModel):
     message: str
     channel: str
     related_order_id: Optional[int] = None
+    is_read: int = 0
     created_at: datetime
 
     class Config:
         from_attributes = True
 
 
+class UnreadCountOut(BaseModel):
+    unread: int
+
+
 class TrackingEventOut(BaseModel):
     event_id: int
     order_id: int
@@ -172,32 +172,46 @@ function productCard(product) {
     return wrap;
 }
 
+async function renderPopular() {
+    const wrap = document.getElementById("home-popular-wrap");
+    const grid = document.getElementById("home-popular");
+    if (!wrap || !grid) return;
+    try {
+        const products = await api("/products/best-sellers?window=7d&limit=4");
+        grid.innerHTML = "";
+        products.forEach((p) => grid.appendChild(productCard(p)));
+        wrap.hidden = !products.length;
+    } catch (err) {
+        wrap.hidden = true;
+    }
+}
+
 async function initHome() {
     const grid = document.getElementById("home-products");
     if (!grid) return;
     const sortEl = document.getElementById("home-sort");
-    const query = (localStorage.getItem("homeQuery") || "").toLowerCase();
+    const query = localStorage.getItem("homeQuery") || "";
     localStorage.removeItem("homeQuery");
-    try {
-        const products = await api("/products/");
-        productCache = products;
-        const render = () => {
-            let list = [...products];
-            if (query) {
-                list = list.filter((p) => p.product_name.toLowerCase().includes(query) || p.product_type.toLowerCase().includes(query));
-            }
+    const render = async () => {
+        try {
             const mode = sortEl?.value || "featured";
-            if (mode === "price_asc") list.sort((a, b) => a.price - b.price);
-            if (mode === "price_desc") list.sort((a, b) => b.price - a.price);
-            if (mode === "rating_desc") list.sort((a, b) => b.rating - a.rating);
+            const params = new URLSearchParams({ limit: "100" });
+            if (query) params.set("q", query);
+            params.set("sort", mode === "featured" ? "relevance" : mode);
+            const products = await api(`/products/search?${params.toString()}`);
+            productCache = products;
             grid.innerHTML = "";
-            list.forEach((p) => grid.appendChild(productCard(p)));
-        };
-        sortEl?.addEventListener("change", render);
-        render();
-    } catch (err) {
-        grid.innerHTML = `<p class="muted">Failed to load products: ${err.message}</p>`;
-    }
+            if (!products.length) {
+                grid.innerHTML = "<p class='muted'>No products found.</p>";
+                return;
+            }
+            products.forEach((p) => grid.appendChild(productCard(p)));
+        } catch (err) {
+            grid.innerHTML = `<p class="muted">Failed to load products: ${err.message}</p>`;
+        }
+    };
+    sortEl?.addEventListener("change", render);
+    await Promise.all([render(), renderPopular()]);
 }
 
 async function initProductDetail() {
@@ -228,9 +242,15 @@ async function initProductDetail() {
             alert("Added to cart");
         });
 
-        const reviews = await api(`/reviews/product/${pageProductId}`);
+        const [reviews, ratings] = await Promise.all([
+            api(`/reviews/product/${pageProductId}`),
+            api(`/reviews/product/${pageProductId}/histogram`),
+        ]);
+        const histogram = ratings.rating_count
+            ? `<p class="muted">${ratings.histogram.slice().reverse().map((b) => `${b.stars}&#9733; ${b.count}`).join(" | ")}</p>`
+            : "";
         reviewsList.innerHTML = reviews.length
-            ? reviews.map((r) => `<div class="card"><p><strong>Rating:</strong> ${r.rating}</p><p>${r.comment || ""}</p></div>`).join("")
+            ? histogram + reviews.map((r) => `<div class="card"><p><strong>Rating:</strong> ${r.rating}</p><p>${r.comment || ""}</p></div>`).join("")
             : "<p class='muted'>No reviews yet.</p>";
     } catch (err) {
         detail.innerHTML = `<p class="muted">Error: ${err.message}</p>`;
@@ -271,22 +291,18 @@ async function initCartPage() {
             listEl.innerHTML = "<p class='muted'>Login required to view cart.</p>";
             return;
         }
-        const [cart, products] = await Promise.all([api(`/cart/${me.customer_id}`), api("/products/")]);
-        const pMap = new Map(products.map((p) => [p.product_id, p]));
-        let total = 0;
-        if (!cart.length) {
+        const cart = await api(`/cart/${me.customer_id}/summary`);
+        if (!cart.items.length) {
             listEl.innerHTML = "<p class='muted'>Cart is empty.</p>";
         } else {
             listEl.innerHTML = "";
-            cart.forEach((item) => {
-                const p = pMap.get(item.product_id);
-                const sub = Number(p?.price || 0) * Number(item.quantity || 0);
-                total += sub;
+            cart.items.forEach((item) => {
                 const row = document.createElement("article");
                 row.className = "card";
                 row.innerHTML = `
-                    <h4>${p?.product_name || `Product #${item.product_id}`}</h4>
-                    <p class="muted">${formatInr(p?.price || 0)} each</p>
+                    <h4>${item.product_name}</h4>
+                    <p class="muted">${formatInr(item.price)} each | Line total: ${formatInr(item.line_total)}</p>
+                    ${item.in_stock ? "" : `<p class="muted">Only ${item.stock_quantity} left in stock</p>`}
                     <div class="row">
                         <input id="qty-${item.cart_item_id}" type="number" min="1" value="${item.quantity}" style="width:90px;">
                         <div class="actions">
@@ -313,7 +329,8 @@ async function initCartPage() {
                 listEl.appendChild(row);
             });
         }
-        totalEl.textContent = formatInr(total);
+        totalEl.textContent = formatInr(cart.total);
+        if (cart.has_out_of_stock) setMsg("cart-page-msg", "Some items exceed available stock. Update quantities before checkout.", true);
         document.getElementById("clear-cart-page-btn")?.addEventListener("click", async () => {
             await api(`/cart/clear/${me.customer_id}`, { method: "DELETE" });
             setMsg("cart-page-msg", "Cart cleared.");
@@ -400,23 +417,54 @@ async function initOrdersPage() {
             `;
             card.querySelector(`[data-track="${o.order_id}"]`)?.addEventListener("click", async () => {
                 const out = card.querySelector(`#track-${o.order_id}`);
-                const events = await api(`/orders/${o.order_id}/tracking`);
-                out.innerHTML = events.length
-                    ? events.map((ev) => `${new Date(ev.created_at).toLocaleString()} - ${ev.status}${ev.note ? ` (${ev.note})` : ""}`).join("<br>")
-                    : "No tracking events.";
+                const formatEvent = (ev) => `${new Date(ev.created_at).toLocaleString()} - ${ev.status}${ev.note ? ` (${ev.note})` : ""}`;
+                if (!window.EventSource) {
+                    const events = await api(`/orders/${o.order_id}/tracking`);
+                    out.innerHTML = events.length ? events.map(formatEvent).join("<br>") : "No tracking events.";
+                    return;
+                }
+                if (out.dataset.streaming) return;
+                // History arrives first, then new events are pushed as they are recorded.
+                out.dataset.streaming = "1";
+                out.innerHTML = "No tracking events.";
+                const stream = new EventSource(`${API_BASE}/orders/${o.order_id}/tracking/stream`);
+                stream.addEventListener("tracking", (ev) => {
+                    const line = formatEvent(JSON.parse(ev.data));
+                    out.innerHTML = out.dataset.hasEvents ? `${out.innerHTML}<br>${line}` : line;
+                    out.dataset.hasEvents = "1";
+                });
             });
             list.appendChild(card);
         });
 
         if (notificationsList) {
+            const renderNotification = (n) =>
+                `<article class="card"><h4>${n.title}</h4><p>${n.message}</p><p class="muted">${new Date(n.created_at).toLocaleString()} • ${n.channel}</p></article>`;
             const notifications = await api("/notifications/me", { headers: tokenHeaders(customerToken()) });
             notificationsList.innerHTML = notifications.length
-                ? notifications
-                    .map(
-                        (n) => `<article class="card"><h4>${n.title}</h4><p>${n.message}</p><p class="muted">${new Date(n.created_at).toLocaleString()} • ${n.channel}</p></article>`
-                    )
-                    .join("")
+                ? notifications.map(renderNotification).join("")
                 : "<p class='muted'>No notifications yet.</p>";
+
+            // New notifications are pushed over SSE instead of polling /notifications/me.
+            // The URL carries a short-lived stream ticket, never the bearer token; once the
+            // browser gives up reconnecting (e.g. the ticket expired) a fresh one is fetched.
+            const openNotificationStream = async () => {
+                const { ticket } = await api("/customers/me/stream-ticket", {
+                    method: "POST",
+                    headers: tokenHeaders(customerToken()),
+                });
+                const stream = new EventSource(`${API_BASE}/notifications/me/stream?ticket=${encodeURIComponent(ticket)}`);
+                stream.addEventListener("notification", (ev) => {
+                    if (!notificationsList.querySelector("article")) notificationsList.innerHTML = "";
+                    notificationsList.insertAdjacentHTML("afterbegin", renderNotification(JSON.parse(ev.data)));
+                });
+                stream.onerror = () => {
+                    if (stream.readyState === EventSource.CLOSED) {
+                        setTimeout(() => openNotificationStream().catch(() => {}), 3000);
+                    }
+                };
+            };
+            if (window.EventSource) await openNotificationStream();
         }
     } catch (err) {
         list.innerHTML = `<p class="muted">Orders load failed: ${err.message}</p>`;
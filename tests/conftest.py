@@ -0,0 +1,29 @@
+import os
+import tempfile
+
+# The engine is built when `database` is first imported, so point it at a scratch
+# database before anything from the app is loaded.
+TEST_DB_DIR = tempfile.mkdtemp(prefix="petshop-tests-")
+os.environ.setdefault("PETSHOP_DATABASE_URL", f"sqlite:///{TEST_DB_DIR}/petshop.db")
+os.environ.setdefault("PETSHOP_DB_PROFILE", "production")
+
+import pytest  # noqa: E402
+
+from database import Base, SessionLocal, engine, ensure_runtime_schema  # noqa: E402
+
+
+@pytest.fixture(scope="session", autouse=True)
+def schema():
+    Base.metadata.create_all(bind=engine)
+    ensure_runtime_schema()
+    yield
+    engine.dispose()
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
@@ -0,0 +1,73 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import func, insert, select
+
+import crud
+import models
+from database import SessionLocal
+
+CLIENTS = 50
+STOCK = 20
+
+
+def create_contended_carts(db) -> tuple[int, list[int]]:
+    # One product with less stock than buyers; every customer has one unit in the cart.
+    product = models.Product(
+        product_name=f"Contended {uuid.uuid4().hex[:8]}", product_type="Toys", price=100.0, stock_quantity=STOCK
+    )
+    db.add(product)
+    db.flush()
+    tag = uuid.uuid4().hex[:8]
+    first_id = (db.execute(select(func.max(models.Customer.customer_id))).scalar() or 0) + 1
+    customer_ids = list(range(first_id, first_id + CLIENTS))
+    db.execute(
+        insert(models.Customer),
+        [
+            {
+                "customer_id": customer_id,
+                "name": "Buyer",
+                "email": f"buyer{customer_id}-{tag}@test.example",
+                "password": "-",
+            }
+            for customer_id in customer_ids
+        ],
+    )
+    db.execute(
+        insert(models.CartItem),
+        [{"customer_id": customer_id, "product_id": product.product_id, "quantity": 1} for customer_id in customer_ids],
+    )
+    db.commit()
+    return product.product_id, customer_ids
+
+
+def checkout(customer_id: int, start: threading.Barrier) -> bool:
+    start.wait()
+    with SessionLocal() as session:
+        return crud.create_order_from_cart(session, customer_id, "UPI") is not None
+
+
+def test_parallel_checkouts_never_oversell(db):
+    product_id, customer_ids = create_contended_carts(db)
+    start = threading.Barrier(CLIENTS)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=CLIENTS) as pool:
+        results = list(pool.map(checkout, customer_ids, [start] * CLIENTS))
+    elapsed = time.perf_counter() - started
+
+    db.expire_all()
+    stock = db.get(models.Product, product_id).stock_quantity
+    orders = db.execute(
+        select(func.count(func.distinct(models.OrderItem.order_id))).where(models.OrderItem.product_id == product_id)
+    ).scalar()
+    units = db.execute(
+        select(func.coalesce(func.sum(models.OrderItem.quantity), 0)).where(models.OrderItem.product_id == product_id)
+    ).scalar()
+    print(f"{CLIENTS} parallel checkouts: {sum(results)} orders in {elapsed:.2f}s, {CLIENTS / elapsed:.0f} checkouts/s")
+
+    assert stock >= 0
+    assert sum(results) == orders == STOCK
+    assert units + stock == STOCK
@@ -0,0 +1,14 @@
+import asyncio
+
+from utils.notification_dispatcher import NotificationDispatcher
+
+
+def test_stop_right_after_start_returns():
+    async def start_and_stop():
+        dispatcher = NotificationDispatcher(batch_size=10, poll_seconds=60)
+        dispatcher.start()
+        # stop() runs inline, before the dispatcher task has taken its first step.
+        async with asyncio.timeout(5):
+            await dispatcher.stop()
+
+    asyncio.run(start_and_stop())
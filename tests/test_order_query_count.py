@@ -0,0 +1,39 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from database import engine
+from main import app
+from utils.dependencies import require_admin
+from utils.synthetic_data import GeneratorConfig, generate
+
+# One query for the orders page plus one selectin load each for items and payments,
+# whatever the page size. More than this means a per-row lazy load crept back in.
+ORDER_LIST_QUERIES = 3
+
+
+@pytest.fixture(scope="module")
+def client():
+    generate(GeneratorConfig(customers=50, products=20, orders=600, days=30, batch_size=1000))
+    app.dependency_overrides[require_admin] = lambda: None
+    yield TestClient(app)
+    app.dependency_overrides.pop(require_admin)
+
+
+@pytest.mark.parametrize("limit", [1, 10, 100, 500])
+def test_order_list_runs_fixed_number_of_queries(client, limit):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = client.get("/orders/", params={"limit": limit})
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert response.status_code == 200
+    assert len(response.json()) == limit
+    assert all(order["items"] and order["payment"] for order in response.json())
+    assert len(statements) == ORDER_LIST_QUERIES, statements
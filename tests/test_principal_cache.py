@@ -0,0 +1,36 @@
+import uuid
+
+import crud
+import models
+from utils.auth import create_access_token
+from utils.dependencies import resolve_customer
+from utils.principal_cache import principal_cache
+
+
+def create_customer_token(db) -> tuple[int, str]:
+    customer = models.Customer(name="Cached", email=f"cached-{uuid.uuid4().hex[:8]}@test.example", password="-")
+    db.add(customer)
+    db.commit()
+    return customer.customer_id, create_access_token({"sub": str(customer.customer_id), "role": "customer"})
+
+
+def test_resolve_caches_principal(db):
+    customer_id, token = create_customer_token(db)
+
+    assert resolve_customer(token, db).customer_id == customer_id
+    assert principal_cache.get(token, "customer").customer_id == customer_id
+
+
+def test_invalidate_during_resolve_is_not_recached(db, monkeypatch):
+    customer_id, token = create_customer_token(db)
+    get_customer = crud.get_customer
+
+    def read_then_update(session, principal_id):
+        # The request has read the old row; an update commits and invalidates before put().
+        customer = get_customer(session, principal_id)
+        principal_cache.invalidate("customer", principal_id)
+        return customer
+
+    monkeypatch.setattr(crud, "get_customer", read_then_update)
+    assert resolve_customer(token, db).customer_id == customer_id
+    assert principal_cache.get(token, "customer") is None
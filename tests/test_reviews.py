@@ -0,0 +1,113 @@
+import uuid
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import insert, select
+
+import crud
+import models
+import schemas
+from main import app
+
+RATING_COLUMNS = ("rating", "rating_sum", "rating_count", *(f"rating_{stars}_count" for stars in crud.RATING_STARS))
+
+
+def create_product(db) -> int:
+    product = models.Product(
+        product_name=f"Reviewed {uuid.uuid4().hex[:8]}", product_type="Toys", price=10.0, stock_quantity=10
+    )
+    db.add(product)
+    db.commit()
+    return product.product_id
+
+
+def create_customer(db) -> int:
+    customer = models.Customer(name="Reviewer", email=f"reviewer-{uuid.uuid4().hex[:8]}@test.example", password="-")
+    db.add(customer)
+    db.commit()
+    return customer.customer_id
+
+
+def review(db, customer_id: int, product_id: int, rating: float) -> models.Review:
+    return crud.create_review(db, schemas.ReviewCreate(customer_id=customer_id, product_id=product_id, rating=rating))
+
+
+def product_ratings(db, product_ids: list[int]) -> dict:
+    db.expire_all()
+    columns = [getattr(models.Product, column) for column in RATING_COLUMNS]
+    rows = db.execute(select(models.Product.product_id, *columns).where(models.Product.product_id.in_(product_ids)))
+    return {row.product_id: tuple(round(value, 6) for value in row[1:]) for row in rows}
+
+
+def assert_ratings_match_rebuild(db, product_ids: list[int]) -> None:
+    maintained = product_ratings(db, product_ids)
+    crud.rebuild_product_ratings(db)
+    assert maintained == product_ratings(db, product_ids)
+
+
+def test_ratings_match_rebuild_after_reviews_and_customer_delete(db):
+    products = [create_product(db), create_product(db)]
+    leaving, staying = create_customer(db), create_customer(db)
+    for customer_id, product_id, rating in (
+        (leaving, products[0], 5.0),
+        (leaving, products[0], 4.5),
+        (leaving, products[1], 2.5),
+        (staying, products[0], 1.0),
+        (staying, products[1], 3.5),
+    ):
+        review(db, customer_id, product_id, rating)
+    assert_ratings_match_rebuild(db, products)
+
+    assert crud.delete_customer(db, leaving)
+    # 3.5 counts as four stars (half up).
+    assert product_ratings(db, products) == {
+        products[0]: (1.0, 1.0, 1, 1, 0, 0, 0, 0),
+        products[1]: (3.5, 3.5, 1, 0, 0, 0, 1, 0),
+    }
+    assert_ratings_match_rebuild(db, products)
+
+    assert crud.delete_customer(db, staying)
+    assert product_ratings(db, products) == {product_id: (0.0, 0.0, 0, 0, 0, 0, 0, 0) for product_id in products}
+    assert_ratings_match_rebuild(db, products)
+
+
+@pytest.mark.parametrize("sort", ["recent", "rating"])
+def test_review_cursor_pages_through_tied_sort_keys(db, sort):
+    product_id = create_product(db)
+    customer_id = create_customer(db)
+    # Several reviews share each timestamp and each rating, so only review_id breaks ties.
+    db.execute(
+        insert(models.Review),
+        [
+            {
+                "customer_id": customer_id,
+                "product_id": product_id,
+                "rating": (4.0, 2.0)[index % 2],
+                "created_at": datetime(2026, 1, 1 + index // 3),
+            }
+            for index in range(7)
+        ],
+    )
+    db.commit()
+    client = TestClient(app)
+
+    pages, cursor = [], None
+    while True:
+        params = {"sort": sort, "limit": 2} | ({"cursor": cursor} if cursor else {})
+        response = client.get(f"/reviews/product/{product_id}", params=params)
+        assert response.status_code == 200
+        pages.append([row["review_id"] for row in response.json()])
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    sort_columns = crud.review_sort_columns(sort)
+    expected = db.execute(
+        select(models.Review.review_id)
+        .where(models.Review.product_id == product_id)
+        .order_by(*(column.desc() for column in sort_columns))
+    ).scalars().all()
+    assert len(expected) == 7
+    assert [review_id for page in pages for review_id in page] == expected
+    assert all(len(page) == 2 for page in pages[:-1])
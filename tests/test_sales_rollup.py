@@ -0,0 +1,76 @@
+import uuid
+
+from sqlalchemy import insert, select
+
+import crud
+import models
+import schemas
+
+
+def create_product(db, product_type: str, price: float) -> int:
+    product = models.Product(
+        product_name=f"Rollup {uuid.uuid4().hex[:8]}", product_type=product_type, price=price, stock_quantity=100
+    )
+    db.add(product)
+    db.commit()
+    return product.product_id
+
+
+def create_customer(db) -> int:
+    customer = models.Customer(name="Rollup", email=f"rollup-{uuid.uuid4().hex[:8]}@test.example", password="-")
+    db.add(customer)
+    db.commit()
+    return customer.customer_id
+
+
+def place_order(db, customer_id: int, quantities: dict[int, int]) -> None:
+    db.execute(
+        insert(models.CartItem),
+        [
+            {"customer_id": customer_id, "product_id": product_id, "quantity": quantity}
+            for product_id, quantity in quantities.items()
+        ],
+    )
+    db.commit()
+    assert crud.create_order_from_cart(db, customer_id, "UPI") is not None
+
+
+def sales_rollup(db) -> dict:
+    db.expire_all()
+    return {
+        (row.product_type, row.day): (row.orders, round(row.revenue, 2), row.units)
+        for row in db.execute(select(models.SalesDaily)).scalars()
+    }
+
+
+def test_sales_rollup_matches_rebuild_after_type_change_and_deletes(db):
+    toy = create_product(db, "Toys", 10.0)
+    other_toy = create_product(db, "Toys", 5.0)
+    bed = create_product(db, "Beds", 20.0)
+    first, second, third = create_customer(db), create_customer(db), create_customer(db)
+    place_order(db, first, {toy: 2})
+    place_order(db, second, {toy: 2, other_toy: 1})
+    place_order(db, third, {toy: 1, bed: 1})
+
+    # Into a type that is already on one of the orders, then again through a catalog import.
+    crud.update_product(db, toy, schemas.ProductUpdate(product_type="Beds"))
+    [current] = db.execute(select(models.Product).where(models.Product.product_id == toy)).scalars()
+    crud.upsert_products(
+        db,
+        [
+            {
+                "product_id": toy,
+                "product_name": current.product_name,
+                "product_type": "Food",
+                "price": current.price,
+                "stock_quantity": current.stock_quantity,
+            }
+        ],
+        key="id",
+    )
+    assert crud.delete_customer(db, first)
+    assert crud.delete_product(db, other_toy)
+
+    live = sales_rollup(db)
+    crud.rebuild_sales_rollup(db)
+    assert live == sales_rollup(db)
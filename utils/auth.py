@@ -1,6 +1,9 @@
+import asyncio
 import hashlib
 import hmac
 import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import Any, Optional
 
@@ -12,6 +15,22 @@ SECRET_KEY = os.getenv(
 )
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24
+# EventSource URLs cannot carry headers and end up in access/proxy logs, so streams take a
+# short-lived ticket in the query string instead of the long-lived bearer token.
+STREAM_TICKET_TTL_SECONDS = int(os.getenv("PETSHOP_STREAM_TICKET_TTL_SECONDS", "60"))
+STREAM_TICKET_AUDIENCE = "petshop:stream"
+
+# PBKDF2 runs in a dedicated process pool so login bursts do not tie up request threads.
+HASH_POOL_WORKERS = int(os.getenv("PETSHOP_HASH_POOL_WORKERS", str(min(4, os.cpu_count() or 1))))
+HASH_POOL_QUEUE_DEPTH = int(os.getenv("PETSHOP_HASH_POOL_QUEUE_DEPTH", str(HASH_POOL_WORKERS * 8)))
+
+_hash_executor: Optional[ProcessPoolExecutor] = None
+_hash_executor_lock = threading.Lock()
+_hash_slots = threading.BoundedSemaphore(HASH_POOL_WORKERS + HASH_POOL_QUEUE_DEPTH)
+
+
+class HashingPoolBusy(RuntimeError):
+    """Raised when every hashing worker is busy and the wait queue is full."""
 
 
 def hash_password(password: str) -> str:
@@ -32,6 +51,41 @@ def verify_password(plain_password: str, stored_password: str) -> bool:
     return hmac.compare_digest(check_hash, expected_hash)
 
 
+def get_hash_executor() -> ProcessPoolExecutor:
+    global _hash_executor
+    with _hash_executor_lock:
+        if _hash_executor is None:
+            _hash_executor = ProcessPoolExecutor(max_workers=HASH_POOL_WORKERS)
+        return _hash_executor
+
+
+def shutdown_hash_executor() -> None:
+    global _hash_executor
+    with _hash_executor_lock:
+        if _hash_executor is not None:
+            _hash_executor.shutdown(wait=False, cancel_futures=True)
+            _hash_executor = None
+
+
+async def run_in_hash_pool(func, *args):
+    # Fail fast instead of queueing without bound; callers turn this into a 503.
+    if not _hash_slots.acquire(blocking=False):
+        raise HashingPoolBusy("Password hashing is saturated, retry shortly")
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_hash_executor(), func, *args)
+    finally:
+        _hash_slots.release()
+
+
+async def hash_password_async(password: str) -> str:
+    return await run_in_hash_pool(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, stored_password: str) -> bool:
+    return await run_in_hash_pool(verify_password, plain_password, stored_password)
+
+
 def create_access_token(data: dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
@@ -39,6 +93,22 @@ def create_access_token(data: dict[str, Any], expires_delta: Optional[timedelta]
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
+def create_stream_ticket(role: str, subject_id: int) -> str:
+    # The audience claim makes decode_access_token reject tickets, so one leaked from a
+    # log can only open an event stream, and only until it expires.
+    expire = datetime.now(timezone.utc) + timedelta(seconds=STREAM_TICKET_TTL_SECONDS)
+    to_encode = {"sub": str(subject_id), "role": role, "aud": STREAM_TICKET_AUDIENCE, "exp": expire}
+    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+
+
+def decode_stream_ticket(ticket: str) -> Optional[dict[str, Any]]:
+    try:
+        payload = jwt.decode(ticket, SECRET_KEY, algorithms=[ALGORITHM], audience=STREAM_TICKET_AUDIENCE)
+    except jwt.PyJWTError:
+        return None
+    return payload
+
+
 def decode_access_token(token: str) -> Optional[dict[str, Any]]:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
@@ -0,0 +1,94 @@
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional
+
+from fastapi import Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import crud_async
+
+CATALOG_CACHE_MAX_ENTRIES = int(os.getenv("PETSHOP_CATALOG_CACHE_MAX_ENTRIES", "256"))
+CATALOG_CACHE_CONTROL = "public, max-age=0, must-revalidate"
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: bytes
+    headers: dict
+
+
+class CatalogCache:
+    """Rendered GET responses keyed by catalog version and URL.
+
+    The version itself lives in the database (``catalog_version``), so every worker and
+    CLI tool agrees on it; this cache only keeps bodies for the newest version seen.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._version: Optional[tuple[str, int]] = None
+        self._responses: OrderedDict[tuple, CachedResponse] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, version: tuple[str, int], key: tuple) -> Optional[CachedResponse]:
+        with self._lock:
+            if version != self._version:
+                return None
+            entry = self._responses.get(key)
+            if entry is not None:
+                self._responses.move_to_end(key)
+            return entry
+
+    def put(self, version: tuple[str, int], key: tuple, body: bytes, headers: dict) -> CachedResponse:
+        entry = CachedResponse(body=body, headers=headers)
+        with self._lock:
+            if self.max_entries <= 0:
+                return entry
+            if version != self._version:
+                # A request that read an older version finished late; serve it but do not keep it.
+                if self._version is not None and version[0] == self._version[0] and version[1] < self._version[1]:
+                    return entry
+                self._version = version
+                self._responses.clear()
+            self._responses[key] = entry
+            while len(self._responses) > self.max_entries:
+                self._responses.popitem(last=False)
+        return entry
+
+
+catalog_cache = CatalogCache(CATALOG_CACHE_MAX_ENTRIES)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {tag.strip() for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def catalog_etag(version: tuple[str, int]) -> str:
+    epoch, number = version
+    return f'W/"catalog-{epoch}-{number}"'
+
+
+async def serve_catalog_response(
+    request: Request,
+    db: AsyncSession,
+    render: Callable[[], Awaitable[tuple[bytes, dict]]],
+) -> Response:
+    # Read the version (one primary-key lookup) before the data so a concurrent write can
+    # only make this entry stale (and uncacheable), never label old data with a new version.
+    version = await crud_async.catalog_version(db)
+    etag = catalog_etag(version)
+    headers = {"ETag": etag, "Cache-Control": CATALOG_CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    key = (request.url.path, tuple(sorted(request.query_params.multi_items())))
+    entry = catalog_cache.get(version, key)
+    if entry is None:
+        body, extra_headers = await render()
+        entry = catalog_cache.put(version, key, body, extra_headers)
+    return Response(content=entry.body, media_type="application/json", headers={**entry.headers, **headers})
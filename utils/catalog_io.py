@@ -0,0 +1,245 @@
+import argparse
+import codecs
+import csv
+import io
+import json
+import os
+import sys
+import time
+from typing import BinaryIO, Iterable, Iterator, Optional
+
+from pydantic import ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+
+import crud
+import schemas
+from database import Base, SessionLocal, engine, ensure_runtime_schema
+
+CATALOG_FORMATS = ("csv", "ndjson")
+CATALOG_IMPORT_BATCH_SIZE = int(os.getenv("PETSHOP_CATALOG_IMPORT_BATCH_SIZE", "5000"))
+CATALOG_EXPORT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+EXPORT_COLUMNS = ("product_id", "product_name", "product_type", "price", "stock_quantity", "rating")
+READ_CHUNK_BYTES = 1 << 16
+
+
+def iter_text_lines(chunks: Iterable[bytes]) -> Iterator[str]:
+    # Incremental decode keeps memory flat; line endings are kept for csv's quoted newlines.
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    for chunk in chunks:
+        lines = (pending + decoder.decode(chunk)).split("\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+def iter_file_chunks(stream: BinaryIO) -> Iterator[bytes]:
+    while True:
+        chunk = stream.read(READ_CHUNK_BYTES)
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_records(lines: Iterable[str], fmt: str) -> Iterator[tuple[int, object]]:
+    """Yield (line number, record dict) pairs; a record that cannot be parsed is yielded as its ValueError."""
+    if fmt == "csv":
+        reader = csv.DictReader(lines)
+        for record in reader:
+            if None in record:
+                yield reader.line_num, ValueError("Row has more fields than the header")
+            else:
+                yield reader.line_num, record
+    elif fmt == "ndjson":
+        for line_no, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as exc:
+                yield line_no, ValueError(f"Invalid JSON: {exc}")
+                continue
+            if isinstance(record, dict):
+                yield line_no, record
+            else:
+                yield line_no, ValueError("Each line must be a JSON object")
+    else:
+        raise ValueError(f"Unknown format '{fmt}'. Choose from: {', '.join(CATALOG_FORMATS)}")
+
+
+def parse_product_row(record: dict, key: str) -> dict:
+    try:
+        product = schemas.ProductCreate.model_validate(record)
+    except ValidationError as exc:
+        raise ValueError("; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in exc.errors()))
+    row = product.model_dump()
+    if key == "id":
+        try:
+            row["product_id"] = int(record.get("product_id"))
+        except (TypeError, ValueError):
+            raise ValueError("product_id: a positive integer is required when importing by id")
+        if row["product_id"] <= 0:
+            raise ValueError("product_id: a positive integer is required when importing by id")
+    return row
+
+
+class ProductImporter:
+    """Validates records and upserts them in batches, one transaction per batch."""
+
+    def __init__(self, db, key: str = "name", batch_size: int = CATALOG_IMPORT_BATCH_SIZE):
+        if key not in ("name", "id"):
+            raise ValueError("key must be 'name' or 'id'")
+        self.db = db
+        self.key = key
+        self.batch_size = batch_size
+        # Keyed by product name/id so a repeated key inside a batch keeps its last row.
+        self._pending: dict = {}
+        self._pending_lines: list[int] = []
+        self.processed = 0
+        self.inserted = 0
+        self.updated = 0
+        self.failed = 0
+        self.errors: list[dict] = []
+
+    def add(self, line_no: int, record) -> None:
+        self.processed += 1
+        if isinstance(record, Exception):
+            self._error(line_no, str(record))
+            return
+        try:
+            row = parse_product_row(record, self.key)
+        except ValueError as exc:
+            self._error(line_no, str(exc))
+            return
+        self._pending[row["product_name"] if self.key == "name" else row["product_id"]] = row
+        self._pending_lines.append(line_no)
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        try:
+            inserted, updated = crud.upsert_products(self.db, list(self._pending.values()), self.key)
+        except SQLAlchemyError as exc:
+            self.db.rollback()
+            message = f"Batch rejected by the database: {exc.__class__.__name__}"
+            for line_no in self._pending_lines:
+                self._error(line_no, message)
+        else:
+            self.inserted += inserted
+            self.updated += updated
+        self._pending.clear()
+        self._pending_lines.clear()
+
+    def report(self) -> dict:
+        return {
+            "processed": self.processed,
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+    def _error(self, line_no: int, message: str) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line_no, "error": message})
+
+
+def import_products(
+    db,
+    chunks: Iterable[bytes],
+    fmt: str,
+    key: str = "name",
+    batch_size: int = CATALOG_IMPORT_BATCH_SIZE,
+) -> dict:
+    importer = ProductImporter(db, key=key, batch_size=batch_size)
+    for line_no, record in iter_records(iter_text_lines(chunks), fmt):
+        importer.add(line_no, record)
+    importer.flush()
+    return importer.report()
+
+
+def import_stream(stream: BinaryIO, fmt: str, key: str = "name", batch_size: int = CATALOG_IMPORT_BATCH_SIZE) -> dict:
+    db = SessionLocal()
+    try:
+        return import_products(db, iter_file_chunks(stream), fmt, key=key, batch_size=batch_size)
+    finally:
+        db.close()
+
+
+def export_products(db, fmt: str, batch_size: int = CATALOG_EXPORT_BATCH_SIZE) -> Iterator[str]:
+    if fmt not in CATALOG_FORMATS:
+        raise ValueError(f"Unknown format '{fmt}'. Choose from: {', '.join(CATALOG_FORMATS)}")
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerow(EXPORT_COLUMNS)
+        for rows in crud.iter_product_batches(db, batch_size):
+            writer.writerows(rows)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue()
+    else:
+        for rows in crud.iter_product_batches(db, batch_size):
+            yield "".join(json.dumps(dict(zip(EXPORT_COLUMNS, row)), ensure_ascii=False) + "\n" for row in rows)
+
+
+def format_from_path(path: str, fmt: Optional[str]) -> str:
+    if fmt:
+        return fmt
+    return "ndjson" if path.endswith((".ndjson", ".jsonl")) else "csv"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk import/export the Online Pet Shop catalog")
+    sub = parser.add_subparsers(dest="command", required=True)
+    import_cmd = sub.add_parser("import", help="upsert products from a CSV or NDJSON file ('-' for stdin)")
+    import_cmd.add_argument("path")
+    import_cmd.add_argument("--format", choices=CATALOG_FORMATS)
+    import_cmd.add_argument("--key", choices=("name", "id"), default="name")
+    import_cmd.add_argument("--batch-size", type=int, default=CATALOG_IMPORT_BATCH_SIZE)
+    export_cmd = sub.add_parser("export", help="write the catalog as CSV or NDJSON ('-' for stdout)")
+    export_cmd.add_argument("path")
+    export_cmd.add_argument("--format", choices=CATALOG_FORMATS)
+    args = parser.parse_args(argv)
+
+    Base.metadata.create_all(bind=engine)
+    ensure_runtime_schema()
+    db = SessionLocal()
+    started = time.perf_counter()
+    try:
+        fmt = format_from_path(args.path, args.format)
+        if args.command == "import":
+            stream = sys.stdin.buffer if args.path == "-" else open(args.path, "rb")
+            try:
+                report = import_stream(stream, fmt, key=args.key, batch_size=args.batch_size)
+            finally:
+                if stream is not sys.stdin.buffer:
+                    stream.close()
+            for error in report["errors"]:
+                print(f"line {error['line']}: {error['error']}", file=sys.stderr)
+            for field in ("processed", "inserted", "updated", "failed"):
+                print(f"{field}={report[field]}")
+        else:
+            out = sys.stdout if args.path == "-" else open(args.path, "w", encoding="utf-8", newline="")
+            try:
+                for chunk in export_products(db, fmt):
+                    out.write(chunk)
+            finally:
+                if out is not sys.stdout:
+                    out.close()
+        print(f"seconds={time.perf_counter() - started:.2f}", file=sys.stderr if args.path == "-" else sys.stdout)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,44 +1,108 @@
-from fastapi import Depends, HTTPException
+from typing import Optional
+
+from fastapi import Depends, HTTPException, Query
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.orm import Session
 
 import crud
 import models
-from database import get_db
-from utils.auth import decode_access_token
+from database import SessionLocal, get_db
+from utils.auth import decode_access_token, decode_stream_ticket
+from utils.principal_cache import principal_cache, principal_snapshot
 
 bearer_scheme = HTTPBearer(auto_error=False)
 
 
-def get_current_customer(
-    creds: HTTPAuthorizationCredentials = Depends(bearer_scheme),
-    db: Session = Depends(get_db),
-) -> models.Customer:
-    if not creds:
-        raise HTTPException(status_code=401, detail="Missing bearer token")
+def resolve_customer(token: str, db: Session) -> models.Customer:
+    # Repeat calls with the same token skip both the JWT decode and the DB lookup.
+    cached = principal_cache.get(token, "customer")
+    if cached is not None:
+        return cached
 
-    payload = decode_access_token(creds.credentials)
+    payload = decode_access_token(token)
     if not payload or payload.get("role") != "customer" or "sub" not in payload:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
 
-    customer = crud.get_customer(db, int(payload["sub"]))
+    principal_id = int(payload["sub"])
+    # Captured before the read: an update/delete committed meanwhile must not be re-cached.
+    generation = principal_cache.generation("customer", principal_id)
+    customer = crud.get_customer(db, principal_id)
     if not customer:
         raise HTTPException(status_code=404, detail="Customer not found")
-    return customer
+    snapshot = principal_snapshot(customer)
+    principal_cache.put(token, "customer", principal_id, snapshot, payload.get("exp"), generation)
+    return snapshot
 
 
-def require_admin(
+def get_current_customer(
     creds: HTTPAuthorizationCredentials = Depends(bearer_scheme),
     db: Session = Depends(get_db),
-) -> models.Admin:
+) -> models.Customer:
     if not creds:
         raise HTTPException(status_code=401, detail="Missing bearer token")
+    return resolve_customer(creds.credentials, db)
+
+
+def get_stream_customer(
+    creds: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+    ticket: Optional[str] = Query(default=None),
+) -> models.Customer:
+    # EventSource cannot send headers, so browsers pass ?ticket= from
+    # POST /customers/me/stream-ticket. The session is closed before streaming starts
+    # instead of living as long as the connection.
+    with SessionLocal() as db:
+        if creds:
+            return resolve_customer(creds.credentials, db)
+        payload = decode_stream_ticket(ticket) if ticket else None
+        if not payload or payload.get("role") != "customer" or "sub" not in payload:
+            raise HTTPException(status_code=401, detail="Missing or expired stream ticket")
+        customer = crud.get_customer(db, int(payload["sub"]))
+        if not customer:
+            raise HTTPException(status_code=404, detail="Customer not found")
+        return principal_snapshot(customer)
 
-    payload = decode_access_token(creds.credentials)
+
+def resolve_admin(token: str, db: Session) -> models.Admin:
+    cached = principal_cache.get(token, "admin")
+    if cached is not None:
+        return cached
+
+    payload = decode_access_token(token)
     if not payload or payload.get("role") != "admin" or "sub" not in payload:
         raise HTTPException(status_code=403, detail="Admin access required")
 
-    admin = crud.get_admin(db, int(payload["sub"]))
+    principal_id = int(payload["sub"])
+    generation = principal_cache.generation("admin", principal_id)
+    admin = crud.get_admin(db, principal_id)
     if not admin:
         raise HTTPException(status_code=404, detail="Admin not found")
-    return admin
+    snapshot = principal_snapshot(admin)
+    principal_cache.put(token, "admin", principal_id, snapshot, payload.get("exp"), generation)
+    return snapshot
+
+
+def require_admin(
+    creds: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+    db: Session = Depends(get_db),
+) -> models.Admin:
+    if not creds:
+        raise HTTPException(status_code=401, detail="Missing bearer token")
+    return resolve_admin(creds.credentials, db)
+
+
+def get_stream_admin(
+    creds: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+    ticket: Optional[str] = Query(default=None),
+) -> models.Admin:
+    # Same ?ticket= fallback (from POST /admins/me/stream-ticket) and short-lived session
+    # as get_stream_customer.
+    with SessionLocal() as db:
+        if creds:
+            return resolve_admin(creds.credentials, db)
+        payload = decode_stream_ticket(ticket) if ticket else None
+        if not payload or payload.get("role") != "admin" or "sub" not in payload:
+            raise HTTPException(status_code=401, detail="Missing or expired stream ticket")
+        admin = crud.get_admin(db, int(payload["sub"]))
+        if not admin:
+            raise HTTPException(status_code=404, detail="Admin not found")
+        return principal_snapshot(admin)
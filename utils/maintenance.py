@@ -0,0 +1,59 @@
+import argparse
+
+import crud
+from database import Base, SessionLocal, engine, ensure_runtime_schema
+
+
+def rebuild_sales_counters(db):
+    counters = crud.rebuild_sales_counters(db)
+    print(f"total_orders={counters.total_orders}")
+    print(f"total_revenue={counters.total_revenue}")
+    print(f"total_items_sold={counters.total_items_sold}")
+    print(f"payment_receipts_generated={counters.payment_receipts_generated}")
+
+
+def rebuild_product_ratings(db):
+    updated = crud.rebuild_product_ratings(db)
+    print(f"products_updated={updated}")
+
+
+def rebuild_sales_rollup(db):
+    rows = crud.rebuild_sales_rollup(db)
+    print(f"sales_rollup_rows={rows}")
+
+
+def rebuild_best_sellers(db):
+    rows = crud.rebuild_product_sales(db)
+    print(f"product_sales_daily_rows={rows}")
+
+
+def roll_sales_windows(db):
+    rolled = crud.roll_sales_windows(db)
+    print(f"rolled={int(rolled)}")
+
+
+COMMANDS = {
+    "rebuild-best-sellers": rebuild_best_sellers,
+    "rebuild-ratings": rebuild_product_ratings,
+    "rebuild-sales-counters": rebuild_sales_counters,
+    "rebuild-sales-rollup": rebuild_sales_rollup,
+    "roll-sales-windows": roll_sales_windows,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Online Pet Shop maintenance commands")
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    args = parser.parse_args(argv)
+
+    Base.metadata.create_all(bind=engine)
+    ensure_runtime_schema()
+    db = SessionLocal()
+    try:
+        COMMANDS[args.command](db)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import json
+import logging
+import os
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+NOTIFICATION_LOG_PATH = os.getenv("PETSHOP_NOTIFICATION_LOG", "notifications.log")
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class OutboundNotification:
+    outbox_id: int
+    notification_id: int
+    customer_id: int
+    recipient_email: Optional[str]
+    recipient_phone: Optional[str]
+    title: str
+    message: str
+    related_order_id: Optional[int]
+    attempt: int
+
+
+class UnknownChannel(LookupError):
+    """Raised when an outbox row names a channel nothing is registered for."""
+
+
+class NotificationChannel(ABC):
+    """Delivery backend for one channel name. send() raises to ask for a retry."""
+
+    @abstractmethod
+    def send(self, notification: OutboundNotification) -> None:
+        ...
+
+
+class LogFileChannel(NotificationChannel):
+    """Local stand-in for email/SMS: appends one JSON line per delivery."""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def send(self, notification: OutboundNotification) -> None:
+        record = {"delivered_at": datetime.utcnow().isoformat(), **asdict(notification)}
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as handle:
+                handle.write(line + "\n")
+        logger.info("notification %s delivered to customer %s", notification.notification_id, notification.customer_id)
+
+
+_channels: dict[str, NotificationChannel] = {}
+
+
+def register_channel(name: str, channel: NotificationChannel) -> None:
+    _channels[name] = channel
+
+
+def get_channel(name: str) -> NotificationChannel:
+    try:
+        return _channels[name]
+    except KeyError:
+        raise UnknownChannel(f"No delivery channel registered for '{name}'")
+
+
+register_channel("MOCK_EMAIL_SMS", LogFileChannel(NOTIFICATION_LOG_PATH))
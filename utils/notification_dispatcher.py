@@ -0,0 +1,145 @@
+import argparse
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+
+import crud
+from database import Base, SessionLocal, engine, ensure_runtime_schema
+from utils.notification_channels import OutboundNotification, get_channel
+
+NOTIFICATION_DISPATCHER_ENABLED = os.getenv("PETSHOP_NOTIFICATION_DISPATCHER", "1").lower() in ("1", "true", "yes")
+NOTIFICATION_BATCH_SIZE = int(os.getenv("PETSHOP_NOTIFICATION_BATCH_SIZE", "50"))
+NOTIFICATION_POLL_SECONDS = float(os.getenv("PETSHOP_NOTIFICATION_POLL_SECONDS", "2"))
+NOTIFICATION_LEASE_SECONDS = float(os.getenv("PETSHOP_NOTIFICATION_LEASE_SECONDS", "60"))
+NOTIFICATION_MAX_ATTEMPTS = int(os.getenv("PETSHOP_NOTIFICATION_MAX_ATTEMPTS", "5"))
+NOTIFICATION_RETRY_BASE_SECONDS = float(os.getenv("PETSHOP_NOTIFICATION_RETRY_BASE_SECONDS", "5"))
+NOTIFICATION_RETRY_MAX_SECONDS = float(os.getenv("PETSHOP_NOTIFICATION_RETRY_MAX_SECONDS", "900"))
+
+logger = logging.getLogger(__name__)
+
+
+def retry_delay_seconds(attempts: int) -> float:
+    # Exponential backoff: base, 2x base, 4x base, ... capped.
+    return min(NOTIFICATION_RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0), NOTIFICATION_RETRY_MAX_SECONDS)
+
+
+def dispatch_batch(db, batch_size: int = NOTIFICATION_BATCH_SIZE) -> dict:
+    claim_token, rows = crud.claim_notification_outbox(db, batch_size, NOTIFICATION_LEASE_SECONDS)
+    stats = {"claimed": len(rows), "sent": 0, "retried": 0, "failed": 0}
+    sent_ids = []
+    for outbox, note, customer in rows:
+        try:
+            if note is None:
+                raise LookupError(f"Notification {outbox.notification_id} no longer exists")
+            get_channel(outbox.channel).send(
+                OutboundNotification(
+                    outbox_id=outbox.outbox_id,
+                    notification_id=note.notification_id,
+                    customer_id=note.customer_id,
+                    recipient_email=customer.email if customer else None,
+                    recipient_phone=customer.contact_no if customer else None,
+                    title=note.title,
+                    message=note.message,
+                    related_order_id=note.related_order_id,
+                    attempt=outbox.attempts,
+                )
+            )
+        except Exception as exc:  # any channel failure is recorded on the outbox row
+            error = str(exc) or exc.__class__.__name__
+            if isinstance(exc, LookupError) or outbox.attempts >= NOTIFICATION_MAX_ATTEMPTS:
+                crud.mark_outbox_failed(db, claim_token, outbox.outbox_id, error)
+                stats["failed"] += 1
+                logger.warning("notification outbox %s failed permanently: %s", outbox.outbox_id, error)
+            else:
+                next_attempt_at = datetime.utcnow() + timedelta(seconds=retry_delay_seconds(outbox.attempts))
+                crud.mark_outbox_retry(db, claim_token, outbox.outbox_id, error, next_attempt_at)
+                stats["retried"] += 1
+            continue
+        sent_ids.append(outbox.outbox_id)
+
+    crud.mark_outbox_sent(db, claim_token, sent_ids)
+    stats["sent"] = len(sent_ids)
+    db.commit()
+    return stats
+
+
+def dispatch_pending(batch_size: int = NOTIFICATION_BATCH_SIZE) -> dict:
+    db = SessionLocal()
+    try:
+        return dispatch_batch(db, batch_size)
+    finally:
+        db.close()
+
+
+class NotificationDispatcher:
+    """In-process asyncio loop that drains the notification outbox in the background."""
+
+    def __init__(self, batch_size: int, poll_seconds: float):
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self._task: Optional[asyncio.Task] = None
+        self._stop: Optional[asyncio.Event] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            # Created here rather than in run(): stop() may be called before the task's first step.
+            self._stop = asyncio.Event()
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stop.set()
+        await self._task
+        self._task = None
+        self._stop = None
+
+    async def run(self) -> None:
+        if self._stop is None:
+            # Run directly (the CLI) rather than through start().
+            self._stop = asyncio.Event()
+        while not self._stop.is_set():
+            try:
+                stats = await asyncio.to_thread(dispatch_pending, self.batch_size)
+            except Exception:
+                logger.exception("notification dispatch batch failed")
+                stats = {"claimed": 0}
+            # A full batch means more rows are probably waiting; otherwise idle until the next poll.
+            if stats["claimed"] >= self.batch_size:
+                continue
+            try:
+                await asyncio.wait_for(self._stop.wait(), self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+
+notification_dispatcher = NotificationDispatcher(NOTIFICATION_BATCH_SIZE, NOTIFICATION_POLL_SECONDS)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Deliver queued Online Pet Shop notifications")
+    parser.add_argument("--once", action="store_true", help="drain the outbox once and exit")
+    parser.add_argument("--batch-size", type=int, default=NOTIFICATION_BATCH_SIZE)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    Base.metadata.create_all(bind=engine)
+    ensure_runtime_schema()
+
+    if args.once:
+        totals = {"claimed": 0, "sent": 0, "retried": 0, "failed": 0}
+        while True:
+            stats = dispatch_pending(args.batch_size)
+            for key in totals:
+                totals[key] += stats[key]
+            if stats["claimed"] < args.batch_size:
+                break
+        for key, value in totals.items():
+            print(f"{key}={value}")
+    else:
+        asyncio.run(NotificationDispatcher(args.batch_size, NOTIFICATION_POLL_SECONDS).run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Optional
+
+from fastapi import HTTPException
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(*values: Any) -> str:
+    raw = json.dumps(list(values), separators=(",", ":"), default=str).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError):
+        raise ValueError("Invalid pagination cursor")
+    if not isinstance(values, list) or not values:
+        raise ValueError("Invalid pagination cursor")
+    return values
+
+
+def cursor_after_id(cursor: Optional[str]) -> Optional[int]:
+    # Cursors for primary-key ordered lists carry the last id seen.
+    if not cursor:
+        return None
+    try:
+        values = decode_cursor(cursor)
+        return int(values[0])
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+
+def cursor_after_timestamp(cursor: Optional[str]) -> Optional[tuple[datetime, int]]:
+    # Cursors for newest-first lists carry the last (created_at, id) seen.
+    if not cursor:
+        return None
+    try:
+        values = decode_cursor(cursor)
+        return datetime.fromisoformat(values[0]), int(values[1])
+    except (ValueError, TypeError, IndexError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+
+def cursor_after_values(cursor: Optional[str], *parsers) -> Optional[tuple]:
+    # Generic keyset cursor: one parser per sort column, e.g. (float, int).
+    if not cursor:
+        return None
+    try:
+        values = decode_cursor(cursor)
+        if len(values) != len(parsers):
+            raise ValueError("Invalid pagination cursor")
+        return tuple(parse(value) for parse, value in zip(parsers, values))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+
+def cursor_after_ints(cursor: Optional[str], count: int) -> Optional[tuple[int, ...]]:
+    # Cursors for lists ordered by integer columns, e.g. (stock_quantity, product_id).
+    return cursor_after_values(cursor, *([int] * count))
+
+
+def next_cursor_headers(rows: list, limit: int, *keys: str) -> dict:
+    # A short page means there is nothing after it, so no cursor is sent.
+    if rows and len(rows) >= limit:
+        return {NEXT_CURSOR_HEADER: encode_cursor(*(getattr(rows[-1], key) for key in keys))}
+    return {}
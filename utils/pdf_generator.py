@@ -1,3 +1,4 @@
+import io
 from pathlib import Path
 
 from reportlab.lib.pagesizes import A4
@@ -8,8 +9,13 @@ def generate_receipt_pdf(receipt: dict, output_dir: str = "receipts") -> str:
     Path(output_dir).mkdir(parents=True, exist_ok=True)
     receipt_id = receipt["receipt_id"]
     file_path = Path(output_dir) / f"{receipt_id}.pdf"
+    file_path.write_bytes(render_receipt_pdf(receipt))
+    return str(file_path)
+
 
-    c = canvas.Canvas(str(file_path), pagesize=A4)
+def render_receipt_pdf(receipt: dict) -> bytes:
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=A4)
     width, height = A4
     y = height - 50
 
@@ -63,4 +69,4 @@ def generate_receipt_pdf(receipt: dict, output_dir: str = "receipts") -> str:
         c.drawString(50, y, note[110:220])
 
     c.save()
-    return str(file_path)
+    return buffer.getvalue()
@@ -0,0 +1,122 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from sqlalchemy import inspect
+
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PETSHOP_PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+PRINCIPAL_CACHE_MAX_ENTRIES = int(os.getenv("PETSHOP_PRINCIPAL_CACHE_MAX_ENTRIES", "10000"))
+
+
+def principal_snapshot(obj):
+    # Transient copy of the column values: it never expires or lazy-loads, so it is
+    # safe to hand to requests that run on other sessions and threads.
+    mapper = inspect(obj).mapper
+    return mapper.class_(**{attr.key: getattr(obj, attr.key) for attr in mapper.column_attrs})
+
+
+class PrincipalCache:
+    """Token -> authenticated principal, bounded by TTL and entry count (LRU)."""
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, str, int, Any]] = OrderedDict()
+        self._tokens_by_principal: dict[tuple[str, int], set[str]] = {}
+        # Bumped by invalidate(); put() drops a principal read before the bump.
+        self._generations: dict[tuple[str, int], int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, token: str, role: str):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None or entry[1] != role:
+                self.misses += 1
+                return None
+            expires_at, _, principal_id, principal = entry
+            if expires_at <= now:
+                self._drop(token)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return principal
+
+    def generation(self, role: str, principal_id: int) -> int:
+        """Call before reading the principal from the DB and pass the result to put()."""
+        with self._lock:
+            return self._generations.get((role, principal_id), 0)
+
+    def put(
+        self,
+        token: str,
+        role: str,
+        principal_id: int,
+        principal,
+        token_exp: Optional[float] = None,
+        generation: Optional[int] = None,
+    ) -> None:
+        if self.max_entries <= 0 or self.ttl_seconds <= 0:
+            return
+        expires_at = time.time() + self.ttl_seconds
+        if token_exp is not None:
+            expires_at = min(expires_at, float(token_exp))
+        with self._lock:
+            if generation is not None and generation != self._generations.get((role, principal_id), 0):
+                # Invalidated while the caller was reading; the principal may be stale or deleted.
+                return
+            if token in self._entries:
+                self._drop(token)
+            self._entries[token] = (expires_at, role, principal_id, principal)
+            self._tokens_by_principal.setdefault((role, principal_id), set()).add(token)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.evictions += 1
+
+    def invalidate(self, role: str, principal_id: int) -> None:
+        with self._lock:
+            key = (role, principal_id)
+            self._generations[key] = self._generations.get(key, 0) + 1
+            tokens = self._tokens_by_principal.pop(key, set())
+            for token in tokens:
+                self._entries.pop(token, None)
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_principal.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+            }
+
+    def _drop(self, token: str) -> None:
+        entry = self._entries.pop(token, None)
+        if entry is None:
+            return
+        key = (entry[1], entry[2])
+        tokens = self._tokens_by_principal.get(key)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_principal[key]
+
+
+principal_cache = PrincipalCache(PRINCIPAL_CACHE_TTL_SECONDS, PRINCIPAL_CACHE_MAX_ENTRIES)
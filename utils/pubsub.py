@@ -0,0 +1,116 @@
+import asyncio
+import os
+import threading
+from typing import Any, Callable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+PUBSUB_QUEUE_DEPTH = int(os.getenv("PETSHOP_PUBSUB_QUEUE_DEPTH", "100"))
+
+_PENDING_KEY = "pubsub_pending"
+_READY_KEY = "pubsub_ready"
+_CALLBACKS_KEY = "pubsub_after_commit"
+
+
+class Subscription:
+    """One subscriber's bounded queue, drained on the event loop that created it."""
+
+    def __init__(self, broker: "PubSub", topic: str, maxsize: int):
+        self.broker = broker
+        self.topic = topic
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+        # Set when the subscriber fell behind; the stream should end so the client resyncs.
+        self.overflowed = False
+
+    async def get(self, timeout: float) -> Optional[Any]:
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def deliver(self, message: Any) -> None:
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    def close(self) -> None:
+        self.broker.unsubscribe(self)
+
+
+class PubSub:
+    """In-process topic fan-out to asyncio subscribers; publish() is safe from any thread."""
+
+    def __init__(self, queue_depth: int):
+        self.queue_depth = queue_depth
+        self._topics: dict[str, set[Subscription]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, topic: str) -> Subscription:
+        subscription = Subscription(self, topic, self.queue_depth)
+        with self._lock:
+            self._topics.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._topics.get(subscription.topic)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._topics[subscription.topic]
+
+    def publish(self, topic: str, message: Any) -> int:
+        with self._lock:
+            subscribers = list(self._topics.get(topic, ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, message)
+            except RuntimeError:  # loop already closed
+                self.unsubscribe(subscription)
+        return len(subscribers)
+
+    def subscriber_count(self, topic: str) -> int:
+        with self._lock:
+            return len(self._topics.get(topic, ()))
+
+
+broker = PubSub(PUBSUB_QUEUE_DEPTH)
+
+
+def publish_after_commit(db: Session, topic: str, obj: Any, serialize: Callable[[Any], Any]) -> None:
+    # Nothing is published for rolled-back work, and subscribers never see rows
+    # before they are visible to other connections.
+    db.info.setdefault(_PENDING_KEY, []).append((topic, obj, serialize))
+
+
+def call_after_commit(db: Session, callback: Callable[[], None]) -> None:
+    db.info.setdefault(_CALLBACKS_KEY, []).append(callback)
+
+
+@event.listens_for(Session, "before_commit")
+def _serialize_pending(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    # Flush first so ids and defaults are assigned; after commit the objects are expired.
+    session.flush()
+    session.info.setdefault(_READY_KEY, []).extend((topic, serialize(obj)) for topic, obj, serialize in pending)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_ready(session: Session) -> None:
+    for topic, message in session.info.pop(_READY_KEY, ()):
+        broker.publish(topic, message)
+    for callback in session.info.pop(_CALLBACKS_KEY, ()):
+        callback()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_pending(session: Session, previous_transaction) -> None:
+    for key in (_PENDING_KEY, _READY_KEY, _CALLBACKS_KEY):
+        session.info.pop(key, None)
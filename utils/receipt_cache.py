@@ -0,0 +1,93 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+RECEIPT_CACHE_DIR = os.getenv("PETSHOP_RECEIPT_DIR", "receipts")
+RECEIPT_CACHE_MAX_BYTES = int(os.getenv("PETSHOP_RECEIPT_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+RECEIPT_CACHE_MAX_AGE_SECONDS = int(os.getenv("PETSHOP_RECEIPT_CACHE_MAX_AGE_SECONDS", str(30 * 24 * 3600)))
+RECEIPT_CACHE_EVICT_INTERVAL_SECONDS = 60
+
+# Only files written by this cache are ever evicted: "<receipt_id>-<16 hex chars>.pdf".
+CACHE_FILE_PATTERN = re.compile(r"^.+-[0-9a-f]{16}\.pdf$")
+
+
+def receipt_content_key(receipt: dict) -> str:
+    # generated_at changes on every build, so it is left out of the identity of a receipt.
+    content = {k: v for k, v in receipt.items() if k != "generated_at"}
+    raw = json.dumps(content, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ReceiptCache:
+    """Rendered receipt PDFs on disk, addressed by a hash of the receipt content."""
+
+    def __init__(self, directory: str, max_bytes: int, max_age_seconds: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+        self._last_eviction = 0.0
+
+    def path_for(self, receipt: dict, key: Optional[str] = None) -> Path:
+        key = key or receipt_content_key(receipt)
+        return self.directory / f"{receipt['receipt_id']}-{key[:16]}.pdf"
+
+    def lookup(self, receipt: dict) -> Optional[Path]:
+        path = self.path_for(receipt)
+        try:
+            # Bump mtime so eviction drops the least recently used receipts first.
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def store(self, receipt: dict, pdf_bytes: bytes) -> Path:
+        path = self.path_for(receipt)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(pdf_bytes)
+        os.replace(tmp_path, path)
+        self.maybe_evict()
+        return path
+
+    def maybe_evict(self) -> None:
+        now = time.time()
+        if now - self._last_eviction < RECEIPT_CACHE_EVICT_INTERVAL_SECONDS:
+            return
+        self.evict(now)
+
+    def evict(self, now: Optional[float] = None) -> int:
+        now = now or time.time()
+        removed = 0
+        with self._lock:
+            self._last_eviction = now
+            entries = []
+            for path in self.directory.glob("*.pdf"):
+                if not CACHE_FILE_PATTERN.match(path.name):
+                    continue
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                if now - stat.st_mtime > self.max_age_seconds:
+                    path.unlink(missing_ok=True)
+                    removed += 1
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+                if total <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+                removed += 1
+        return removed
+
+
+receipt_cache = ReceiptCache(RECEIPT_CACHE_DIR, RECEIPT_CACHE_MAX_BYTES, RECEIPT_CACHE_MAX_AGE_SECONDS)
@@ -0,0 +1,186 @@
+import asyncio
+import os
+import threading
+import time
+import uuid
+import zipfile
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from utils.pdf_generator import render_receipt_pdf
+from utils.receipt_cache import ReceiptCache, receipt_cache, receipt_content_key
+
+RECEIPT_RENDER_WORKERS = int(os.getenv("PETSHOP_RECEIPT_RENDER_WORKERS", "2"))
+RECEIPT_JOB_QUEUE_DEPTH = int(os.getenv("PETSHOP_RECEIPT_JOB_QUEUE_DEPTH", "64"))
+RECEIPT_JOB_TTL_SECONDS = int(os.getenv("PETSHOP_RECEIPT_JOB_TTL_SECONDS", "3600"))
+
+
+class ReceiptQueueFull(RuntimeError):
+    """Raised when the receipt render queue already holds its maximum of pending jobs."""
+
+
+@dataclass
+class ReceiptJob:
+    job_id: str
+    payment_id: int
+    receipt_id: str
+    content_key: str
+    status: str = "PENDING"
+    error: Optional[str] = None
+    path: Optional[Path] = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    completion: Future = field(default_factory=Future, repr=False)
+
+
+class ReceiptJobQueue:
+    """Renders receipt PDFs on a bounded process pool and stores them in the receipt cache."""
+
+    def __init__(self, cache: ReceiptCache, workers: int, max_pending: int):
+        self.cache = cache
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._jobs: dict[str, ReceiptJob] = {}
+        self._inflight: dict[str, ReceiptJob] = {}
+        # (finished_at, job_id) of registered jobs in completion order, for O(expired) pruning.
+        self._expiry: deque[tuple[float, str]] = deque()
+        self._lock = threading.Lock()
+
+    def executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            return self._executor
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def submit(self, receipt: dict, register: bool = True) -> ReceiptJob:
+        # register=False is for callers that wait on the job themselves (the direct PDF
+        # download): a cache hit then returns a finished job that is never kept for polling.
+        key = receipt_content_key(receipt)
+        executor = self.executor()
+        with self._lock:
+            self._prune(time.time())
+            # Identical content already rendering: share that job instead of rendering twice.
+            inflight = self._inflight.get(key)
+            if inflight is not None:
+                return inflight
+
+            job = ReceiptJob(
+                job_id=uuid.uuid4().hex,
+                payment_id=receipt["payment_id"],
+                receipt_id=receipt["receipt_id"],
+                content_key=key,
+            )
+            cached_path = self.cache.lookup(receipt)
+            if cached_path:
+                if register:
+                    self._jobs[job.job_id] = job
+                self._complete(job, path=cached_path)
+                return job
+
+            if len(self._inflight) >= self.max_pending:
+                raise ReceiptQueueFull("Receipt rendering queue is full, retry shortly")
+            # Renders are always registered so a download that gives up waiting can name the job.
+            self._jobs[job.job_id] = job
+            self._inflight[key] = job
+
+        future = executor.submit(render_receipt_pdf, receipt)
+        future.add_done_callback(lambda done: self._finish(job, receipt, done))
+        return job
+
+    def get(self, job_id: str) -> Optional[ReceiptJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    async def wait(self, job: ReceiptJob, timeout: float) -> ReceiptJob:
+        if timeout > 0 and not job.completion.done():
+            try:
+                await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(job.completion)), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return job
+
+    def render_many(self, receipts: Iterable[dict]) -> Iterable[tuple[dict, Path]]:
+        # Batch path: cache hits are yielded as-is, misses are rendered in parallel on the pool.
+        receipts = list(receipts)
+        missing = [receipt for receipt in receipts if not self.cache.lookup(receipt)]
+        rendered = dict(
+            zip(
+                (receipt["payment_id"] for receipt in missing),
+                self.executor().map(render_receipt_pdf, missing),
+            )
+        )
+        for receipt in receipts:
+            pdf_bytes = rendered.get(receipt["payment_id"])
+            if pdf_bytes is not None:
+                yield receipt, self.cache.store(receipt, pdf_bytes)
+            else:
+                yield receipt, self.cache.path_for(receipt)
+
+    def _finish(self, job: ReceiptJob, receipt: dict, future: Future) -> None:
+        try:
+            path = self.cache.store(receipt, future.result())
+        except Exception as exc:  # surfaced through the job status
+            with self._lock:
+                self._inflight.pop(job.content_key, None)
+                self._complete(job, error=str(exc) or exc.__class__.__name__)
+            return
+        with self._lock:
+            self._inflight.pop(job.content_key, None)
+            self._complete(job, path=path)
+
+    def _complete(self, job: ReceiptJob, path: Optional[Path] = None, error: Optional[str] = None) -> None:
+        job.path = path
+        job.error = error
+        job.status = "FAILED" if error else "DONE"
+        job.finished_at = time.time()
+        job.completion.set_result(job)
+        if job.job_id in self._jobs:
+            self._expiry.append((job.finished_at, job.job_id))
+
+    def _prune(self, now: float) -> None:
+        # Jobs are appended as they finish, so the expired ones are always at the front.
+        while self._expiry and now - self._expiry[0][0] > RECEIPT_JOB_TTL_SECONDS:
+            _, job_id = self._expiry.popleft()
+            del self._jobs[job_id]
+
+
+receipt_jobs = ReceiptJobQueue(receipt_cache, RECEIPT_RENDER_WORKERS, RECEIPT_JOB_QUEUE_DEPTH)
+
+
+class ZipStreamBuffer:
+    """Write-only, non-seekable sink so zipfile emits the archive incrementally."""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_receipts_zip(receipt_batches: Iterable[list[dict]]) -> Iterator[bytes]:
+    buffer = ZipStreamBuffer()
+    with zipfile.ZipFile(buffer, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for batch in receipt_batches:
+            for receipt, path in receipt_jobs.render_many(batch):
+                archive.write(path, arcname=f"{receipt['receipt_id']}.pdf")
+                yield buffer.drain()
+    yield buffer.drain()
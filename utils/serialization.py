@@ -0,0 +1,79 @@
+import os
+import types
+from functools import lru_cache, partial
+from typing import Any, Callable, Optional, Union, get_args, get_origin
+
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+
+try:
+    import orjson
+except ImportError:  # optional speed-up; the pydantic path below is always available
+    orjson = None
+
+FAST_JSON = os.getenv("PETSHOP_FAST_JSON", "0").lower() in ("1", "true", "yes")
+
+
+@lru_cache(maxsize=None)
+def type_adapter(annotation) -> TypeAdapter:
+    return TypeAdapter(annotation)
+
+
+def _unwrap_optional(annotation):
+    if get_origin(annotation) in (Union, types.UnionType):
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        if len(args) == 1:
+            return args[0]
+    return annotation
+
+
+def _value_converter(annotation) -> Optional[Callable[[Any], Any]]:
+    annotation = _unwrap_optional(annotation)
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        extract = model_extractor(annotation)
+        return lambda value: None if value is None else extract(value)
+    if get_origin(annotation) is list:
+        (item_annotation,) = get_args(annotation)
+        convert_item = _value_converter(item_annotation)
+        if convert_item is None:
+            return None
+        return lambda value: None if value is None else [convert_item(item) for item in value]
+    if annotation is float:
+        # SQLite hands back ints for whole-number floats; match pydantic's "12.0" output.
+        return lambda value: None if value is None else float(value)
+    if annotation is bool:
+        # SQL comparisons come back as 0/1.
+        return lambda value: None if value is None else bool(value)
+    return None
+
+
+@lru_cache(maxsize=None)
+def model_extractor(model: type[BaseModel]) -> Callable[[Any], dict]:
+    # Built once per schema: plain attribute reads in field order, no validation.
+    fields = [(name, _value_converter(field.annotation)) for name, field in model.model_fields.items()]
+
+    def extract(obj) -> dict:
+        read = obj.__getitem__ if isinstance(obj, dict) else partial(getattr, obj)
+        row = {}
+        for name, convert in fields:
+            value = read(name)
+            row[name] = convert(value) if convert is not None else value
+        return row
+
+    return extract
+
+
+def dump_json(data: Any, annotation) -> bytes:
+    if FAST_JSON and orjson is not None:
+        # Trusted ORM output: read the schema's fields straight off the rows.
+        convert = _value_converter(annotation)
+        return orjson.dumps(convert(data) if convert is not None else data)
+    # Same validation and encoding FastAPI applies for response_model, but to bytes we can cache.
+    adapter = type_adapter(annotation)
+    return adapter.dump_json(adapter.validate_python(data, from_attributes=True))
+
+
+def json_response(data: Any, annotation, headers: Optional[dict] = None) -> Response:
+    # Returning a Response skips FastAPI's own response_model pass; the route's
+    # response_model still documents the payload in OpenAPI.
+    return Response(content=dump_json(data, annotation), media_type="application/json", headers=headers)
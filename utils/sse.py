@@ -0,0 +1,60 @@
+import json
+import os
+from typing import AsyncIterator, Iterable, Optional
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+from utils.pubsub import Subscription
+
+SSE_KEEPALIVE_SECONDS = float(os.getenv("PETSHOP_SSE_KEEPALIVE_SECONDS", "15"))
+SSE_RETRY_MILLISECONDS = 3000
+
+
+def format_sse(data: dict, event: Optional[str] = None, event_id=None) -> str:
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event:
+        lines.append(f"event: {event}")
+    lines.append("data: " + json.dumps(data, separators=(",", ":"), default=str))
+    return "\n".join(lines) + "\n\n"
+
+
+async def sse_events(
+    request: Request,
+    subscription: Subscription,
+    event: str,
+    id_key: Optional[str] = None,
+    backlog: Iterable[dict] = (),
+) -> AsyncIterator[str]:
+    # Idle connections only wake up for published messages or keepalives; no polling queries.
+    last_id = None
+    try:
+        yield f"retry: {SSE_RETRY_MILLISECONDS}\n\n"
+        for message in backlog:
+            last_id = message[id_key] if id_key else None
+            yield format_sse(message, event, last_id)
+        while not subscription.overflowed:
+            message = await subscription.get(SSE_KEEPALIVE_SECONDS)
+            if message is None:
+                if await request.is_disconnected():
+                    break
+                yield ": keepalive\n\n"
+                continue
+            event_id = message[id_key] if id_key else None
+            # The backlog and the live queue can overlap right after subscribing.
+            if event_id is not None and last_id is not None and event_id <= last_id:
+                continue
+            last_id = event_id if event_id is not None else last_id
+            yield format_sse(message, event, event_id)
+    finally:
+        subscription.close()
+
+
+def sse_response(events: AsyncIterator[str]) -> StreamingResponse:
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
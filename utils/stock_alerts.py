@@ -0,0 +1,39 @@
+import os
+from datetime import datetime
+from typing import Optional
+
+LOW_STOCK_THRESHOLD = int(os.getenv("PETSHOP_LOW_STOCK_THRESHOLD", "5"))
+LOW_STOCK_TOPIC = "inventory:low-stock"
+
+STOCK_LEVELS = ("IN_STOCK", "LOW_STOCK", "OUT_OF_STOCK")
+
+
+def stock_level(stock_quantity: int, threshold: int = LOW_STOCK_THRESHOLD) -> str:
+    if stock_quantity <= 0:
+        return "OUT_OF_STOCK"
+    if stock_quantity <= threshold:
+        return "LOW_STOCK"
+    return "IN_STOCK"
+
+
+def low_stock_alert(
+    product_id: int,
+    product_name: str,
+    previous_stock: int,
+    stock_quantity: int,
+    threshold: int = LOW_STOCK_THRESHOLD,
+) -> Optional[dict]:
+    # Only a move into a worse level alerts, so each drop is reported once instead of
+    # on every sale while the product stays low.
+    level = stock_level(stock_quantity, threshold)
+    if STOCK_LEVELS.index(level) <= STOCK_LEVELS.index(stock_level(previous_stock, threshold)):
+        return None
+    return {
+        "product_id": product_id,
+        "product_name": product_name,
+        "level": level,
+        "previous_stock": previous_stock,
+        "stock_quantity": stock_quantity,
+        "threshold": threshold,
+        "detected_at": datetime.utcnow().isoformat(),
+    }
@@ -0,0 +1,443 @@
+import argparse
+import itertools
+import os
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.engine import make_url
+
+import crud
+import models
+from database import SQLALCHEMY_DATABASE_URL, Base, SessionLocal, engine, ensure_runtime_schema
+from utils.auth import hash_password
+
+# Load/benchmark datasets. Every value is drawn from one seeded Random, so the same
+# arguments (including --end-date) against an empty database produce the same data.
+
+PRODUCT_TYPES = {
+    # type: (share of catalog, median price)
+    "Food": (0.26, 650),
+    "Toys": (0.14, 280),
+    "Accessories": (0.14, 420),
+    "Grooming": (0.09, 330),
+    "Medicine": (0.08, 450),
+    "Healthcare": (0.06, 520),
+    "Hygiene": (0.06, 240),
+    "Training": (0.06, 380),
+    "Beds": (0.05, 1600),
+    "Travel": (0.06, 1400),
+}
+PRODUCT_BRANDS = ("Pedigree", "Whiskas", "Drools", "Royal Canin", "Himalaya", "Trixie", "Kong", "PetLife", "Farmina")
+PRODUCT_ADJECTIVES = ("Premium", "Classic", "Organic", "Deluxe", "Everyday", "Compact", "Large", "Natural", "Pro")
+PET_TYPES = ("Dog", "Cat", "Bird", "Fish", "Rabbit")
+PET_TYPE_WEIGHTS = (48, 30, 10, 8, 4)
+FIRST_NAMES = ("Aarav", "Diya", "Ishaan", "Ananya", "Vivaan", "Saanvi", "Kabir", "Myra", "Arjun", "Kiara", "Rohan")
+LAST_NAMES = ("Sharma", "Patil", "Kulkarni", "Deshmukh", "Iyer", "Reddy", "Mehta", "Joshi", "Nair", "Gupta", "Shah")
+PAYMENT_METHODS = ("UPI", "CARD", "COD")
+PAYMENT_METHOD_WEIGHTS = (58, 30, 12)
+ITEMS_PER_ORDER = (1, 2, 3, 4, 5)
+ITEMS_PER_ORDER_WEIGHTS = (50, 25, 13, 7, 5)
+QUANTITIES = (1, 2, 3)
+QUANTITY_WEIGHTS = (70, 20, 10)
+REVIEW_RATINGS = (5.0, 4.5, 4.0, 3.5, 3.0, 2.0, 1.0)
+REVIEW_RATING_WEIGHTS = (38, 12, 24, 6, 9, 5, 6)
+REVIEW_COMMENTS = (None, None, "Great quality", "My pet loves it", "Value for money", "Fast delivery", "Not as expected")
+# Zipf exponents: a few products and a core of repeat customers account for most orders.
+PRODUCT_POPULARITY_SKEW = 1.05
+CUSTOMER_ACTIVITY_SKEW = 0.7
+# Order volume grows linearly over the history (x3 end to end), with busier weekends.
+GROWTH_START_WEIGHT = 0.5
+GROWTH_END_WEIGHT = 1.5
+WEEKEND_UPLIFT = 1.3
+# Order age (days) at which it has shipped / been delivered; newer orders are still PLACED.
+SHIPPED_AFTER_DAYS = 1
+DELIVERED_AFTER_DAYS = 4
+# Notifications older than this are read.
+READ_AFTER_DAYS = 7
+PROGRESS_INTERVAL_SECONDS = 2.0
+
+
+@dataclass
+class GeneratorConfig:
+    customers: int = 10000
+    products: int = 1000
+    orders: int = 50000
+    review_rate: float = 0.08
+    days: int = 365
+    end_date: date = field(default_factory=lambda: datetime.utcnow().date())
+    seed: int = 42
+    batch_size: int = 20000
+    password: str = "user1234"
+
+
+class Progress:
+    """Prints rows written and throughput for one phase, at most every couple of seconds."""
+
+    def __init__(self, label: str, total: int):
+        self.label = label
+        self.total = total
+        self.done = 0
+        self.rows = 0
+        self.started = time.perf_counter()
+        self.last_report = self.started
+
+    def advance(self, done: int, rows: int) -> None:
+        self.done += done
+        self.rows += rows
+        now = time.perf_counter()
+        if now - self.last_report >= PROGRESS_INTERVAL_SECONDS or self.done >= self.total:
+            self.last_report = now
+            elapsed = max(now - self.started, 1e-9)
+            print(
+                f"{self.label}: {self.done}/{self.total} rows_written={self.rows} "
+                f"elapsed={elapsed:.1f}s rows_per_second={self.rows / elapsed:.0f}",
+                flush=True,
+            )
+
+
+def zipf_cum_weights(count: int, skew: float) -> list[float]:
+    # Cumulative weights let random.choices pick by bisection instead of rescanning weights.
+    return list(itertools.accumulate(1.0 / (rank**skew) for rank in range(1, count + 1)))
+
+
+def next_id(db, column) -> int:
+    return (db.execute(select(func.max(column))).scalar() or 0) + 1
+
+
+def generate_customers(db, rnd: random.Random, config: GeneratorConfig) -> list[int]:
+    # PBKDF2 is deliberately slow, so every synthetic customer shares one precomputed hash.
+    password_hash = hash_password(config.password)
+    first_id = next_id(db, models.Customer.customer_id)
+    customer_ids = list(range(first_id, first_id + config.customers))
+    progress = Progress("customers", config.customers)
+    for start in range(0, config.customers, config.batch_size):
+        batch = [
+            {
+                "customer_id": customer_id,
+                "name": f"{rnd.choice(FIRST_NAMES)} {rnd.choice(LAST_NAMES)}",
+                "contact_no": f"9{rnd.randrange(10**9):09d}",
+                "email": f"customer{customer_id}@synthetic.example",
+                "pet_type": rnd.choices(PET_TYPES, PET_TYPE_WEIGHTS)[0],
+                "password": password_hash,
+            }
+            for customer_id in customer_ids[start:start + config.batch_size]
+        ]
+        db.execute(insert(models.Customer.__table__), batch)
+        db.commit()
+        progress.advance(len(batch), len(batch))
+    # Shuffled so the activity skew is not tied to signup order.
+    rnd.shuffle(customer_ids)
+    return customer_ids
+
+
+def generate_products(db, rnd: random.Random, config: GeneratorConfig) -> tuple[list[int], list[float]]:
+    first_id = next_id(db, models.Product.product_id)
+    product_types = list(PRODUCT_TYPES)
+    shares = [PRODUCT_TYPES[product_type][0] for product_type in product_types]
+    product_ids, prices = [], []
+    progress = Progress("products", config.products)
+    # One transaction with the bulk marker row, like catalog imports: the FTS triggers stand
+    # down and the new rows are indexed set-based at the end.
+    db.execute(text("INSERT INTO products_fts_bulk (active) VALUES (1)"))
+    for start in range(first_id, first_id + config.products, config.batch_size):
+        batch = []
+        for product_id in range(start, min(start + config.batch_size, first_id + config.products)):
+            product_type = rnd.choices(product_types, shares)[0]
+            price = round(max(49.0, rnd.lognormvariate(0, 0.45) * PRODUCT_TYPES[product_type][1]), 2)
+            batch.append(
+                {
+                    "product_id": product_id,
+                    "product_name": f"{rnd.choice(PRODUCT_BRANDS)} {rnd.choice(PRODUCT_ADJECTIVES)} "
+                    f"{product_type} #{product_id}",
+                    "product_type": product_type,
+                    "price": price,
+                    # About one product in twenty is sold out.
+                    "stock_quantity": 0 if rnd.random() < 0.05 else rnd.randint(1, 250),
+                    "rating": 0.0,
+                    "rating_sum": 0.0,
+                    "rating_count": 0,
+                }
+            )
+            product_ids.append(product_id)
+            prices.append(price)
+        db.execute(insert(models.Product.__table__), batch)
+        progress.advance(len(batch), len(batch))
+    db.execute(text(crud.PRODUCT_FTS_INDEX_SQL + "WHERE product_id >= :first_id"), {"first_id": first_id})
+    db.execute(text("DELETE FROM products_fts_bulk"))
+    crud.bump_catalog_version(db)
+    db.commit()
+    return product_ids, prices
+
+
+def orders_per_day(rnd: random.Random, config: GeneratorConfig) -> list[int]:
+    first_day = config.end_date - timedelta(days=config.days - 1)
+    weights = []
+    for offset in range(config.days):
+        progress = offset / max(config.days - 1, 1)
+        weight = GROWTH_START_WEIGHT + (GROWTH_END_WEIGHT - GROWTH_START_WEIGHT) * progress
+        if (first_day + timedelta(days=offset)).weekday() >= 5:
+            weight *= WEEKEND_UPLIFT
+        weights.append(weight)
+    total_weight = sum(weights)
+    counts = [int(config.orders * weight / total_weight) for weight in weights]
+    for offset in rnd.choices(range(config.days), weights, k=config.orders - sum(counts)):
+        counts[offset] += 1
+    return counts
+
+
+class OrderBatch:
+    """Rows for one batch of orders and everything checkout and delivery would have written."""
+
+    TABLES = (
+        ("orders", models.Order),
+        ("order_items", models.OrderItem),
+        ("payments", models.Payment),
+        ("order_tracking_events", models.OrderTrackingEvent),
+        ("notifications", models.Notification),
+        ("reviews", models.Review),
+    )
+
+    def __init__(self):
+        self.rows: dict[str, list[dict]] = {name: [] for name, _ in self.TABLES}
+
+    def __len__(self) -> int:
+        return len(self.rows["orders"])
+
+    def flush(self, db) -> int:
+        written = 0
+        for name, model in self.TABLES:
+            if self.rows[name]:
+                db.execute(insert(model.__table__), self.rows[name])
+                written += len(self.rows[name])
+        db.commit()
+        return written
+
+
+def generate_orders(
+    db,
+    rnd: random.Random,
+    config: GeneratorConfig,
+    customer_ids: list[int],
+    product_ids: list[int],
+    prices: list[float],
+) -> dict[str, int]:
+    # Orders are written in date order, so ids grow with order_date like real checkouts.
+    # No outbox rows are written: the dispatcher must not deliver synthetic notifications.
+    customer_weights = zipf_cum_weights(len(customer_ids), CUSTOMER_ACTIVITY_SKEW)
+    product_weights = zipf_cum_weights(len(product_ids), PRODUCT_POPULARITY_SKEW)
+    product_positions = list(range(len(product_ids)))
+    rnd.shuffle(product_positions)
+    now = datetime.combine(config.end_date, datetime.max.time())
+    first_day = config.end_date - timedelta(days=config.days - 1)
+    order_id = next_id(db, models.Order.order_id)
+    totals = {name: 0 for name, _ in OrderBatch.TABLES}
+    progress = Progress("orders", config.orders)
+    batch = OrderBatch()
+
+    for offset, day_orders in enumerate(orders_per_day(rnd, config)):
+        day_start = datetime.combine(first_day + timedelta(days=offset), datetime.min.time())
+        seconds = sorted(rnd.randrange(86400) for _ in range(day_orders))
+        customers = rnd.choices(customer_ids, cum_weights=customer_weights, k=day_orders)
+        item_counts = rnd.choices(ITEMS_PER_ORDER, ITEMS_PER_ORDER_WEIGHTS, k=day_orders)
+        picks = iter(rnd.choices(product_positions, cum_weights=product_weights, k=sum(item_counts)))
+        for second, customer_id, item_count in zip(seconds, customers, item_counts):
+            order_date = day_start + timedelta(seconds=second, microseconds=rnd.randrange(10**6))
+            add_order(batch, rnd, order_id, customer_id, order_date, now, item_count, picks, product_ids, prices, config)
+            order_id += 1
+            if len(batch) >= config.batch_size:
+                written = write_order_batch(db, batch, totals)
+                progress.advance(len(batch), written)
+                batch = OrderBatch()
+    if len(batch):
+        written = write_order_batch(db, batch, totals)
+        progress.advance(len(batch), written)
+    return totals
+
+
+def write_order_batch(db, batch: OrderBatch, totals: dict[str, int]) -> int:
+    for name, rows in batch.rows.items():
+        totals[name] += len(rows)
+    return batch.flush(db)
+
+
+def add_order(
+    batch: OrderBatch,
+    rnd: random.Random,
+    order_id: int,
+    customer_id: int,
+    order_date: datetime,
+    now: datetime,
+    item_count: int,
+    picks,
+    product_ids: list[int],
+    prices: list[float],
+    config: GeneratorConfig,
+) -> None:
+    age_days = (now - order_date).days
+    shipped_at = order_date + timedelta(hours=rnd.randint(12, 36)) if age_days >= SHIPPED_AFTER_DAYS else None
+    delivered_at = (
+        order_date + timedelta(days=rnd.randint(2, DELIVERED_AFTER_DAYS), hours=rnd.randint(0, 10))
+        if age_days >= DELIVERED_AFTER_DAYS
+        else None
+    )
+    delivery_status = "DELIVERED" if delivered_at else "SHIPPED" if shipped_at else "PLACED"
+
+    lines = {}
+    for _ in range(item_count):
+        position = next(picks)
+        # A product picked twice becomes one line with a higher quantity, as the cart merges it.
+        lines[position] = lines.get(position, 0) + rnd.choices(QUANTITIES, QUANTITY_WEIGHTS)[0]
+    total_amount = 0.0
+    for position, quantity in lines.items():
+        sub_total = prices[position] * quantity
+        total_amount += sub_total
+        batch.rows["order_items"].append(
+            {
+                "order_id": order_id,
+                "product_id": product_ids[position],
+                "price": prices[position],
+                "quantity": quantity,
+                "sub_total": sub_total,
+            }
+        )
+        if delivered_at and rnd.random() < config.review_rate:
+            batch.rows["reviews"].append(
+                {
+                    "customer_id": customer_id,
+                    "product_id": product_ids[position],
+                    "rating": rnd.choices(REVIEW_RATINGS, REVIEW_RATING_WEIGHTS)[0],
+                    "comment": rnd.choice(REVIEW_COMMENTS),
+                    "created_at": min(delivered_at + timedelta(days=rnd.randint(0, 14)), now),
+                }
+            )
+
+    batch.rows["orders"].append(
+        {
+            "order_id": order_id,
+            "customer_id": customer_id,
+            "order_date": order_date,
+            "total_amount": total_amount,
+            "payment_status": "RECEIPT_GENERATED",
+            "delivery_status": delivery_status,
+        }
+    )
+    batch.rows["payments"].append(
+        {
+            "order_id": order_id,
+            "payment_method": rnd.choices(PAYMENT_METHODS, PAYMENT_METHOD_WEIGHTS)[0],
+            "status": "RECEIPT_GENERATED",
+            "paid_at": None,
+        }
+    )
+
+    events = [("PLACED", "Order placed successfully", order_date)]
+    if shipped_at:
+        events.append(("SHIPPED", "Delivery status updated from PLACED to SHIPPED", shipped_at))
+    if delivered_at:
+        events.append(("DELIVERED", "Delivery status updated from SHIPPED to DELIVERED", delivered_at))
+    notifications = [
+        ("Order Confirmation", f"Your order #{order_id} has been placed. Receipt generated (demo mode).", order_date),
+        (
+            "Payment Receipt",
+            f"Payment receipt for order #{order_id} is generated. No real payment was processed.",
+            order_date,
+        ),
+    ]
+    for status, note, created_at in events[1:]:
+        notifications.append(("Delivery Update", f"Order #{order_id} status updated to {status}.", created_at))
+    for status, note, created_at in events:
+        batch.rows["order_tracking_events"].append(
+            {"order_id": order_id, "status": status, "note": note, "created_at": created_at}
+        )
+    for title, message, created_at in notifications:
+        batch.rows["notifications"].append(
+            {
+                "customer_id": customer_id,
+                "title": title,
+                "message": message,
+                "channel": "MOCK_EMAIL_SMS",
+                "related_order_id": order_id,
+                "is_read": int((now - created_at).days >= READ_AFTER_DAYS or rnd.random() < 0.5),
+                "created_at": created_at,
+            }
+        )
+
+
+def rebuild_derived_tables(db) -> None:
+    # Checkout and create_review keep these incrementally; bulk rows bypass them.
+    steps = (
+        ("ratings", crud.rebuild_product_ratings),
+        ("sales_counters", crud.rebuild_sales_counters),
+        ("sales_rollup", crud.rebuild_sales_rollup),
+        ("best_sellers", crud.rebuild_product_sales),
+    )
+    for label, rebuild in steps:
+        started = time.perf_counter()
+        rebuild(db)
+        print(f"rebuild_{label}_seconds={time.perf_counter() - started:.2f}", flush=True)
+
+
+def database_size_bytes() -> Optional[int]:
+    url = make_url(SQLALCHEMY_DATABASE_URL)
+    if url.get_backend_name() != "sqlite" or url.database in (None, "", ":memory:"):
+        return None
+    paths = [url.database, f"{url.database}-wal"]
+    return sum(os.path.getsize(path) for path in paths if os.path.exists(path))
+
+
+def generate(config: GeneratorConfig) -> dict[str, int]:
+    rnd = random.Random(config.seed)
+    db = SessionLocal()
+    try:
+        customer_ids = generate_customers(db, rnd, config)
+        product_ids, prices = generate_products(db, rnd, config)
+        counts = {"customers": len(customer_ids), "products": len(product_ids)}
+        if config.orders and customer_ids and product_ids:
+            counts.update(generate_orders(db, rnd, config, customer_ids, product_ids, prices))
+        rebuild_derived_tables(db)
+        return counts
+    finally:
+        db.close()
+
+
+def main(argv=None):
+    defaults = GeneratorConfig()
+    parser = argparse.ArgumentParser(description="Generate a synthetic Online Pet Shop dataset")
+    parser.add_argument("--customers", type=int, default=defaults.customers)
+    parser.add_argument("--products", type=int, default=defaults.products)
+    parser.add_argument("--orders", type=int, default=defaults.orders)
+    parser.add_argument("--review-rate", type=float, default=defaults.review_rate, help="share of delivered lines reviewed")
+    parser.add_argument("--days", type=int, default=defaults.days, help="length of the order history")
+    parser.add_argument("--end-date", type=date.fromisoformat, default=defaults.end_date, help="last day of history")
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--batch-size", type=int, default=defaults.batch_size)
+    parser.add_argument("--password", default=defaults.password, help="password shared by all synthetic customers")
+    args = parser.parse_args(argv)
+    if min(args.customers, args.products, args.orders) < 0 or args.days < 1 or args.batch_size < 1:
+        parser.error("counts must be non-negative; --days and --batch-size must be at least 1")
+    if args.orders and not (args.customers and args.products):
+        parser.error("--orders needs at least one customer and one product")
+
+    Base.metadata.create_all(bind=engine)
+    ensure_runtime_schema()
+    config = GeneratorConfig(**{name.replace("-", "_"): value for name, value in vars(args).items()})
+    started = time.perf_counter()
+    counts = generate(config)
+    elapsed = time.perf_counter() - started
+    for name, count in counts.items():
+        print(f"{name}={count}")
+    total_rows = sum(counts.values())
+    print(f"total_rows={total_rows}")
+    print(f"seconds={elapsed:.2f}")
+    print(f"rows_per_second={total_rows / max(elapsed, 1e-9):.0f}")
+    size = database_size_bytes()
+    if size is not None:
+        print(f"database_bytes={size}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+# Other workers' writes are only picked up when an entry expires, so keep the TTL short.
+UNREAD_COUNT_TTL_SECONDS = float(os.getenv("PETSHOP_UNREAD_COUNT_TTL_SECONDS", "10"))
+UNREAD_COUNT_MAX_ENTRIES = int(os.getenv("PETSHOP_UNREAD_COUNT_MAX_ENTRIES", "10000"))
+
+
+class UnreadCountCache:
+    """customer_id -> unread notification count, adjusted in place by this process's writes."""
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict[int, tuple[float, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, customer_id: int) -> Optional[int]:
+        with self._lock:
+            entry = self._entries.get(customer_id)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                del self._entries[customer_id]
+                return None
+            self._entries.move_to_end(customer_id)
+            return entry[1]
+
+    def put(self, customer_id: int, count: int) -> None:
+        if self.max_entries <= 0 or self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[customer_id] = (time.time() + self.ttl_seconds, max(count, 0))
+            self._entries.move_to_end(customer_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def adjust(self, customer_id: int, delta: int) -> None:
+        # Only counts already cached are adjusted; a miss is recounted on the next read.
+        with self._lock:
+            entry = self._entries.get(customer_id)
+            if entry is not None:
+                self._entries[customer_id] = (entry[0], max(entry[1] + delta, 0))
+
+    def invalidate(self, customer_id: int) -> None:
+        with self._lock:
+            self._entries.pop(customer_id, None)
+
+
+unread_counts = UnreadCountCache(UNREAD_COUNT_TTL_SECONDS, UNREAD_COUNT_MAX_ENTRIES)